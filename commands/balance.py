@@ -1,15 +1,13 @@
 # region Imports
-# Standard library
-from hashlib import sha256
-
 # Third party
 from discord import Interaction, Member, app_commands, AllowedMentions
 from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
+from models.ledger_writer import LedgerWriter
+from models.user_hash_index import hash_user_id
 from utils.formatting import format_coin_label
-from sponsorblockchain.models.blockchain import Blockchain
 
 # region /balance
 assert isinstance(g.bot, Bot), "bot has not been initialized."
@@ -30,8 +28,8 @@ async def balance(interaction: Interaction,
 
         user: The user to check the balance. Defaults to None.
     """
-    from core.global_state import coins, blockchain
-    assert isinstance(blockchain, Blockchain)
+    from core.global_state import coins, ledger_writer
+    assert isinstance(ledger_writer, LedgerWriter)
     user_to_check: str
     if user is None:
         user_to_check = interaction.user.mention
@@ -41,8 +39,8 @@ async def balance(interaction: Interaction,
         user_id: int = user.id
 
     # print(f"Getting balance for user {user_to_check} ({user_id})...")
-    user_id_hash: str = sha256(str(user_id).encode()).hexdigest()
-    balance: int | None = blockchain.get_balance(user=user_id_hash)
+    user_id_hash: str = hash_user_id(user_id)
+    balance: int | None = await ledger_writer.get_balance(user=user_id_hash)
     message_content: str = ""
     if balance is None and user is None:
         message_content = f"You have 0 {coins}."
@@ -211,11 +211,12 @@ async def block_receivals(interaction: Interaction,
     else:
         blocked_or_unblocked: Literal['blocked'] | Literal['unblocked'] = (
             "blocked" if blocked else "unblocked")
-        user_save_data.blocked_from_receiving_coins = blocked
-        if blocked:
-            user_save_data.blocked_from_receiving_coins_reason = reason
-        else:
-            user_save_data.blocked_from_receiving_coins_reason = None
+        with user_save_data.transaction():
+            user_save_data.blocked_from_receiving_coins = blocked
+            if blocked:
+                user_save_data.blocked_from_receiving_coins_reason = reason
+            else:
+                user_save_data.blocked_from_receiving_coins_reason = None
         message_content = (f"User {user_mention} has been "
                            f"{blocked_or_unblocked} from receiving {g.coins}.")
     await interaction.response.send_message(
@@ -268,9 +269,11 @@ async def decrypt_spreadsheet(interaction: Interaction,
         message_content = (
             "The transactions spreadsheet has been decrypted.")
     try:
-        g.decrypted_transactions_spreadsheet.decrypt(user_id, user_name)
-        spreadsheet_path: Path = (
-            g.decrypted_transactions_spreadsheet.decrypted_spreadsheet_path)
+        spreadsheet_path: Path | None = (
+            g.decrypted_transactions_spreadsheet.decrypt(user_id, user_name))
+        if spreadsheet_path is None:
+            raise FileNotFoundError(
+                "The transactions spreadsheet was not found.")
         with open(spreadsheet_path, 'rb') as f:
             decrypted_transactions_spreadsheet_file = File(f)
             await interaction.response.send_message(message_content,
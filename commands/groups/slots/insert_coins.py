@@ -2,8 +2,7 @@
 # Standard library
 import asyncio
 from time import time
-from hashlib import sha256
-from typing import Dict, List, cast
+from typing import Dict, List
 
 # Third party
 from humanfriendly import format_timespan
@@ -14,17 +13,19 @@ from discord.ext.commands import Bot  # type: ignore
 # Local
 import core.global_state as g
 from type_aliases import ReelSymbol,  ReelResults, SpinEmojis
-from core.terminate_bot import terminate_bot
 from models.slot_machine import SlotMachine
+from models.slot_machine_sessions import SlotMachineSessions
 from models.grifter_suppliers import GrifterSuppliers
+from models.ledger_writer import LedgerWriter
 from models.log import Log
 from models.user_save_data import UserSaveData
-from utils.blockchain_utils import (add_block_transaction,
-                                    get_last_block_timestamp)
+from models.user_hash_index import hash_user_id
+from utils.blockchain_utils import add_block_transaction
 from utils.formatting import format_coin_label
 from views.starting_bonus_view import StartingBonusView
 from views.slot_machine_buttons import SlotMachineView
 from sponsorblockchain.models.blockchain import Blockchain
+from sponsorblockchain.models.block import Block
 from .slots_main import slots_group
 from .slots_utils import remove_from_active_players
 # endregion
@@ -74,9 +75,13 @@ async def insert_coins(interaction: Interaction,
         "g.slot_machine has not been initialized.")
     assert isinstance(g.blockchain, Blockchain), (
         "g.blockchain has not been initialized.")
+    assert isinstance(g.ledger_writer, LedgerWriter), (
+        "g.ledger_writer has not been initialized.")
     assert isinstance(g.grifter_suppliers, GrifterSuppliers), (
         "g.grifter_suppliers has not been initialized.")
     assert isinstance(g.log, Log), "g.log has not been initialized."
+    assert isinstance(g.slot_machine_sessions, SlotMachineSessions), (
+        "g.slot_machine_sessions has not been initialized.")
 
     user: User | Member = interaction.user
     user_id: int = user.id
@@ -129,12 +134,11 @@ async def insert_coins(interaction: Interaction,
     # TODO Log/stat outcomes (esp. wager amounts)
 
     # Check if user is already playing on a slot machine
-    wait_seconds_left: int = 2
-    while user_id in g.active_slot_machine_players and wait_seconds_left > 0:
-        await asyncio.sleep(1)
-        wait_seconds_left -= 1
-    # If the user is still in the active players list, send a message and return
-    if user_id in g.active_slot_machine_players:
+    # The spin starts as soon as the user's previous spin has finished
+    session_started: bool = (
+        await g.slot_machine_sessions.acquire(user_id))
+    # If the previous spin did not finish in time, send a message and return
+    if not session_started:
         await interaction.response.send_message(
             "You are only allowed to play "
             "on one slot machine at a time.\n"
@@ -142,10 +146,7 @@ async def insert_coins(interaction: Interaction,
             f"before contacting the {g.Coin} Casino staff.",
             ephemeral=True)
         return
-    else:
-        start_play_timestamp: float = time()
-        g.active_slot_machine_players[user_id] = start_play_timestamp
-        del start_play_timestamp
+    del session_started
 
     user_name: str = user.name
     save_data: UserSaveData = (
@@ -153,8 +154,9 @@ async def insert_coins(interaction: Interaction,
     starting_bonus_available: bool | float = save_data.starting_bonus_available
 
     # Check balance
-    user_id_hash: str = sha256(str(user_id).encode()).hexdigest()
-    user_balance: int | None = g.blockchain.get_balance(user=user_id_hash)
+    user_id_hash: str = hash_user_id(user_id)
+    user_balance: int | None = (
+        await g.ledger_writer.get_balance(user=user_id_hash))
     if user_balance is None:
         user_balance = 0
 
@@ -275,12 +277,8 @@ async def insert_coins(interaction: Interaction,
                               interaction=interaction))
         await interaction.response.send_message(content=message_content,
                                                 view=starting_bonus_view)
-        wait: bool = await starting_bonus_view.wait()
-        timed_out: bool = wait is True
-        if not timed_out:
-            save_data.has_visited_casino = True
-            current_time: float = time()
-            save_data.when_last_bonus_received = current_time
+        # The view records the bonus in the save data
+        await starting_bonus_view.wait()
         await remove_from_active_players(interaction, user_id)
         return
 
@@ -297,46 +295,15 @@ async def insert_coins(interaction: Interaction,
         del coin_label_w
         del coin_label_b
         del message_content
-        if user_id in g.active_slot_machine_players:
+        if g.slot_machine_sessions.holds(user_id):
             await remove_from_active_players(interaction, user_id)
         return
 
-    fees_dict: Dict[str, int | float] = g.slot_machine.configuration["fees"]
-    low_wager_main_fee: int = (
-        cast(int, fees_dict["low_wager_main"]))
-    medium_wager_main_fee: float = (
-        cast(float, fees_dict["medium_wager_main"]))
-    high_wager_main_fee: float = (
-        cast(float, fees_dict["high_wager_main"]))
-    low_wager_jackpot_fee: int = (
-        cast(int, fees_dict["low_wager_jackpot"]))
-    medium_wager_jackpot_fee: float = (
-        cast(float, fees_dict["medium_wager_jackpot"]))
-    high_wager_jackpot_fee: float = (
-        cast(float, fees_dict["high_wager_jackpot"]))
-
-    jackpot_fee_paid: bool = (
-        amount_int >= (low_wager_main_fee + low_wager_jackpot_fee))
+    jackpot_fee_paid: bool = g.slot_machine.jackpot_fee_paid(amount_int)
     no_jackpot_mode: bool = False if jackpot_fee_paid else True
     jackpot_fee: int
     main_fee: int
-    if no_jackpot_mode:
-        # IMPROVE Make min_wager config keys
-        main_fee = low_wager_main_fee
-        jackpot_fee = 0
-    elif amount_int < 10:
-        main_fee = low_wager_main_fee
-        jackpot_fee = low_wager_jackpot_fee
-    elif amount_int < 100:
-        main_fee_unrounded: float = amount_int * medium_wager_main_fee
-        main_fee = round(main_fee_unrounded)
-        jackpot_fee_unrounded: float = amount_int * medium_wager_jackpot_fee
-        jackpot_fee = round(jackpot_fee_unrounded)
-    else:
-        main_fee_unrounded: float = amount_int * high_wager_main_fee
-        main_fee = round(main_fee_unrounded)
-        jackpot_fee_unrounded: float = amount_int * high_wager_jackpot_fee
-        jackpot_fee = round(jackpot_fee_unrounded)
+    main_fee, jackpot_fee = g.slot_machine.calculate_fees(amount_int)
     fees: int = jackpot_fee + main_fee
 
     spin_emojis: SpinEmojis = g.slot_machine.configuration["reel_spin_emojis"]
@@ -442,11 +409,8 @@ async def insert_coins(interaction: Interaction,
         event_message = (f"You lost your entire "
                          f"stake of {amount_int} {coin_label_wm}. "
                          "Better luck next time!")
-        net_return = -amount_int
-        total_return = 0
-    else:
-        total_return = amount_int + win_money - main_fee - jackpot_fee
-    net_return = win_money - main_fee - jackpot_fee
+    net_return, total_return = g.slot_machine.calculate_returns(
+        wager=amount_int, event_name=event_name, win_money=win_money)
     # print(f"wager: {wager_int}")
     # print(f"standard_fee: {main_fee}")
     # print(f"jackpot_fee: {jackpot_fee}")
@@ -495,7 +459,7 @@ async def insert_coins(interaction: Interaction,
                         f"({event_name_friendly}) and lost their entire wager "
                         f"of {amount_int} {coin_label_nr} on the "
                         f"{g.Coin} Slot Machine.")
-        if event_name == "jackpot_fail":
+        elif event_name == "jackpot_fail":
             log_line = (f"{user_name} ({user_id}) lost {-net_return} "
                         f"{coin_label_nr} on the {g.Coin} Slot Machine by "
                         f"getting the {event_name} ({event_name_friendly}) "
@@ -549,7 +513,6 @@ async def insert_coins(interaction: Interaction,
         del slots_message_outcome
 
     # Transfer and log
-    last_block_error = False
     if net_return != 0:
         sender: User | Member | int
         receiver: User | Member | int
@@ -565,8 +528,7 @@ async def insert_coins(interaction: Interaction,
             # flip to positive value (transferring a negative amount would mean
             # reducing the receiver's balance)
             transfer_amount = -net_return
-        await add_block_transaction(
-            blockchain=g.blockchain,
+        block: Block = await add_block_transaction(
             sender=sender,
             receiver=receiver,
             amount=transfer_amount,
@@ -575,16 +537,8 @@ async def insert_coins(interaction: Interaction,
         del sender
         del receiver
         del transfer_amount
-        last_block_timestamp: float | None = get_last_block_timestamp()
-        if last_block_timestamp is None:
-            print("ERROR: Could not get last block timestamp.")
-            log_timestamp = time()
-            log_line += ("(COULD NOT GET LAST BLOCK TIMESTAMP; "
-                         "USING CURRENT TIME; WILL NOT RESET JACKPOT)")
-            last_block_error = True
-        else:
-            log_timestamp = last_block_timestamp
-        del last_block_timestamp
+        log_timestamp = block.timestamp
+        del block
     else:
         log_timestamp = time()
     g.log.log(line=log_line, timestamp=log_timestamp)
@@ -625,17 +579,9 @@ async def insert_coins(interaction: Interaction,
             save_data.starting_bonus_available = next_bonus_point_in_time
             del next_bonus_point_in_time
 
-    if user_id in g.active_slot_machine_players:
+    if g.slot_machine_sessions.holds(user_id):
         await remove_from_active_players(interaction, user_id)
 
-    if last_block_error:
-        # send message to admin
-        administrator: str = (await g.bot.fetch_user(g.administrator_id)).name
-        await interaction.response.send_message("An error occurred. "
-                                                f"{administrator} pls fix.")
-        await terminate_bot()
-    del last_block_error
-
     if event_name == "jackpot":
         # Reset the jackpot
         combo_events: Dict[str, ReelSymbol] = (
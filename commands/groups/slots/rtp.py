@@ -1,11 +1,10 @@
 # region Imports
 # Standard library
-from typing import cast
+from fractions import Fraction
 
 # Third party
 from discord import Interaction, app_commands
 from discord.ext.commands import Bot  # type: ignore
-from sympy import Float, Integer, simplify
 
 # Local
 import core.global_state as g
@@ -50,20 +49,18 @@ async def rtp(interaction: Interaction,
 
     assert isinstance(g.slot_machine, SlotMachine), (
         "g.slot_machine has not been initialized.")
-    if stake == 0:
+    if stake <= 0:
         rtp_display = f"0%"
     else:
-        wager = Integer(stake)
-        rtp_fraction: Float = g.slot_machine.calculate_rtp(wager)
-        rtp_simple: Float = cast(Float, simplify(rtp_fraction))
+        rtp_fraction: Fraction = (
+            g.slot_machine.calculate_exact_rtp([stake])[stake])
         lowest_number_float = 0.0001
-        lowest_number: Float = Float(lowest_number_float)
         rtp_display: str
-        if rtp_fraction == round(rtp_fraction, Integer(4)):
-            rtp_display = f"{rtp_fraction:.4%}"
+        if rtp_fraction == round(rtp_fraction, 4):
+            rtp_display = f"{float(rtp_fraction):.4%}"
         else:
-            if rtp_simple > lowest_number:
-                rtp_display = f"~{rtp_fraction:.4%}"
+            if rtp_fraction > lowest_number_float:
+                rtp_display = f"~{float(rtp_fraction):.4%}"
             else:
                 rtp_display = f"<{lowest_number_float}%"
     coin_label: str = format_coin_label(stake)
@@ -7,6 +7,7 @@ from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
+from models.slot_machine_sessions import SlotMachineSessions
 from utils.roles import get_cybersecurity_officer_role
 # endregion
 
@@ -15,9 +16,11 @@ from utils.roles import get_cybersecurity_officer_role
 
 async def remove_from_active_players(interaction: Interaction,
                                      user_id: int) -> None:
+    assert isinstance(g.slot_machine_sessions, SlotMachineSessions), (
+        "g.slot_machine_sessions has not been initialized.")
     print(f"Removing user {user_id} from active players...")
     try:
-        g.active_slot_machine_players.pop(user_id)
+        g.slot_machine_sessions.release(user_id)
     except Exception as e:
         # Users who tries to cheat might trip this exception
         # and get reported to the IT Security Officer
@@ -37,6 +40,6 @@ async def remove_from_active_players(interaction: Interaction,
         await interaction.followup.send(message_content)
         custom_exception_text: str = (
             f"ERROR: Could not remove user {user_id} from "
-            f"g.active_slot_machine_players: {e}")
+            f"g.slot_machine_sessions: {e}")
         raise type(e)(custom_exception_text)
 # endregion
@@ -1,7 +1,4 @@
 # region Imports
-# Standard library
-from typing import List, cast
-
 # Third party
 from discord import (Interaction, Member, PartialEmoji, User, app_commands,
                      AllowedMentions)
@@ -93,9 +90,7 @@ async def mining(interaction: Interaction,
         user_to_check_mention: str = user_to_check.mention
         save_data: UserSaveData = UserSaveData(user_id=user_to_check_id,
                                                user_name=user_to_check_name)
-        messages_mined: List[int] = (
-            cast(List[int], save_data.load("messages_mined")))
-        messages_mined_count: int = len(messages_mined)
+        messages_mined_count: int = save_data.mined_messages.count
         message_content: str
         coin_emoji = PartialEmoji(
             name=g.coin_emoji_name, id=g.coin_emoji_id)
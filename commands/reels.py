@@ -1,12 +1,13 @@
 # region Imports
 # Standard library
 from _collections_abc import dict_items
+from fractions import Fraction
 from typing import List, Dict, cast
 
 # Third party
 from discord import Interaction, Member, Role, User, app_commands, utils
 from discord.ext.commands import Bot  # type: ignore
-from sympy import Float, Integer, Eq, Gt, simplify, Piecewise, pretty
+from sympy import Float, Integer, Eq, Gt, Piecewise, pretty
 
 # Local
 from type_aliases import Reels
@@ -197,18 +198,15 @@ async def reels(interaction: Interaction,
         25, 50, 75, 99, 100, 500, 1000, 10000, 100000, 1000000]
     rtp_dict: Dict[int, str] = {}
     rtp_display: str | None = None
-    rtp: Float
-    for wager in wagers:
-        rtp = (
-            g.slot_machine.calculate_rtp(Integer(wager)))
-        rtp_simple: Float = cast(Float, simplify(rtp))
-        if rtp == round(rtp, Integer(4)):
-            rtp_display = f"{rtp:.4%}"
+    # All wagers are calculated in one pass with exact fractions
+    rtps: Dict[int, Fraction] = g.slot_machine.calculate_exact_rtp(wagers)
+    for wager, rtp in rtps.items():
+        if rtp == round(rtp, 4):
+            rtp_display = f"{float(rtp):.4%}"
+        elif rtp > lowest_number_float:
+            rtp_display = f"~{float(rtp):.4%}"
         else:
-            if Gt(rtp_simple, lowest_number):
-                rtp_display = f"~{rtp:.4%}"
-            else:
-                rtp_display = f"<{str(lowest_number_float)}%"
+            rtp_display = f"<{str(lowest_number_float)}%"
         rtp_dict[wager] = rtp_display
 
     rtp_table: str = "**Wager**: **RTP**\n"
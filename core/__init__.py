@@ -8,7 +8,15 @@ from .global_state import (
     waitress_process,
     log,
     blockchain,
+    balance_index,
+    chain_validator,
+    ledger_writer,
+    user_hash_index,
+    save_data_cache,
+    mined_messages_store,
+    checkpoint_store,
     slot_machine,
+    slot_machine_sessions,
     grifter_suppliers,
     transfers_waiting_approval,
     decrypted_transactions_spreadsheet,
@@ -32,9 +40,19 @@ from .global_state import (
     aml_office_thread_id,
     DISCORD_TOKEN,
     per_channel_checkpoint_limit,
-    active_slot_machine_players,
+    missed_messages_max_concurrent_channels,
     starting_bonus_timeout,
-    time_zone
+    slot_machine_session_wait_timeout,
+    time_zone,
+    full_chain_validation_interval,
+    save_data_flush_interval,
+    checkpoint_flush_interval,
+    save_data_backend,
+    mined_messages_max_age,
+    ledger_snapshot_interval,
+    group_commit_enabled,
+    group_commit_window_seconds,
+    group_commit_max_batch_size
 )
 
 with lazyimports.lazy_imports(
@@ -66,6 +84,7 @@ with lazyimports.lazy_imports(".terminate_bot:terminate_bot"):
 __all__: list[str] = [
     'waitress_process',
     'slot_machine',
+    'slot_machine_sessions',
     'grifter_suppliers',
     'transfers_waiting_approval',
     'decrypted_transactions_spreadsheet',
@@ -89,10 +108,18 @@ __all__: list[str] = [
     'aml_office_thread_id',
     'DISCORD_TOKEN',
     'per_channel_checkpoint_limit',
-    'active_slot_machine_players',
+    'missed_messages_max_concurrent_channels',
     'starting_bonus_timeout',
+    'slot_machine_session_wait_timeout',
     'log',
     'blockchain',
+    'balance_index',
+    'chain_validator',
+    'ledger_writer',
+    'user_hash_index',
+    'save_data_cache',
+    'mined_messages_store',
+    'checkpoint_store',
     'run_bot',
     'setup_bot_environment',
     'intents',
@@ -100,5 +127,14 @@ __all__: list[str] = [
     'terminate_bot',
     'register_event_handlers',  # type: ignore
     'register_commands',  # type: ignore
-    'time_zone'
+    'time_zone',
+    'full_chain_validation_interval',
+    'save_data_flush_interval',
+    'checkpoint_flush_interval',
+    'save_data_backend',
+    'mined_messages_max_age',
+    'ledger_snapshot_interval',
+    'group_commit_enabled',
+    'group_commit_window_seconds',
+    'group_commit_max_batch_size'
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
 # region Imports
 # Standard library
 import core.global_state as g
+import signal
 from sys import exit as sys_exit
+from types import FrameType
 
 # Third party
 from discord import (Intents, Client)
@@ -10,22 +12,58 @@ from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
+from type_aliases import LedgerSnapshotData
 from bot_configuration import invoke_bot_configuration
+from core.terminate_bot import save_bot_state
+from models.balance_index import BalanceIndex
+from models.chain_validator import ChainValidator
+from models.checkpoints import CheckpointStore
 from models.grifter_suppliers import GrifterSuppliers
+from models.ledger_snapshot import LedgerSnapshot
+from models.ledger_writer import LedgerWriter
 from models.log import Log
+from models.mined_messages import MinedMessagesStore
+from models.save_data_backends import (
+    SaveDataBackend, create_save_data_backend)
+from models.save_data_cache import SaveDataCache
 from models.slot_machine import SlotMachine
+from models.slot_machine_sessions import SlotMachineSessions
 from models.transfers_waiting_approval import TransfersWaitingApproval
+from models.user_hash_index import UserHashIndex
 from utils.decrypt_transactions import DecryptedTransactionsSpreadsheet
 # FIXME blockchain gets defined both here and in the waitress thread
 from sponsorblockchain.sponsorblockchain_main import blockchain
 # endregion
 
 # region Bot setup
+
+
+class CasinoBot(commands.Bot):
+    """
+    The bot, which saves the state kept in memory (see save_bot_state())
+    whenever it is closed, including on Ctrl-C and SIGTERM.
+
+    Methods:
+        close():
+            Saves the bot state and closes the bot.
+    """
+
+    async def close(self) -> None:
+        """
+        Saves the bot state and closes the bot.
+        """
+        try:
+            await save_bot_state()
+        except Exception as e:
+            print(f"ERROR: Error saving bot state: {e}")
+        await super().close()
+
+
 print("Starting bot...")
 intents: Intents = Intents.default()
 intents.message_content = True
 intents.members = True
-g.bot = commands.Bot(command_prefix="!", intents=intents)
+g.bot = CasinoBot(command_prefix="!", intents=intents)
 client = Client(intents=intents)
 # endregion
 
@@ -45,6 +83,54 @@ def setup_bot_environment() -> None:
         print(f"ERROR: Error initializing blockchain: {e}")
         print("This script will be terminated.")
         sys_exit(1)
+    ledger_snapshot = LedgerSnapshot(interval=g.ledger_snapshot_interval)
+    snapshot_data: LedgerSnapshotData | None = ledger_snapshot.load()
+    try:
+        g.balance_index = BalanceIndex(snapshot=snapshot_data)
+    except Exception as e:
+        print(f"ERROR: Error initializing balance index: {e}")
+        print("This script will be terminated.")
+        sys_exit(1)
+    try:
+        save_data_backend: SaveDataBackend = (
+            create_save_data_backend(g.save_data_backend))
+    except Exception as e:
+        print(f"ERROR: Error initializing save data backend: {e}")
+        print("This script will be terminated.")
+        sys_exit(1)
+    g.save_data_cache = SaveDataCache(backend=save_data_backend)
+    g.mined_messages_store = MinedMessagesStore(
+        max_age=g.mined_messages_max_age)
+    g.checkpoint_store = CheckpointStore()
+    # A session that outlasts the starting bonus prompt twice is stuck
+    g.slot_machine_sessions = SlotMachineSessions(
+        wait_timeout=g.slot_machine_session_wait_timeout,
+        max_session_age=g.starting_bonus_timeout * 2)
+    try:
+        g.user_hash_index = UserHashIndex(
+            save_data_backend=save_data_backend)
+    except Exception as e:
+        print(f"ERROR: Error initializing user hash index: {e}")
+        print("This script will be terminated.")
+        sys_exit(1)
+    g.chain_validator = ChainValidator(
+        full_validation_interval=g.full_chain_validation_interval,
+        snapshot=snapshot_data)
+    if g.group_commit_enabled:
+        print("Group commit is enabled.")
+        g.ledger_writer = LedgerWriter(
+            blockchain=blockchain,
+            balance_index=g.balance_index,
+            chain_validator=g.chain_validator,
+            snapshot=ledger_snapshot,
+            window_seconds=g.group_commit_window_seconds,
+            max_batch_size=g.group_commit_max_batch_size)
+    else:
+        g.ledger_writer = LedgerWriter(
+            blockchain=blockchain,
+            balance_index=g.balance_index,
+            chain_validator=g.chain_validator,
+            snapshot=ledger_snapshot)
 
     invoke_bot_configuration()
 
@@ -62,6 +148,14 @@ def setup_bot_environment() -> None:
 # endregion
 
 # region Run bot
+def handle_sigterm(signal_number: int, frame: FrameType | None) -> None:
+    """
+    Turns SIGTERM into a KeyboardInterrupt, so that the bot shuts down the
+    same way as on Ctrl-C (closing the bot, which saves the bot state).
+    """
+    raise KeyboardInterrupt
+
+
 def run_bot() -> None:
     print("Running bot...")
     assert isinstance(g.bot, Bot), (
@@ -69,7 +163,15 @@ def run_bot() -> None:
     DISCORD_TOKEN: str | None = g.DISCORD_TOKEN
     if DISCORD_TOKEN is not None:
         print("Discord token found.")
-        g.bot.run(DISCORD_TOKEN)
+        signal.signal(signal.SIGTERM, handle_sigterm)
+        try:
+            g.bot.run(DISCORD_TOKEN)
+        finally:
+            # In case the bot stopped without being closed
+            if g.save_data_cache is not None:
+                g.save_data_cache.flush()
+            if g.checkpoint_store is not None:
+                g.checkpoint_store.flush()
     else:
         error_message: str = ("ERROR: DISCORD_TOKEN is not set "
                               "in the environment variables.")
@@ -14,11 +14,18 @@ if TYPE_CHECKING:
     from discord.ext.commands import Bot  # type: ignore
 
     # Local
-    from models.checkpoints import ChannelCheckpoints
+    from models.balance_index import BalanceIndex
+    from models.chain_validator import ChainValidator
+    from models.checkpoints import ChannelCheckpoints, CheckpointStore
     from models.grifter_suppliers import GrifterSuppliers
+    from models.ledger_writer import LedgerWriter
     from models.log import Log
+    from models.mined_messages import MinedMessagesStore
+    from models.save_data_cache import SaveDataCache
     from models.slot_machine import SlotMachine
+    from models.slot_machine_sessions import SlotMachineSessions
     from models.transfers_waiting_approval import TransfersWaitingApproval
+    from models.user_hash_index import UserHashIndex
     from utils.decrypt_transactions import DecryptedTransactionsSpreadsheet
     from sponsorblockchain.models.blockchain import Blockchain
 # endregion
@@ -33,14 +40,43 @@ DISCORD_TOKEN: str | None = getenv('DISCORD_TOKEN')
 
 # Number of messages to keep track of in each channel
 per_channel_checkpoint_limit: int = 3
-active_slot_machine_players: Dict[int, float] = {}
+# Number of channels whose missed messages are fetched at the same time
+missed_messages_max_concurrent_channels: int = 5
 starting_bonus_timeout: int = 30
+# Number of seconds a spin waits for the player's previous spin to finish
+slot_machine_session_wait_timeout: float = 2
 time_zone: str = "Canada/Central"
+# Number of seconds between full blockchain validations
+full_chain_validation_interval: int = 3600
+# Number of seconds between writes of changed save data to disk
+save_data_flush_interval: int = 5
+# Number of seconds between writes of changed channel checkpoints to disk
+checkpoint_flush_interval: int = 5
+# Storage of user save data: "json" (one file per user) or "sqlite" (one
+# database, see utils/migrate_save_data.py)
+save_data_backend: str = "json"
+# Number of seconds after which mined message IDs are forgotten (None keeps
+# them forever). Reactions to older messages can then be mined again
+mined_messages_max_age: int | None = None
+# Minimum number of seconds between ledger snapshots
+ledger_snapshot_interval: int = 300
+# Group commit packs transactions that arrive close together into one block
+group_commit_enabled: bool = False
+group_commit_window_seconds: float = 0.05
+group_commit_max_batch_size: int = 100
 
 waitress_process: "Popen[str] | None" = None
 log: "Log | None" = None
 blockchain: "Blockchain | None" = None
+balance_index: "BalanceIndex | None" = None
+chain_validator: "ChainValidator | None" = None
+ledger_writer: "LedgerWriter | None" = None
+user_hash_index: "UserHashIndex | None" = None
+save_data_cache: "SaveDataCache | None" = None
+mined_messages_store: "MinedMessagesStore | None" = None
+checkpoint_store: "CheckpointStore | None" = None
 slot_machine: "SlotMachine | None" = None
+slot_machine_sessions: "SlotMachineSessions | None" = None
 grifter_suppliers: "GrifterSuppliers | None" = None
 transfers_waiting_approval: "TransfersWaitingApproval | None" = None
 decrypted_transactions_spreadsheet: (
@@ -67,6 +103,4 @@ aml_office_thread_id: int = 0
 all_channel_checkpoints: "Dict[int, ChannelCheckpoints]" = {}
 
 about_command_formatted: str | None = None
-
-active_slot_machine_players: Dict[int, float] = {}
 # endregion
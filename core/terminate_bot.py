@@ -15,6 +15,36 @@ from discord.ext.commands import Bot  # type: ignore
 import core.global_state as g
 # endregion
 
+# region Save bot state
+
+
+async def save_bot_state() -> None:
+    """
+    Commits the queued transactions and saves a ledger snapshot (see
+    LedgerWriter.close()), writes the state that is only kept in
+    memory (the user save data and the channel checkpoints) to disk, and
+    saves the slot machine configuration. This is called whenever the bot
+    is closed, both on a normal shutdown and from terminate_bot(). Calling
+    it again does no harm.
+    """
+    if g.ledger_writer is not None:
+        print("Committing queued transactions...")
+        await g.ledger_writer.close()
+        print("Queued transactions committed.")
+    if g.save_data_cache is not None:
+        print("Saving user data...")
+        await g.save_data_cache.close()
+        print("User data saved.")
+    if g.checkpoint_store is not None:
+        print("Saving channel checkpoints...")
+        await g.checkpoint_store.close()
+        print("Channel checkpoints saved.")
+    if g.slot_machine is not None:
+        print("Saving slot machine configuration...")
+        g.slot_machine.save_config()
+        print("Slot machine configuration saved.")
+# endregion
+
 # region Terminate bot
 
 
@@ -30,6 +60,8 @@ async def terminate_bot() -> NoReturn:
     assert isinstance(g.waitress_process, Popen), (
         "waitress_process is not initialized")
     print("Closing bot...")
+    # Closing the bot also commits the queued transactions and saves the
+    # bot state (see save_bot_state())
     await g.bot.close()
     print("Bot closed.")
     print("Shutting down the blockchain app...")
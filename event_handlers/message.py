@@ -3,8 +3,7 @@
 from typing import List
 
 # Third party
-from discord import (Guild, Member, Message, MessageInteraction, User,
-                     TextChannel, VoiceChannel)
+from discord import Member, Message, MessageInteraction, User
 from discord.ext.commands import Bot  # type: ignore
 
 # Local
@@ -20,11 +19,11 @@ assert isinstance(g.bot, Bot), "bot is not initialized"
 async def on_message(message: Message) -> None:
     """
     Handles incoming messages and saves channel checkpoints.
-    If the channel ID of the incoming message is already in the global
-    `all_channel_checkpoints` dictionary, it saves the message ID to the
-    corresponding checkpoint. If the channel ID is not in the dictionary,
-    it creates a new `ChannelCheckpoints` instance for the channel and adds
-    it to the dictionary.
+    If the channel ID of the incoming message is not in the global
+    `all_channel_checkpoints` dictionary yet, the dictionary creates the
+    channel's checkpoints (see LazyChannelCheckpoints). Messages in
+    channels that have no checkpoints (e.g. direct messages and threads)
+    are ignored. The message ID is saved to the channel's checkpoints.
     Args:
         message (Message): The incoming message object.
     Returns:
@@ -36,43 +35,20 @@ async def on_message(message: Message) -> None:
     assert isinstance(g.grifter_suppliers, GrifterSuppliers)
     channel_id: int = message.channel.id
 
-    if channel_id in g.all_channel_checkpoints:
-        message_id: int = message.id
-        g.all_channel_checkpoints[channel_id].save(message_id)
-        del message_id
-    else:
-        # If a channel is created while the bot is running, we will likely end
-        # up here.
-        # Add a new instance of ChannelCheckpoints to
-        # the all_channel_checkpoints dictionary for this new channel.
-        guild: Guild | None = message.guild
-        if guild is None:
-            # TODO Ensure checkpoints work threads
-            # print("ERROR: Guild is None.")
-            # administrator: str = (
-            #     (await bot.fetch_user(administrator_id)).mention)
-            # await message.channel.send("An error occurred. "
-            #                            f"{administrator} pls fix.")
-            raise Exception("Guild is None.")
-        guild_name: str = guild.name
-        guild_id: int = guild.id
-        channel = message.channel
-        if ((isinstance(channel, TextChannel)) or
-                isinstance(channel, VoiceChannel)):
-            channel_name: str = channel.name
-            g.all_channel_checkpoints[channel_id] = ChannelCheckpoints(
-                guild_name=guild_name,
-                guild_id=guild_id,
-                channel_name=channel_name,
-                channel_id=channel_id
-            )
-        else:
-            # print("ERROR: Channel is not a text channel or voice channel.")
-            # administrator: str = (
-            #     (await g.bot.fetch_user(ADMINISTRATOR_ID)).mention)
-            # await message.channel.send("An error occurred. "
-            #                            f"{administrator} pls fix.")
-            return
+    # The checkpoints of a channel are created the first time a message
+    # is sent in it (also if the channel is created while the bot is
+    # running)
+    # TODO Ensure checkpoints work threads
+    channel_checkpoints: ChannelCheckpoints
+    try:
+        channel_checkpoints = g.all_channel_checkpoints[channel_id]
+    except KeyError:
+        # Not a text channel or voice channel
+        return
+    message_id: int = message.id
+    channel_checkpoints.save(message_id)
+    del message_id
+    del channel_checkpoints
 
     # Look for GrifterSwap messages
     message_author: User | Member = message.author
@@ -9,7 +9,8 @@ from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
-from models.checkpoints import start_checkpoints
+from models.checkpoints import CheckpointStore, start_checkpoints
+from models.save_data_cache import SaveDataCache
 from utils.missed_messages import process_missed_messages
 # endregion
 
@@ -24,13 +25,21 @@ async def on_ready() -> None:
     Event handler that is called when the bot is ready.
     This function performs the following actions:
     - Prints a message indicating that the bot has started.
-    - Initializes global checkpoints for all channels.
+    - Starts writing changed save data and checkpoints to disk
+      periodically.
+    - Initializes global checkpoints (created for each channel on first use).
     - Attempts to sync the bot's commands with Discord and prints the result.
     If an error occurs during the command sync process, it catches the exception
     and prints an error message.
     """
     assert isinstance(g.bot, Bot), "g.bot has not been initialized."
+    assert isinstance(g.save_data_cache, SaveDataCache), (
+        "g.save_data_cache has not been initialized.")
+    assert isinstance(g.checkpoint_store, CheckpointStore), (
+        "g.checkpoint_store has not been initialized.")
     print("Bot started.")
+    g.save_data_cache.start_flushing(g.save_data_flush_interval)
+    g.checkpoint_store.start_flushing(g.checkpoint_flush_interval)
     g.all_channel_checkpoints = (
         await start_checkpoints(limit=g.per_channel_checkpoint_limit))
     await process_missed_messages(limit=50)
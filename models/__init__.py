@@ -4,9 +4,17 @@ Contains classes and functions for handling user data, blockchain interactions,
 checkpoints, and other core functionality.
 """
 
+# Import from balance_index.py
+from .balance_index import BalanceIndex
+
+# Import from chain_validator.py
+from .chain_validator import ChainValidator
+
 # Import from checkpoints.py
 from .checkpoints import (
+    CheckpointStore,
     ChannelCheckpoints,
+    LazyChannelCheckpoints,
     start_checkpoints)
 
 # Import from grifter_suppliers.py
@@ -17,24 +25,69 @@ from .grifter_suppliers import (
 # Import from guild_list.py
 from .guild_list import load_guild_ids
 
+# Import from ledger_snapshot.py
+from .ledger_snapshot import LedgerSnapshot
+
+# Import from ledger_writer.py
+from .ledger_writer import LedgerWriter
+
 # Import from log.py
 from .log import Log
 
+# Import from mined_messages.py
+from .mined_messages import (
+    MinedMessages,
+    MinedMessagesStore,
+    snowflake_timestamp)
+
+# Import from save_data_backends.py
+from .save_data_backends import (
+    SaveDataBackend,
+    JsonSaveDataBackend,
+    SqliteSaveDataBackend,
+    create_save_data_backend)
+
+# Import from save_data_cache.py
+from .save_data_cache import SaveDataCache
+
 # Import from slot_machine.py
 from .slot_machine import SlotMachine, reinitialize_slot_machine
 
+# Import from slot_machine_sessions.py
+from .slot_machine_sessions import SlotMachineSessions
+
+# Import from slot_simulator.py
+from .slot_simulator import SlotSimulator
+
+# Import from transaction_batcher.py
+from .transaction_batcher import TransactionBatcher
+
+# Import from transaction_user_index.py
+from .transaction_user_index import TransactionUserIndex
+
 # Import from transfers_waiting_approval.py
 from .transfers_waiting_approval import (
     TransfersWaitingApproval,
     reinitialize_transfers_waiting_approval,
     get_aml_officer_role)
 
+# Import from user_hash_index.py
+from .user_hash_index import UserHashIndex, hash_user_id
+
 # Import from user_save_data.py
 from .user_save_data import UserSaveData
 
 __all__: list[str] = [
+    # Balance index
+    'BalanceIndex',
+
+    # Chain validator
+    'ChainValidator',
+
     # Checkpoints
+    'CheckpointStore',
     'ChannelCheckpoints',
+    'LazyChannelCheckpoints',
     'start_checkpoints',
     
     # Grifter suppliers
@@ -44,13 +97,49 @@ __all__: list[str] = [
     # Guild list
     'load_guild_ids',
     
+    # Ledger snapshot
+    'LedgerSnapshot',
+
+    # Ledger writer
+    'LedgerWriter',
+
     # Log
     'Log',
 
+    # Mined messages
+    'MinedMessages',
+    'MinedMessagesStore',
+    'snowflake_timestamp',
+
+    # Save data backends
+    'SaveDataBackend',
+    'JsonSaveDataBackend',
+    'SqliteSaveDataBackend',
+    'create_save_data_backend',
+
+    # Save data cache
+    'SaveDataCache',
+
     # Slot machine
     'SlotMachine',
     'reinitialize_slot_machine',
 
+    # Slot machine sessions
+    'SlotMachineSessions',
+
+    # Slot simulator
+    'SlotSimulator',
+
+    # Transaction batcher
+    'TransactionBatcher',
+
+    # Transaction user index
+    'TransactionUserIndex',
+
+    # User hash index
+    'UserHashIndex',
+    'hash_user_id',
+
     # User save data
     'UserSaveData',
     
@@ -0,0 +1,229 @@
+# region Imports
+# Standard library
+from os.path import exists, getsize
+from typing import Any, Dict, List
+
+# Local
+from type_aliases import LedgerSnapshotData
+from models.chain_reader import read_blocks, get_block_transactions
+from models.user_hash_index import hash_user_id
+from sponsorblockchain.sponsorblockchain_type_aliases import TransactionDict
+# endregion
+
+# region Balance index
+
+
+class BalanceIndex:
+    """
+    Keeps the balance of every user in memory, so that balance lookups do not
+    have to go through the whole blockchain.
+
+    The index is built from the blockchain file when it is initialized (or
+    restored from a ledger snapshot, see LedgerSnapshot), and then kept up
+    to date by reading only the blocks that have been appended
+    since the last time it was updated. Blocks added by another process (like
+    the blockchain app) are also picked up this way.
+
+    Attributes:
+        file_name: The path to the blockchain file.
+        balances: The balance of each user, keyed by the user ID hash.
+        height: The number of blocks that have been indexed.
+        offset: The byte offset in the blockchain file up to which blocks
+            have been indexed.
+        last_block: The last indexed block as a dictionary.
+        last_block_offset: The byte offset at which the last indexed
+            block starts.
+
+    Methods:
+        __init__(file_name = "data/blockchain.json", snapshot):
+            Initializes the index and builds it from the blockchain file,
+            or from a snapshot.
+        rebuild():
+            Builds the index from scratch.
+        restore(snapshot):
+            Restores the index from a snapshot and indexes the blocks
+            appended after it.
+        catch_up():
+            Indexes the blocks appended since the last update.
+        apply_transaction(transaction):
+            Applies a transaction to the balances.
+        get_balance(user, user_unhashed):
+            Gets the balance of a user.
+        recount():
+            Counts all balances from the blockchain file without using
+            the index.
+        verify():
+            Checks that the index matches a full recount.
+    """
+
+    def __init__(self,
+                 file_name: str = "data/blockchain.json",
+                 snapshot: LedgerSnapshotData | None = None) -> None:
+        """
+        Initializes the balance index and builds it from the blockchain file.
+        If a snapshot is given, only the blocks appended after it are read.
+
+        Args:
+            file_name: The path to the blockchain file. Defaults to
+                "data/blockchain.json".
+            snapshot: A ledger snapshot to start from. Defaults to None.
+        """
+        print("Initializing balance index...")
+        self.file_name: str = file_name
+        self.balances: Dict[str, int] = {}
+        self.height: int = 0
+        self.offset: int = 0
+        self.last_block: Dict[str, Any] | None = None
+        self.last_block_offset: int = 0
+        if snapshot is None:
+            self.rebuild()
+        else:
+            self.restore(snapshot)
+        print("Balance index initialized.")
+
+    def rebuild(self) -> None:
+        """
+        Builds the index from scratch by reading the whole blockchain file.
+        """
+        print("Building balance index...")
+        self.balances = {}
+        self.height = 0
+        self.offset = 0
+        self.last_block = None
+        self.last_block_offset = 0
+        self.catch_up()
+        print(f"Balance index built ({self.height} blocks, "
+              f"{len(self.balances)} users).")
+
+    def restore(self, snapshot: LedgerSnapshotData) -> None:
+        """
+        Restores the index from a snapshot, and then indexes the blocks that
+        have been appended since the snapshot was taken.
+
+        Args:
+            snapshot: The ledger snapshot.
+        """
+        print(f"Restoring balance index from snapshot "
+              f"({snapshot['height']} blocks)...")
+        self.balances = dict(snapshot["balances"])
+        self.height = snapshot["height"]
+        self.offset = snapshot["offset"]
+        self.last_block = snapshot["last_block"]
+        self.last_block_offset = snapshot["last_block_offset"]
+        blocks_indexed: int = self.catch_up()
+        print(f"Balance index restored ({blocks_indexed} blocks replayed, "
+              f"{len(self.balances)} users).")
+
+    def catch_up(self) -> int:
+        """
+        Indexes the blocks that have been appended to the blockchain file since
+        the last update. If the file has not grown, nothing is read.
+
+        Returns:
+            int: The number of blocks that were indexed.
+        """
+        if not exists(self.file_name):
+            return 0
+        file_size: int = getsize(self.file_name)
+        if file_size < self.offset:
+            print("WARNING: The blockchain file has shrunk. "
+                  "The balance index will be rebuilt.")
+            self.rebuild()
+            return self.height
+        if file_size == self.offset:
+            return 0
+        blocks_indexed: int = 0
+        block: Dict[str, Any]
+        end_offset: int
+        for block, end_offset in read_blocks(self.file_name, self.offset):
+            for transaction in get_block_transactions(block):
+                self.apply_transaction(transaction)
+            self.height += 1
+            self.last_block_offset = self.offset
+            self.offset = end_offset
+            self.last_block = block
+            blocks_indexed += 1
+        return blocks_indexed
+
+    def apply_transaction(self, transaction: TransactionDict) -> None:
+        """
+        Applies a transaction to the balances.
+
+        Args:
+            transaction: The transaction to apply.
+        """
+        sender: str = transaction["sender"]
+        receiver: str = transaction["receiver"]
+        amount: int = transaction["amount"]
+        self.balances[sender] = self.balances.get(sender, 0) - amount
+        self.balances[receiver] = self.balances.get(receiver, 0) + amount
+
+    def get_balance(self,
+                    user: str | None = None,
+                    user_unhashed: int | None = None) -> int | None:
+        """
+        Gets the balance of a user.
+
+        Args:
+            user: The user ID hash.
+            user_unhashed: The user ID. Used if `user` is not provided.
+
+        Returns:
+            int | None: The balance of the user, or None if the user has no
+                transactions.
+        """
+        if user is None:
+            if user_unhashed is None:
+                raise ValueError("Either user or user_unhashed "
+                                 "must be provided.")
+            user = hash_user_id(user_unhashed)
+        self.catch_up()
+        return self.balances.get(user)
+
+    def recount(self) -> Dict[str, int]:
+        """
+        Counts the balances of all users from the blockchain file without
+        using the index. Only the blocks up to the index's offset are counted,
+        so that blocks appended in the meantime do not cause a mismatch.
+
+        Returns:
+            Dict[str, int]: The balance of each user, keyed by the user
+                ID hash.
+        """
+        balances: Dict[str, int] = {}
+        for block, end_offset in read_blocks(self.file_name):
+            if end_offset > self.offset:
+                break
+            transactions: List[TransactionDict] = (
+                get_block_transactions(block))
+            for transaction in transactions:
+                sender: str = transaction["sender"]
+                receiver: str = transaction["receiver"]
+                amount: int = transaction["amount"]
+                balances[sender] = balances.get(sender, 0) - amount
+                balances[receiver] = balances.get(receiver, 0) + amount
+        return balances
+
+    def verify(self) -> bool:
+        """
+        Checks that the index matches a full recount of the blockchain file.
+
+        Returns:
+            bool: True if the index is consistent, otherwise False.
+        """
+        print("Verifying balance index...")
+        self.catch_up()
+        recounted_balances: Dict[str, int] = self.recount()
+        mismatches: List[str] = []
+        all_users: set[str] = (
+            set(recounted_balances) | set(self.balances))
+        for user in all_users:
+            if recounted_balances.get(user) != self.balances.get(user):
+                mismatches.append(user)
+        if len(mismatches) > 0:
+            print(f"ERROR: Balance index does not match the blockchain for "
+                  f"{len(mismatches)} users.")
+            return False
+        print("Balance index verified.")
+        return True
+# endregion
@@ -0,0 +1,92 @@
+# region Imports
+# Standard library
+import json
+from os.path import exists
+from typing import Any, Dict, Iterator, List, cast
+
+# Local
+from sponsorblockchain.sponsorblockchain_type_aliases import TransactionDict
+from sponsorblockchain.models.block import Block
+# endregion
+
+# region Chain reader
+
+
+def read_blocks(file_name: str,
+                offset: int = 0) -> Iterator[tuple[Dict[str, Any], int]]:
+    """
+    Reads the blocks that have been written to the blockchain file after
+    the given byte offset. The blockchain file stores one JSON encoded block
+    per line.
+
+    A line that cannot be decoded is assumed to still be in the process of
+    being written by the blockchain, so reading stops there. It will be read
+    on the next call, as long as the caller resumes from the last offset that
+    was yielded.
+
+    Args:
+        file_name: The path to the blockchain file.
+        offset: The byte offset to start reading from. Defaults to 0.
+
+    Yields:
+        tuple: A tuple containing:
+            - block: The block as a dictionary.
+            - end_offset: The byte offset right after the block's line.
+    """
+    if not exists(file_name):
+        return
+    with open(file_name, "rb") as file:
+        file.seek(offset)
+        end_offset: int = offset
+        for line in file:
+            line_stripped: bytes = line.strip()
+            if line_stripped == b"":
+                end_offset += len(line)
+                continue
+            try:
+                block: Dict[str, Any] = json.loads(line_stripped)
+            except json.JSONDecodeError:
+                # Partially written block
+                return
+            end_offset += len(line)
+            yield (block, end_offset)
+
+
+def get_block_transactions(block: Dict[str, Any]) -> List[TransactionDict]:
+    """
+    Gets the transactions stored in a block's data.
+
+    Args:
+        block: The block as a dictionary.
+
+    Returns:
+        List[TransactionDict]: The transactions in the block. Data entries that
+            are not transactions (like the genesis block's data) are skipped.
+    """
+    transactions: List[TransactionDict] = []
+    block_data: List[Any] | Any = block.get("data", [])
+    if not isinstance(block_data, list):
+        return transactions
+    for entry in cast(List[Any], block_data):
+        if isinstance(entry, dict) and "transaction" in entry:
+            transactions.append(
+                cast(TransactionDict, entry["transaction"]))
+    return transactions
+
+
+def block_from_dict(block: Dict[str, Any]) -> Block:
+    """
+    Creates a Block object from a block read from the blockchain file.
+
+    Args:
+        block: The block as a dictionary.
+
+    Returns:
+        Block: The block object.
+    """
+    return Block(index=block["index"],
+                 timestamp=block["timestamp"],
+                 data=block["data"],
+                 previous_block_hash=block["previous_block_hash"],
+                 nonce=block.get("nonce", 0))
+# endregion
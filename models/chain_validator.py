@@ -0,0 +1,207 @@
+# region Imports
+# Standard library
+from os.path import exists, getsize
+from time import time
+from typing import Any, Dict
+
+# Local
+from type_aliases import LedgerSnapshotData
+from models.chain_reader import read_blocks, block_from_dict
+# endregion
+
+# region Chain validator
+
+
+class ChainValidator:
+    """
+    Validates the blockchain incrementally.
+
+    The validator keeps a watermark of the blocks that have already been
+    verified. Each validation only checks the blocks appended after the
+    watermark, including the link between the watermark block and the next
+    block. A full validation from the genesis block runs on a schedule, or
+    on demand.
+
+    Attributes:
+        file_name: The path to the blockchain file.
+        full_validation_interval: The number of seconds between full
+            validations. If None, full validations only run on demand.
+        validated_height: The number of blocks that have been validated.
+        validated_offset: The byte offset in the blockchain file up to which
+            blocks have been validated.
+        last_block_hash: The hash of the last validated block.
+        last_block_index: The index of the last validated block.
+        last_full_validation: When the last full validation finished.
+
+    Methods:
+        __init__(file_name = "data/blockchain.json", full_validation_interval,
+            snapshot):
+            Initializes the validator.
+        restore(snapshot):
+            Restores the watermark from a snapshot.
+        validate(full):
+            Validates the blocks appended since the last validation, or the
+            whole chain if a full validation is due or requested.
+        validate_new_blocks():
+            Validates the blocks appended after the watermark.
+        validate_full():
+            Validates the whole chain.
+        full_validation_due():
+            Checks if it is time for a scheduled full validation.
+        """
+
+    def __init__(self,
+                 file_name: str = "data/blockchain.json",
+                 full_validation_interval: float | None = 3600,
+                 snapshot: LedgerSnapshotData | None = None) -> None:
+        """
+        Initializes the chain validator. No blocks are considered validated
+        until the first validation has run, unless a snapshot is given.
+
+        Args:
+            file_name: The path to the blockchain file. Defaults to
+                "data/blockchain.json".
+            full_validation_interval: The number of seconds between full
+                validations. If None, full validations only run on demand.
+                Defaults to 3600.
+            snapshot: A ledger snapshot to take the watermark from. Defaults
+                to None.
+        """
+        self.file_name: str = file_name
+        self.full_validation_interval: float | None = full_validation_interval
+        self.validated_height: int = 0
+        self.validated_offset: int = 0
+        self.last_block_hash: str | None = None
+        self.last_block_index: int | None = None
+        self.last_full_validation: float | None = None
+        if snapshot is not None:
+            self.restore(snapshot)
+
+    def restore(self, snapshot: LedgerSnapshotData) -> None:
+        """
+        Restores the watermark from a snapshot. The blocks up to the
+        watermark are considered validated, and the full validation schedule
+        continues from the snapshot's last full validation.
+
+        Args:
+            snapshot: The ledger snapshot.
+        """
+        self.validated_height = snapshot["validated_height"]
+        self.validated_offset = snapshot["validated_offset"]
+        self.last_block_hash = snapshot["last_validated_block_hash"]
+        self.last_block_index = snapshot["last_validated_block_index"]
+        self.last_full_validation = snapshot["last_full_validation"]
+
+    def validate(self, full: bool = False) -> bool:
+        """
+        Validates the blocks appended since the last validation. The whole
+        chain is validated instead if a full validation is due, or if `full`
+        is True.
+
+        Args:
+            full: Whether to validate the whole chain. Defaults to False.
+
+        Returns:
+            bool: True if the chain is valid, otherwise False.
+        """
+        if full or self.full_validation_due():
+            return self.validate_full()
+        return self.validate_new_blocks()
+
+    def full_validation_due(self) -> bool:
+        """
+        Checks if it is time for a scheduled full validation.
+
+        Returns:
+            bool: True if a full validation should run, otherwise False.
+        """
+        if self.last_full_validation is None:
+            return True
+        if self.full_validation_interval is None:
+            return False
+        seconds_since_full_validation: float = (
+            time() - self.last_full_validation)
+        return seconds_since_full_validation >= self.full_validation_interval
+
+    def validate_full(self) -> bool:
+        """
+        Validates the whole chain, starting from the genesis block.
+
+        Returns:
+            bool: True if the chain is valid, otherwise False.
+        """
+        print("Validating the whole blockchain...")
+        self.validated_height = 0
+        self.validated_offset = 0
+        self.last_block_hash = None
+        self.last_block_index = None
+        chain_validity: bool = self.validate_new_blocks()
+        if chain_validity:
+            self.last_full_validation = time()
+            print(f"Blockchain validated ({self.validated_height} blocks).")
+        return chain_validity
+
+    def validate_new_blocks(self) -> bool:
+        """
+        Validates the blocks appended after the watermark. The watermark is
+        moved forward for every block that passes validation.
+
+        Returns:
+            bool: True if all new blocks are valid, otherwise False.
+        """
+        if not exists(self.file_name):
+            print("ERROR: Blockchain file not found.")
+            return False
+        file_size: int = getsize(self.file_name)
+        if file_size < self.validated_offset:
+            print("ERROR: The blockchain file has shrunk "
+                  "since it was last validated.")
+            return self.validate_full()
+        if file_size == self.validated_offset:
+            return True
+        block: Dict[str, Any]
+        end_offset: int
+        for block, end_offset in read_blocks(self.file_name,
+                                             self.validated_offset):
+            if not self._validate_block(block):
+                return False
+            self.validated_height += 1
+            self.validated_offset = end_offset
+            self.last_block_hash = block["block_hash"]
+            self.last_block_index = block["index"]
+        return True
+
+    def _validate_block(self, block: Dict[str, Any]) -> bool:
+        """
+        Validates a block against its own hash and the last validated block.
+
+        Args:
+            block: The block as a dictionary.
+
+        Returns:
+            bool: True if the block is valid, otherwise False.
+        """
+        block_index: int = block["index"]
+        try:
+            calculated_hash: str = block_from_dict(block).calculate_hash()
+        except Exception as e:
+            print(f"ERROR: Could not calculate the hash "
+                  f"of block {block_index}: {e}")
+            return False
+        if calculated_hash != block["block_hash"]:
+            print(f"ERROR: Block {block_index} has an invalid hash.")
+            return False
+        if self.last_block_hash is None:
+            # Genesis block
+            return True
+        if block["previous_block_hash"] != self.last_block_hash:
+            print(f"ERROR: Block {block_index} does not link to "
+                  f"block {self.last_block_index}.")
+            return False
+        if (self.last_block_index is not None and
+                block_index != self.last_block_index + 1):
+            print(f"ERROR: Block {block_index} does not follow "
+                  f"block {self.last_block_index}.")
+            return False
+        return True
+# endregion
@@ -1,15 +1,297 @@
 # region Imports
 # Standard library
+import asyncio
 import json
-from os import makedirs
-from os.path import exists
+from os import listdir, makedirs, replace
+from os.path import dirname, exists, isdir
+from time import time
 from typing import Dict, List
 
 # Third party
+from discord import (TextChannel, VoiceChannel, CategoryChannel,
+                     ForumChannel, StageChannel, Thread)
+from discord.abc import PrivateChannel
 from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
+from type_aliases import ChannelCheckpointData
+# endregion
+
+# region Checkpoint store
+
+
+class CheckpointStore:
+    """
+    Keeps the checkpoints of all channels in memory and stores them in a
+    single JSON file.
+
+    New checkpoints only change the memory. The file is rewritten when
+    flush() is called (periodically, see start_flushing(), and when the bot
+    shuts down), by writing a temporary file and renaming it, so a crash
+    never leaves a partially written file behind.
+
+    Checkpoints from the per-channel files that were used before
+    (data/checkpoints/guilds/<guild ID>/channels/<channel ID>) are imported
+    the first time the store is loaded.
+
+    Attributes:
+        file_name: The path to the checkpoint file.
+        legacy_directory: The directory of the per-channel checkpoint files.
+        channels: The checkpoints of each channel, keyed by the channel ID.
+        dirty: Whether the checkpoints have changed since the last flush.
+
+    Methods:
+        __init__(file_name = "data/checkpoints/checkpoints.json",
+                 legacy_directory = "data/checkpoints/guilds"):
+            Initializes the store and loads the checkpoints.
+        load():
+            Loads the checkpoints from the file.
+        get(channel_id):
+            Gets the checkpoints of a channel.
+        save(guild_name, guild_id, channel_name, channel_id, message_id,
+             max_checkpoints):
+            Adds a checkpoint to a channel.
+        flush():
+            Writes the checkpoints to the file if they have changed.
+        start_flushing(interval):
+            Starts flushing periodically.
+        close():
+            Stops flushing periodically and flushes.
+    """
+
+    def __init__(self,
+                 file_name: str = "data/checkpoints/checkpoints.json",
+                 legacy_directory: str = "data/checkpoints/guilds") -> None:
+        """
+        Initializes the checkpoint store and loads the checkpoints.
+
+        Args:
+            file_name: The path to the checkpoint file. Defaults to
+                "data/checkpoints/checkpoints.json".
+            legacy_directory: The directory of the per-channel checkpoint
+                files. Defaults to "data/checkpoints/guilds".
+        """
+        self.file_name: str = file_name
+        self.legacy_directory: str = legacy_directory
+        self.channels: Dict[int, ChannelCheckpointData] = {}
+        self.dirty: bool = False
+        self._flush_task: asyncio.Task[None] | None = None
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the checkpoints from the file. If the file does not exist, the
+        per-channel checkpoint files are imported instead. A file that
+        cannot be read is renamed (to `<file name>.broken-<timestamp>`) and
+        the store starts empty, so that the next flush does not overwrite
+        the checkpoints in it.
+        """
+        self.channels = {}
+        self.dirty = False
+        if not exists(self.file_name):
+            imported: int = self._import_legacy_files()
+            if imported > 0:
+                print(f"Imported checkpoints of {imported} channels.")
+                self.dirty = True
+            return
+        try:
+            with open(self.file_name, "r") as file:
+                channels: Dict[str, ChannelCheckpointData] = (
+                    json.load(file)["channels"])
+        except Exception as e:
+            broken_file_name: str = f"{self.file_name}.broken-{int(time())}"
+            print(f"ERROR: Error loading checkpoints: {e}\n"
+                  f"The checkpoint file will be moved to "
+                  f"'{broken_file_name}'.")
+            replace(self.file_name, broken_file_name)
+            return
+        for channel_id, channel_checkpoints in channels.items():
+            self.channels[int(channel_id)] = channel_checkpoints
+
+    def _import_legacy_files(self) -> int:
+        """
+        Imports the checkpoints from the per-channel checkpoint files.
+
+        Returns:
+            int: The number of channels imported.
+        """
+        if not isdir(self.legacy_directory):
+            return 0
+        imported: int = 0
+        for guild_id in listdir(self.legacy_directory):
+            guild_directory: str = f"{self.legacy_directory}/{guild_id}"
+            channels_directory: str = f"{guild_directory}/channels"
+            if not guild_id.isdigit() or not isdir(channels_directory):
+                continue
+            guild_name: str = self._read_name(
+                f"{guild_directory}/guild_name.json", "guild_name")
+            for channel_id in listdir(channels_directory):
+                channel_directory: str = f"{channels_directory}/{channel_id}"
+                checkpoints_file_name: str = (
+                    f"{channel_directory}/channel_checkpoints.json")
+                if not channel_id.isdigit() or not exists(
+                        checkpoints_file_name):
+                    continue
+                last_message_ids: List[int] = []
+                try:
+                    with open(checkpoints_file_name, "r") as file:
+                        for line in file:
+                            if line.strip() != "":
+                                last_message_ids.append(
+                                    int(json.loads(line)["last_message_id"]))
+                except Exception as e:
+                    print("ERROR: Error importing checkpoints from "
+                          f"'{checkpoints_file_name}': {e}")
+                    continue
+                self.channels[int(channel_id)] = {
+                    "guild_id": int(guild_id),
+                    "guild_name": guild_name,
+                    "channel_name": self._read_name(
+                        f"{channel_directory}/channel_name.json",
+                        "channel_name"),
+                    "last_message_ids": last_message_ids
+                }
+                imported += 1
+        return imported
+
+    def _read_name(self, file_name: str, key: str) -> str:
+        """
+        Reads a guild or channel name from a legacy name file.
+
+        Args:
+            file_name: The path to the name file.
+            key: The key of the name.
+
+        Returns:
+            str: The name, or an empty string if it could not be read.
+        """
+        if not exists(file_name):
+            return ""
+        try:
+            with open(file_name, "r") as file:
+                return str(json.load(file)[key])
+        except Exception as e:
+            print(f"ERROR: Error reading '{file_name}': {e}")
+            return ""
+
+    def get(self, channel_id: int) -> ChannelCheckpointData | None:
+        """
+        Gets the checkpoints of a channel.
+
+        Args:
+            channel_id: The channel ID.
+
+        Returns:
+            ChannelCheckpointData | None: The checkpoints, or None if the
+                channel has none.
+        """
+        return self.channels.get(channel_id)
+
+    def save(self,
+             guild_name: str,
+             guild_id: int,
+             channel_name: str,
+             channel_id: int,
+             message_id: int,
+             max_checkpoints: int = 10) -> None:
+        """
+        Adds a checkpoint to a channel. If the channel has more than
+        `max_checkpoints` checkpoints, the oldest ones are removed.
+        The change is written on the next flush.
+
+        Args:
+            guild_name: The name of the guild.
+            guild_id: The ID of the guild.
+            channel_name: The name of the channel.
+            channel_id: The ID of the channel.
+            message_id: The ID of the message to save as a checkpoint.
+            max_checkpoints: The maximum number of checkpoints. Defaults
+                to 10.
+        """
+        channel_checkpoints: ChannelCheckpointData | None = (
+            self.channels.get(channel_id))
+        if channel_checkpoints is None:
+            channel_checkpoints = {
+                "guild_id": guild_id,
+                "guild_name": guild_name,
+                "channel_name": channel_name,
+                "last_message_ids": []
+            }
+            self.channels[channel_id] = channel_checkpoints
+        else:
+            # Channel names can change, but the IDs will not
+            channel_checkpoints["guild_name"] = guild_name
+            channel_checkpoints["channel_name"] = channel_name
+        last_message_ids: List[int] = channel_checkpoints["last_message_ids"]
+        last_message_ids.append(message_id)
+        if len(last_message_ids) > max_checkpoints:
+            del last_message_ids[:len(last_message_ids) - max_checkpoints]
+        self.dirty = True
+
+    def flush(self) -> bool:
+        """
+        Writes the checkpoints to the file if they have changed since the
+        last flush.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        if not self.dirty:
+            return False
+        directory: str = dirname(self.file_name)
+        temporary_file_name: str = self.file_name + ".tmp"
+        try:
+            if directory != "":
+                makedirs(directory, exist_ok=True)
+            with open(temporary_file_name, "w") as file:
+                json.dump({"channels": {
+                    str(channel_id): channel_checkpoints
+                    for channel_id, channel_checkpoints
+                    in self.channels.items()}}, file)
+            replace(temporary_file_name, self.file_name)
+        except Exception as e:
+            print(f"ERROR: Error writing checkpoints: {e}")
+            return False
+        self.dirty = False
+        return True
+
+    async def _flush_periodically(self, interval: float) -> None:
+        """
+        Flushes the checkpoints every `interval` seconds.
+
+        Args:
+            interval: The number of seconds between flushes.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.flush()
+
+    def start_flushing(self, interval: float) -> None:
+        """
+        Starts flushing the checkpoints periodically. Does nothing if it has
+        already been started.
+
+        Args:
+            interval: The number of seconds between flushes.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(
+            self._flush_periodically(interval))
+
+    async def close(self) -> None:
+        """
+        Stops flushing periodically and writes the checkpoints to the file.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        self.flush()
 # endregion
 
 # region Checkpoints
@@ -17,7 +299,8 @@ class ChannelCheckpoints:
     """
     ChannelCheckpoints is a class that manages checkpoints for a specific
     channel in a guild. It allows for saving, loading, and managing
-    message IDs as checkpoints.
+    message IDs as checkpoints. The checkpoints are kept in a
+    CheckpointStore.
 
     Methods:
         __init__(self,
@@ -25,19 +308,15 @@ class ChannelCheckpoints:
             guild_id,
             channel_name,
             channel_id,
-            max_checkpoints):
+            max_checkpoints,
+            store):
             Initializes checkpoints for a channel in a guild.
-        count_lines(self):
-        create(self):
-            Creates a checkpoint file for the channel, including necessary
-            directories and metadata files.
         save(self, message_id):
-            Saves the given message ID as a checkpoint in the file.
+            Saves the given message ID as a checkpoint.
             If the number of checkpoints exceeds the maximum allowed, the
             oldest checkpoint is removed.
-        remove_first_line(self):
         load(self):
-            Loads the checkpoints from the file specified by self.file_name.
+            Loads the checkpoints from the checkpoint store.
         """
 
     def __init__(self,
@@ -45,7 +324,8 @@ class ChannelCheckpoints:
                  guild_id: int,
                  channel_name: str,
                  channel_id: int,
-                 max_checkpoints: int = 10) -> None:
+                 max_checkpoints: int = 10,
+                 store: CheckpointStore | None = None) -> None:
         """
         Initialize checkpoints for a channel in a guild.
 
@@ -55,6 +335,7 @@ class ChannelCheckpoints:
             channel_name: The name of the channel
             channel_id: The ID of the channel
             max_checkpoints: The maximum number of checkpoints
+            store: The checkpoint store. Defaults to g.checkpoint_store.
 
         Attributes:
             max_checkpoints: The maximum number of checkpoints
@@ -62,177 +343,150 @@ class ChannelCheckpoints:
             guild_id: The ID of the guild
             channel_name: The name of the channel
             channel_id: The ID of the channel
-            directory: The directory path for storing checkpoints
-            file_name: The file name for storing channel checkpoints
-            entry_count: The count of entries in the checkpoints file
+            store: The checkpoint store
+            entry_count: The number of checkpoints
             last_message_ids: The last message IDs in the channel
         """
+        if store is None:
+            store = g.checkpoint_store
+        assert isinstance(store, CheckpointStore), (
+            "g.checkpoint_store has not been initialized.")
         self.max_checkpoints: int = max_checkpoints
         self.guild_name: str = guild_name
         self.guild_id: int = guild_id
         self.channel_name: str = channel_name
         self.channel_id: int = channel_id
-        self.directory: str = (f"data/checkpoints/guilds/{self.guild_id}"
-                               f"/channels/{self.channel_id}")
-        self.file_name: str = f"{self.directory}/channel_checkpoints.json"
-        self.entry_count: int = self.count_lines()
+        self.store: CheckpointStore = store
         self.last_message_ids: List[Dict[str, int]] | None = self.load()
-
-    def count_lines(self) -> int:
-        """
-        Counts the number of lines in the file specified by self.file_name.
-        Returns:
-            int: The number of lines in the file. Returns 0 if the file
-                does not exist.
-        """
-        if not exists(self.file_name):
-            return 0
-
-        with open(self.file_name, "r") as file:
-            count: int = sum(1 for _ in file)
-            return count
-
-    def create(self) -> None:
-        """
-        Creates an checkpoint file for the channel.
-
-        This method performs the following tasks:
-        1. Creates any missing directories in the path specified
-            by `self.file_name`.
-        2. Writes the guild name to a JSON file named `guild_name.json` in
-            the directory corresponding to the guild ID.
-        3. Writes the channel name to a JSON file named `channel_name.json` in
-            the directory corresponding to the channel ID.
-        4. Creates an empty checkpoints file at the path specified
-            by `self.file_name`.
-
-        The directory structure is created based on the path specified
-        in `self.file_name`.
-        The guild and channel names are written to files in directories named
-        after their IDs, allowing bot maintainers to identify guilds and
-        channels by their names.
-        """
-        # Create missing directories
-        directories: str = self.file_name[:self.file_name.rfind("/")]
-        for i, directory in enumerate(directories.split("/")):
-            path: str = "/".join(directories.split("/")[:i+1])
-            if not exists(directory):
-                makedirs(path, exist_ok=True)
-            # Write the guild name and channel name to files in the id
-            # directories, so that bot maintainers can identify the guilds and
-            # channels
-            # Channel names can change, but the IDs will not
-            if directory.isdigit() and int(directory) == self.guild_id:
-                name_file_name: str = f"{path}/guild_name.json"
-                with open(name_file_name, "w") as file:
-                    file.write(json.dumps({"guild_name": self.guild_name}))
-                    pass
-            elif directory.isdigit() and int(directory) == self.channel_id:
-                name_file_name: str = f"{path}/channel_name.json"
-                with open(name_file_name, "w") as file:
-                    file.write(json.dumps({"channel_name": self.channel_name}))
-                    pass
-
-        print(f"Creating checkpoints file: '{self.file_name}'")
-        with open(self.file_name, "w"):
-            pass
+        self.entry_count: int = (
+            0 if self.last_message_ids is None
+            else len(self.last_message_ids))
 
     def save(self, message_id: int) -> None:
         """
-        Saves the given message ID as a checkpoint in the file.
-        If the file does not exist, it creates a new one. The message ID is
-        appended to the file in JSON format. If the number of checkpoints
-        exceeds the maximum allowed, the oldest checkpoint is removed.
+        Saves the given message ID as a checkpoint in the checkpoint store,
+        which writes it to disk on its next flush. If the number of
+        checkpoints exceeds the maximum allowed, the oldest checkpoint is
+        removed.
         Args:
             message_id: The ID of the message to save as a checkpoint.
         """
-        if not exists(self.file_name):
-            self.create()
-
         # print(f"Saving checkpoint: {message_id}")
-        self.entry_count = self.count_lines()
-        with open(self.file_name, "a") as file:
-            if self.entry_count == 0:
-                file.write(json.dumps({"last_message_id": message_id}))
-            else:
-                file.write("\n" + json.dumps({"last_message_id": message_id}))
-        self.entry_count += 1
-
-        while self.entry_count > self.max_checkpoints:
-            self.remove_first_line()
-            self.entry_count -= 1
-
-    def remove_first_line(self) -> None:
-        """
-        Removes the first line from the file specified by self.file_name.
-
-        This method reads all lines from the file, then writes all lines except
-        the first one
-        back to the file, effectively removing the first line.
-        """
-        with open(self.file_name, "r") as file:
-            lines: List[str] = file.readlines()
-        with open(self.file_name, "w") as file:
-            file.writelines(lines[1:])
+        self.store.save(guild_name=self.guild_name,
+                        guild_id=self.guild_id,
+                        channel_name=self.channel_name,
+                        channel_id=self.channel_id,
+                        message_id=message_id,
+                        max_checkpoints=self.max_checkpoints)
+        self.last_message_ids = self.load()
+        self.entry_count = (
+            0 if self.last_message_ids is None
+            else len(self.last_message_ids))
 
     def load(self) -> List[Dict[str, int]] | None:
         """
-        Loads checkpoints from a file.
+        Loads checkpoints from the checkpoint store.
         Returns:
-            A list of dictionaries containing checkpoint data if the file
-                exists, otherwise None.
+            A list of dictionaries containing checkpoint data if the channel
+                has checkpoints, otherwise None.
         """
-        if not exists(self.file_name):
+        channel_checkpoints: ChannelCheckpointData | None = (
+            self.store.get(self.channel_id))
+        if channel_checkpoints is None:
             return None
-
-        with open(self.file_name, "r") as file:
-            checkpoints: List[Dict[str, int]] | None = []
-            # print("Loading checkpoints...")
-            for line in file:
-                checkpoint: Dict[str, int] = (
-                    {k: int(v) for k, v in json.loads(line).items()})
-                # print(f"checkpoint: {checkpoint}")
-                checkpoints.append(checkpoint)
-                return checkpoints
+        checkpoints: List[Dict[str, int]] = [
+            {"last_message_id": message_id}
+            for message_id in channel_checkpoints["last_message_ids"]]
+        return checkpoints
 # endregion
 
 # region CP start
 
 
+class LazyChannelCheckpoints(Dict[int, ChannelCheckpoints]):
+    """
+    A dictionary of ChannelCheckpoints keyed by the channel ID, which
+    creates the checkpoints of a channel the first time they are looked up.
+    The checkpoints themselves are loaded from the checkpoint store in one
+    go when the bot starts, so creating them does not touch the disk.
+
+    Attributes:
+        max_checkpoints: The maximum number of checkpoints of each channel.
+
+    Methods:
+        __init__(max_checkpoints = 10):
+            Initializes the dictionary.
+        __missing__(channel_id):
+            Creates the checkpoints of a channel from the bot's channel cache.
+    """
+
+    def __init__(self, max_checkpoints: int = 10) -> None:
+        """
+        Initializes the dictionary.
+
+        Args:
+            max_checkpoints: The maximum number of checkpoints of each
+                channel. Defaults to 10.
+        """
+        super().__init__()
+        self.max_checkpoints: int = max_checkpoints
+
+    def __missing__(self, channel_id: int) -> ChannelCheckpoints:
+        """
+        Creates the checkpoints of a text or voice channel that the bot can
+        see.
+
+        Args:
+            channel_id: The channel ID.
+
+        Returns:
+            ChannelCheckpoints: The checkpoints of the channel.
+
+        Raises:
+            KeyError: If the channel is not a text or voice channel in a
+                guild the bot is a member of.
+        """
+        assert isinstance(g.bot, Bot), "bot has not been initialized."
+        channel: (VoiceChannel | StageChannel | ForumChannel | TextChannel |
+                  CategoryChannel | Thread | PrivateChannel | None) = (
+            g.bot.get_channel(channel_id))
+        if not isinstance(channel, (TextChannel, VoiceChannel)):
+            raise KeyError(channel_id)
+        channel_checkpoints: ChannelCheckpoints = ChannelCheckpoints(
+            guild_name=channel.guild.name,
+            guild_id=channel.guild.id,
+            channel_name=channel.name,
+            channel_id=channel_id,
+            max_checkpoints=self.max_checkpoints
+        )
+        self[channel_id] = channel_checkpoints
+        return channel_checkpoints
+
 
-async def start_checkpoints(limit: int = 10) -> Dict[int, ChannelCheckpoints]:
+async def start_checkpoints(
+        limit: int = 10) -> LazyChannelCheckpoints:
     """
     Initializes checkpoints for all text channels in all guilds the bot is a
-    member of; creates instances of ChannelCheckpoints for each channel.
+    member of. The ChannelCheckpoints of each channel are created the first
+    time they are used (see LazyChannelCheckpoints), so this does not go
+    through the channels.
 
     Args:
         limit: The maximum number of checkpoints to create for each channel.
         Defaults to 10.
 
     Returns:
-        Dict: A dictionary where the keys are channel IDs and the values are
-        ChannelCheckpoints objects.
+        LazyChannelCheckpoints: A dictionary where the keys are channel IDs
+        and the values are ChannelCheckpoints objects.
     """
     assert isinstance(g.bot, Bot), "bot has not been initialized."
-    all_checkpoints: dict[int, ChannelCheckpoints] = {}
+    assert isinstance(g.checkpoint_store, CheckpointStore), (
+        "g.checkpoint_store has not been initialized.")
     print("Starting checkpoints...")
-    channel_id: int = 0
-    channel_name: str = ""
-    for guild in g.bot.guilds:
-        guild_id: int = guild.id
-        guild_name: str = guild.name
-        print(f"Guild: {guild_name} ({guild_id})")
-        for channel in guild.text_channels:
-            channel_id = channel.id
-            channel_name = channel.name
-            print(f"Channel: {channel_name} ({channel_id})")
-            all_checkpoints[channel_id] = ChannelCheckpoints(
-                guild_name=guild_name,
-                guild_id=guild_id,
-                channel_name=channel_name,
-                channel_id=channel_id,
-                max_checkpoints=limit
-            )
+    all_checkpoints: LazyChannelCheckpoints = (
+        LazyChannelCheckpoints(max_checkpoints=limit))
+    print(f"Checkpoints of {len(g.checkpoint_store.channels)} channels "
+          "loaded.")
     print("Checkpoints started.")
     return all_checkpoints
 # endregion
@@ -0,0 +1,119 @@
+# region Imports
+# Standard library
+from os import makedirs, truncate
+from os.path import dirname, exists
+from typing import TextIO
+# endregion
+
+# region Jackpot journal
+
+
+class JackpotJournal:
+    """
+    Records changes to the jackpot pool in a small append-only file, so that
+    the slot machine configuration does not have to be rewritten on
+    every spin.
+
+    Each line holds the jackpot pool after a change. When the journal is
+    replayed, the last complete line is the current jackpot pool. The
+    journal is cleared when the slot machine configuration (which also
+    holds the jackpot pool) has been saved.
+
+    Attributes:
+        file_name: The path to the journal file.
+        entries: The number of lines in the journal.
+
+    Methods:
+        __init__(file_name = "data/jackpot_journal.txt"):
+            Initializes the journal.
+        replay():
+            Gets the last jackpot pool recorded in the journal.
+        append(jackpot):
+            Records a new jackpot pool.
+        clear():
+            Empties the journal.
+        close():
+            Closes the journal file.
+    """
+
+    def __init__(self, file_name: str = "data/jackpot_journal.txt") -> None:
+        """
+        Initializes the jackpot journal.
+
+        Args:
+            file_name: The path to the journal file. Defaults to
+                "data/jackpot_journal.txt".
+        """
+        self.file_name: str = file_name
+        self.entries: int = 0
+        self._file: TextIO | None = None
+
+    def replay(self) -> int | None:
+        """
+        Gets the last jackpot pool recorded in the journal. A partially
+        written last line (after a crash) is cut off, so that the next
+        entry is not appended to it.
+
+        Returns:
+            int | None: The jackpot pool, or None if the journal is empty.
+        """
+        jackpot: int | None = None
+        self.entries = 0
+        if not exists(self.file_name):
+            return None
+        complete_size: int = 0
+        partial_line: bool = False
+        with open(self.file_name, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    partial_line = True
+                    break
+                complete_size += len(line)
+                try:
+                    jackpot = int(line)
+                except ValueError:
+                    print("ERROR: Invalid line in jackpot journal: "
+                          f"{line.decode(errors='replace').strip()}")
+                    continue
+                self.entries += 1
+        if partial_line:
+            print("WARNING: The jackpot journal ends with a partial line, "
+                  "which will be removed.")
+            truncate(self.file_name, complete_size)
+        return jackpot
+
+    def append(self, jackpot: int) -> None:
+        """
+        Records a new jackpot pool. The line is handed to the operating
+        system right away, but not synced to disk.
+
+        Args:
+            jackpot: The jackpot pool.
+        """
+        if self._file is None:
+            directory: str = dirname(self.file_name)
+            if directory != "":
+                makedirs(directory, exist_ok=True)
+            self._file = open(self.file_name, "a")
+        self._file.write(f"{jackpot}\n")
+        self._file.flush()
+        self.entries += 1
+
+    def clear(self) -> None:
+        """
+        Empties the journal. Only call this after the current jackpot pool
+        has been saved elsewhere.
+        """
+        self.close()
+        if exists(self.file_name):
+            open(self.file_name, "w").close()
+        self.entries = 0
+
+    def close(self) -> None:
+        """
+        Closes the journal file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+# endregion
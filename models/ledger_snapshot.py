@@ -0,0 +1,184 @@
+# region Imports
+# Standard library
+import json
+from os import makedirs, replace
+from os.path import dirname, exists, getsize
+from time import time
+from typing import Any, Dict
+
+# Local
+from type_aliases import LedgerSnapshotData
+from models.balance_index import BalanceIndex
+from models.chain_reader import read_blocks
+from models.chain_validator import ChainValidator
+# endregion
+
+# region Ledger snapshot
+
+
+class LedgerSnapshot:
+    """
+    Saves and loads snapshots of the ledger state, so that the bot does not
+    have to read the whole blockchain when it starts.
+
+    A snapshot holds the balance index (balances, height, byte offset and
+    last block) and the chain validator's watermark. When a snapshot is
+    loaded, it is checked against the blockchain file: the last block it
+    refers to must still be at the same position with the same hash.
+    Otherwise the snapshot is ignored and the ledger is built from scratch.
+
+    Attributes:
+        file_name: The path to the snapshot file.
+        blockchain_file_name: The path to the blockchain file.
+        interval: The minimum number of seconds between snapshots taken
+            by save_if_due().
+        last_saved: When the last snapshot was saved.
+
+    Methods:
+        __init__(file_name = "data/ledger_snapshot.json",
+            blockchain_file_name = "data/blockchain.json", interval = 300):
+            Initializes the snapshot handler.
+        load():
+            Loads the snapshot, if it matches the blockchain file.
+        save(balance_index, chain_validator):
+            Saves a snapshot.
+        save_if_due(balance_index, chain_validator):
+            Saves a snapshot if the interval has passed.
+    """
+
+    def __init__(self,
+                 file_name: str = "data/ledger_snapshot.json",
+                 blockchain_file_name: str = "data/blockchain.json",
+                 interval: float = 300) -> None:
+        """
+        Initializes the snapshot handler.
+
+        Args:
+            file_name: The path to the snapshot file. Defaults to
+                "data/ledger_snapshot.json".
+            blockchain_file_name: The path to the blockchain file. Defaults
+                to "data/blockchain.json".
+            interval: The minimum number of seconds between snapshots taken
+                by save_if_due(). Defaults to 300.
+        """
+        self.file_name: str = file_name
+        self.blockchain_file_name: str = blockchain_file_name
+        self.interval: float = interval
+        self.last_saved: float = time()
+
+    def load(self) -> LedgerSnapshotData | None:
+        """
+        Loads the snapshot and checks that it matches the blockchain file.
+
+        Returns:
+            LedgerSnapshotData | None: The snapshot, or None if there is no
+                usable snapshot.
+        """
+        if not exists(self.file_name):
+            print("No ledger snapshot found.")
+            return None
+        print("Loading ledger snapshot...")
+        try:
+            with open(self.file_name, "r") as file:
+                snapshot: LedgerSnapshotData = json.load(file)
+        except Exception as e:
+            print(f"ERROR: Error loading ledger snapshot: {e}")
+            return None
+        if not self._matches_blockchain(snapshot):
+            print("WARNING: The ledger snapshot does not match the "
+                  "blockchain. The ledger will be built from scratch.")
+            return None
+        print(f"Ledger snapshot loaded ({snapshot['height']} blocks).")
+        return snapshot
+
+    def _matches_blockchain(self, snapshot: LedgerSnapshotData) -> bool:
+        """
+        Checks that the blockchain file still contains the snapshot's last
+        block at the same position.
+
+        Args:
+            snapshot: The snapshot to check.
+
+        Returns:
+            bool: True if the snapshot matches, otherwise False.
+        """
+        if not exists(self.blockchain_file_name):
+            return False
+        if getsize(self.blockchain_file_name) < snapshot["offset"]:
+            return False
+        if snapshot["validated_offset"] > snapshot["offset"]:
+            return False
+        snapshot_last_block: Dict[str, Any] | None = snapshot["last_block"]
+        if snapshot_last_block is None:
+            return snapshot["offset"] == 0
+        block: Dict[str, Any]
+        end_offset: int
+        for block, end_offset in read_blocks(self.blockchain_file_name,
+                                             snapshot["last_block_offset"]):
+            return (end_offset == snapshot["offset"] and
+                    block["block_hash"] == snapshot_last_block["block_hash"])
+        return False
+
+    def save(self,
+             balance_index: BalanceIndex,
+             chain_validator: ChainValidator) -> None:
+        """
+        Saves a snapshot. The snapshot is written to a temporary file first,
+        so that a crash cannot leave a partially written snapshot behind.
+
+        Args:
+            balance_index: The balance index.
+            chain_validator: The chain validator. Its watermark is only
+                saved up to the balance index's offset.
+        """
+        snapshot: LedgerSnapshotData = {
+            "created": time(),
+            "height": balance_index.height,
+            "offset": balance_index.offset,
+            "balances": balance_index.balances,
+            "last_block": balance_index.last_block,
+            "last_block_offset": balance_index.last_block_offset,
+            "validated_height": 0,
+            "validated_offset": 0,
+            "last_validated_block_hash": None,
+            "last_validated_block_index": None,
+            "last_full_validation": None
+        }
+        if chain_validator.validated_offset <= balance_index.offset:
+            snapshot["validated_height"] = chain_validator.validated_height
+            snapshot["validated_offset"] = chain_validator.validated_offset
+            snapshot["last_validated_block_hash"] = (
+                chain_validator.last_block_hash)
+            snapshot["last_validated_block_index"] = (
+                chain_validator.last_block_index)
+            snapshot["last_full_validation"] = (
+                chain_validator.last_full_validation)
+        directory: str = dirname(self.file_name)
+        if directory != "":
+            makedirs(directory, exist_ok=True)
+        temporary_file_name: str = self.file_name + ".tmp"
+        with open(temporary_file_name, "w") as file:
+            json.dump(snapshot, file)
+        replace(temporary_file_name, self.file_name)
+        self.last_saved = snapshot["created"]
+        print(f"Ledger snapshot saved ({snapshot['height']} blocks).")
+
+    def save_if_due(self,
+                    balance_index: BalanceIndex,
+                    chain_validator: ChainValidator) -> bool:
+        """
+        Saves a snapshot if at least `interval` seconds have passed since the
+        last one.
+
+        Args:
+            balance_index: The balance index.
+            chain_validator: The chain validator.
+
+        Returns:
+            bool: True if a snapshot was saved, otherwise False.
+        """
+        if time() - self.last_saved < self.interval:
+            return False
+        self.save(balance_index, chain_validator)
+        return True
+# endregion
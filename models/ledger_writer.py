@@ -0,0 +1,307 @@
+# region Imports
+# Standard library
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, TypeVar, cast
+
+# Local
+from models.balance_index import BalanceIndex
+from models.chain_reader import block_from_dict, read_blocks
+from models.chain_validator import ChainValidator
+from models.ledger_snapshot import LedgerSnapshot
+from models.transaction_batcher import TransactionBatcher
+from sponsorblockchain.sponsorblockchain_type_aliases import TransactionDict
+from sponsorblockchain.models.blockchain import Blockchain
+from sponsorblockchain.models.block import Block
+# endregion
+
+R = TypeVar("R")
+
+# region Ledger writer
+
+
+class LedgerWriter:
+    """
+    Does all blockchain I/O on one dedicated thread, so that hashing and
+    file access never block the event loop.
+
+    The writer owns the blockchain, the balance index and the chain
+    validator. Transactions are fed to it through an asyncio queue (see
+    TransactionBatcher) and written in the order they were submitted; each
+    submitter is resumed with its block once it has been written. Reads run
+    on the same thread, so they always see the writes that were submitted
+    before them.
+
+    The last block of the chain is kept in memory and updated whenever the
+    balance index reads new blocks, so getting it does not read the
+    blockchain file.
+
+    If a LedgerSnapshot is given, a snapshot is saved on the writer thread
+    after a block is written once the snapshot interval has passed, and when
+    the writer is closed.
+
+    Attributes:
+        blockchain: The blockchain instance.
+        balance_index: The balance index that is updated after each block.
+        chain_validator: The validator used by validate_chain().
+        snapshot: Saves the ledger snapshots. None if snapshots are disabled.
+        batcher: The queue that transactions are submitted to.
+        last_block: The last block of the chain, if it has been read.
+
+    Methods:
+        __init__(blockchain, balance_index, chain_validator, snapshot,
+            window_seconds, max_batch_size):
+            Initializes the writer and its thread.
+        add_transaction(transaction):
+            Queues a transaction and returns its block once it has
+            been written.
+        get_balance(user, user_unhashed):
+            Gets the balance of a user.
+        get_last_block():
+            Gets the last block of the blockchain from memory.
+        validate_chain(full):
+            Validates the blockchain.
+        close():
+            Waits for the queued transactions, saves a snapshot and stops
+            the thread.
+    """
+
+    def __init__(self,
+                 blockchain: Blockchain,
+                 balance_index: BalanceIndex,
+                 chain_validator: ChainValidator,
+                 snapshot: LedgerSnapshot | None = None,
+                 window_seconds: float = 0.0,
+                 max_batch_size: int = 1) -> None:
+        """
+        Initializes the ledger writer.
+
+        Args:
+            blockchain: The blockchain instance.
+            balance_index: The balance index that is updated after
+                each block.
+            chain_validator: The validator used by validate_chain().
+            snapshot: Saves the ledger snapshots. Defaults to None
+                (no snapshots).
+            window_seconds: The group commit window. Defaults to 0.0.
+            max_batch_size: The maximum number of transactions per block.
+                Defaults to 1 (group commit disabled).
+        """
+        self.blockchain: Blockchain = blockchain
+        self.balance_index: BalanceIndex = balance_index
+        self.chain_validator: ChainValidator = chain_validator
+        self.snapshot: LedgerSnapshot | None = snapshot
+        self.last_block: Block | None = None
+        self._last_block_dict: Dict[str, Any] | None = None
+        self._update_last_block()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ledger_writer")
+        self.batcher = TransactionBatcher(commit=self._commit,
+                                          window_seconds=window_seconds,
+                                          max_batch_size=max_batch_size)
+        self._closed: bool = False
+
+    async def _run_in_thread(self,
+                             function: Callable[..., R],
+                             *args: Any,
+                             **kwargs: Any) -> R:
+        """
+        Runs a function on the writer thread and waits for the result.
+
+        Args:
+            function: The function to run.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The return value of the function.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(function, *args, **kwargs))
+
+    def _update_last_block(self) -> None:
+        """
+        Updates the cached last block from the balance index. The Block
+        object is only created when the index has read a new block.
+        """
+        last_block_dict: Dict[str, Any] | None = (
+            self.balance_index.last_block)
+        if last_block_dict is self._last_block_dict:
+            return
+        self._last_block_dict = last_block_dict
+        if last_block_dict is None:
+            self.last_block = None
+        else:
+            self.last_block = block_from_dict(last_block_dict)
+
+    def _write_block(self, transactions: List[TransactionDict]) -> Block:
+        """
+        Writes a block containing the given transactions and updates the
+        balance index. Runs on the writer thread.
+
+        If another process has appended blocks as well, the written block is
+        found by reading the blocks appended since the write started and
+        looking for the one that holds the committed transactions.
+
+        Args:
+            transactions: The transactions to store in the block.
+
+        Returns:
+            Block: The block that was written.
+
+        Raises:
+            RuntimeError: If the written block was not found in the
+                blockchain file.
+        """
+        data: List[Dict[str, TransactionDict]] = (
+            [{"transaction": transaction} for transaction in transactions])
+        data_casted: List[str | Dict[str, TransactionDict]] = (
+            cast(List[str | Dict[str, TransactionDict]], data))
+        # Index any blocks appended by other processes, so that the blocks
+        # after this offset were written after this write started
+        self.balance_index.catch_up()
+        start_offset: int = self.balance_index.offset
+        self.blockchain.add_block(data=data_casted, difficulty=0)
+        # Update the balances with the new block
+        self.balance_index.catch_up()
+        self._update_last_block()
+        written_block: Block | None = None
+        if self.last_block is not None and self.last_block.data == data:
+            written_block = self.last_block
+        else:
+            # Another process appended a block right after this one
+            print("WARNING: The last block does not hold "
+                  "the committed transactions. Looking for the block...")
+            block: Dict[str, Any]
+            for block, _ in read_blocks(self.balance_index.file_name,
+                                        start_offset):
+                if block.get("data") == data:
+                    written_block = block_from_dict(block)
+                    break
+        if written_block is None:
+            raise RuntimeError("The new block was not found "
+                               "in the blockchain file.")
+        if self.snapshot is not None:
+            try:
+                self.snapshot.save_if_due(self.balance_index,
+                                          self.chain_validator)
+            except Exception as e:
+                print(f"ERROR: Error saving ledger snapshot: {e}")
+        return written_block
+
+    async def _commit(self, transactions: List[TransactionDict]) -> Block:
+        """
+        Writes a batch of transactions as one block on the writer thread.
+
+        Args:
+            transactions: The transactions to store in the block.
+
+        Returns:
+            Block: The block that was written.
+        """
+        return await self._run_in_thread(self._write_block, transactions)
+
+    async def add_transaction(self, transaction: TransactionDict) -> Block:
+        """
+        Queues a transaction and waits until the block that holds it has
+        been written.
+
+        Args:
+            transaction: The transaction to add.
+
+        Returns:
+            Block: The block that holds the transaction.
+
+        Raises:
+            Exception: If the block could not be written.
+        """
+        return await self.batcher.submit(transaction)
+
+    async def get_balance(self,
+                          user: str | None = None,
+                          user_unhashed: int | None = None) -> int | None:
+        """
+        Gets the balance of a user from the balance index.
+
+        Args:
+            user: The user ID hash.
+            user_unhashed: The user ID. Used if `user` is not provided.
+
+        Returns:
+            int | None: The balance of the user, or None if the user has no
+                transactions.
+        """
+        return await self._run_in_thread(self._get_balance,
+                                         user=user,
+                                         user_unhashed=user_unhashed)
+
+    def _get_balance(self,
+                     user: str | None = None,
+                     user_unhashed: int | None = None) -> int | None:
+        """
+        Gets the balance of a user and updates the cached last block with
+        any blocks the balance index has read. Runs on the writer thread.
+        """
+        balance: int | None = self.balance_index.get_balance(
+            user=user, user_unhashed=user_unhashed)
+        self._update_last_block()
+        return balance
+
+    async def get_last_block(self) -> Block | None:
+        """
+        Gets the last block of the blockchain from memory. Blocks appended
+        by another process are picked up with the next write or
+        balance lookup.
+
+        Returns:
+            Block | None: The last block, or None if there is none.
+        """
+        if self.last_block is None:
+            await self._run_in_thread(self._catch_up)
+        return self.last_block
+
+    def _catch_up(self) -> None:
+        """
+        Reads new blocks into the balance index and updates the cached last
+        block. Runs on the writer thread.
+        """
+        self.balance_index.catch_up()
+        self._update_last_block()
+
+    async def validate_chain(self, full: bool = False) -> bool:
+        """
+        Validates the blockchain (see ChainValidator.validate()).
+
+        Args:
+            full: Whether to validate the whole chain. Defaults to False.
+
+        Returns:
+            bool: True if the chain is valid, otherwise False.
+        """
+        return await self._run_in_thread(self.chain_validator.validate, full)
+
+    async def close(self) -> None:
+        """
+        Waits until the queued transactions have been written, saves a
+        snapshot and stops the writer thread. This is called on every
+        shutdown (see save_bot_state()), so the next start restores the
+        ledger from an up-to-date snapshot. Does nothing if the writer has
+        already been closed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        await self.batcher.close()
+        if self.snapshot is not None:
+            try:
+                print("Saving ledger snapshot...")
+                await self._run_in_thread(self.snapshot.save,
+                                          self.balance_index,
+                                          self.chain_validator)
+                print("Ledger snapshot saved.")
+            except Exception as e:
+                print(f"ERROR: Error saving ledger snapshot: {e}")
+        self._executor.shutdown(wait=True)
+# endregion
@@ -0,0 +1,292 @@
+# region Imports
+# Standard library
+from array import array
+from os import makedirs, replace, truncate
+from os.path import exists, getsize
+from time import time
+from typing import Dict, List
+# endregion
+
+# region Constants
+# Discord snowflakes store the milliseconds since the Discord epoch
+# (2015-01-01) in the bits above the lowest 22
+DISCORD_EPOCH_MS: int = 1420070400000
+# The file starts with the number of message IDs that have been pruned
+HEADER_SIZE: int = 8
+ID_SIZE: int = 8
+# endregion
+
+# region Snowflakes
+
+
+def snowflake_timestamp(snowflake: int) -> float:
+    """
+    Gets the creation time of a Discord snowflake (such as a message ID).
+
+    Args:
+        snowflake: The snowflake.
+
+    Returns:
+        float: The unix timestamp, in seconds.
+    """
+    return ((snowflake >> 22) + DISCORD_EPOCH_MS) / 1000
+# endregion
+
+# region Mined messages
+
+
+class MinedMessages:
+    """
+    The IDs of the messages a user has mined, kept in a set for constant-time
+    lookups and stored in a binary file that new IDs are appended to.
+
+    The file starts with an 8-byte header holding the number of IDs that have
+    been pruned, followed by one unsigned 64-bit integer per mined message.
+    A partially written ID at the end of the file (after a crash) is cut off
+    when the file is loaded.
+
+    Attributes:
+        user_id: The user ID.
+        file_name: The path to the file.
+        message_ids: The mined message IDs.
+        pruned_count: The number of IDs that have been pruned.
+
+    Methods:
+        __init__(user_id, file_name):
+            Initializes the mined messages and loads them from disk.
+        load():
+            Loads the file.
+        add(message_id):
+            Adds a mined message.
+        migrate(message_ids):
+            Adds the message IDs from the legacy `messages_mined` list.
+        prune(max_age):
+            Removes the IDs of messages older than `max_age` seconds.
+        count:
+            The number of messages mined, including the pruned ones.
+    """
+
+    def __init__(self, user_id: int, file_name: str) -> None:
+        """
+        Initializes the mined messages and loads them from disk.
+
+        Args:
+            user_id: The user ID.
+            file_name: The path to the file.
+        """
+        self.user_id: int = user_id
+        self.file_name: str = file_name
+        self.message_ids: set[int] = set()
+        self.pruned_count: int = 0
+        self.load()
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self.message_ids
+
+    def __len__(self) -> int:
+        return len(self.message_ids)
+
+    @property
+    def count(self) -> int:
+        """
+        The number of messages mined, including the pruned ones.
+        """
+        return self.pruned_count + len(self.message_ids)
+
+    def load(self) -> None:
+        """
+        Loads the file.
+        """
+        self.message_ids = set()
+        self.pruned_count = 0
+        if not exists(self.file_name):
+            return
+        file_size: int = getsize(self.file_name)
+        aligned_size: int = (
+            file_size - max(file_size - HEADER_SIZE, 0) % ID_SIZE)
+        if aligned_size < HEADER_SIZE:
+            print(f"ERROR: Mined messages file for {self.user_id} "
+                  "has no header.")
+            return
+        if aligned_size != file_size:
+            print(f"WARNING: Mined messages file for {self.user_id} ends "
+                  "with a partial message ID, which will be removed.")
+            truncate(self.file_name, aligned_size)
+        ids: array[int] = array("Q")
+        with open(self.file_name, "rb") as file:
+            header: array[int] = array("Q")
+            header.frombytes(file.read(HEADER_SIZE))
+            self.pruned_count = header[0]
+            ids.frombytes(file.read(aligned_size - HEADER_SIZE))
+        self.message_ids = set(ids)
+
+    def _write(self, message_ids: List[int]) -> None:
+        """
+        Rewrites the file with the header and the given message IDs. The
+        file is written to a temporary file first and then renamed.
+
+        Args:
+            message_ids: The message IDs.
+        """
+        temporary_file_name: str = self.file_name + ".tmp"
+        with open(temporary_file_name, "wb") as file:
+            array("Q", [self.pruned_count]).tofile(file)
+            array("Q", message_ids).tofile(file)
+        replace(temporary_file_name, self.file_name)
+
+    def _append(self, message_ids: List[int]) -> None:
+        """
+        Appends message IDs to the file, creating it if it does not exist.
+
+        Args:
+            message_ids: The message IDs.
+        """
+        if not exists(self.file_name):
+            self._write(message_ids)
+            return
+        with open(self.file_name, "ab") as file:
+            array("Q", message_ids).tofile(file)
+
+    def add(self, message_id: int) -> bool:
+        """
+        Adds a mined message.
+
+        Args:
+            message_id: The message ID.
+
+        Returns:
+            bool: True if the message was added, False if it had already
+                been mined.
+        """
+        if message_id in self.message_ids:
+            return False
+        self._append([message_id])
+        self.message_ids.add(message_id)
+        return True
+
+    def migrate(self, message_ids: List[int]) -> int:
+        """
+        Adds the message IDs from the legacy `messages_mined` list in the
+        user's save data.
+
+        Args:
+            message_ids: The message IDs.
+
+        Returns:
+            int: The number of message IDs that were added.
+        """
+        new_message_ids: List[int] = list(
+            dict.fromkeys(message_id for message_id in message_ids
+                          if message_id not in self.message_ids))
+        self._append(new_message_ids)
+        self.message_ids.update(new_message_ids)
+        return len(new_message_ids)
+
+    def prune(self, max_age: float) -> int:
+        """
+        Removes the IDs of messages older than `max_age` seconds. Reactions
+        to those messages are no longer recognized as already mined, so
+        `max_age` should be longer than the period for which missed
+        reactions are recovered. The pruned IDs still count towards `count`.
+
+        Args:
+            max_age: The maximum age of a message, in seconds.
+
+        Returns:
+            int: The number of message IDs that were removed.
+        """
+        cutoff: float = time() - max_age
+        kept_message_ids: List[int] = sorted(
+            message_id for message_id in self.message_ids
+            if snowflake_timestamp(message_id) >= cutoff)
+        pruned: int = len(self.message_ids) - len(kept_message_ids)
+        if pruned == 0:
+            return 0
+        self.pruned_count += pruned
+        self._write(kept_message_ids)
+        self.message_ids = set(kept_message_ids)
+        return pruned
+# endregion
+
+# region Mined messages store
+
+
+class MinedMessagesStore:
+    """
+    Keeps the mined messages of each user in memory, so that a user's file
+    is only read once.
+
+    Attributes:
+        directory: The directory the files are stored in.
+        max_age: If set, message IDs older than this many seconds are pruned
+            when a user's file is loaded.
+        mined_messages: The mined messages of each loaded user, keyed by the
+            user ID.
+
+    Methods:
+        __init__(directory = "data/mined_messages", max_age = None):
+            Initializes the store.
+        get_file_name(user_id):
+            Gets the path to a user's file.
+        get(user_id, legacy_message_ids):
+            Gets a user's mined messages.
+    """
+
+    def __init__(self,
+                 directory: str = "data/mined_messages",
+                 max_age: float | None = None) -> None:
+        """
+        Initializes the mined messages store.
+
+        Args:
+            directory: The directory the files are stored in. Defaults to
+                "data/mined_messages".
+            max_age: If set, message IDs older than this many seconds are
+                pruned when a user's file is loaded. Defaults to None.
+        """
+        self.directory: str = directory
+        self.max_age: float | None = max_age
+        self.mined_messages: Dict[int, MinedMessages] = {}
+
+    def get_file_name(self, user_id: int) -> str:
+        """
+        Gets the path to a user's file.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            str: The path to the file.
+        """
+        return f"{self.directory}/{user_id}.bin"
+
+    def get(self,
+            user_id: int,
+            legacy_message_ids: List[int] | None = None) -> MinedMessages:
+        """
+        Gets a user's mined messages, loading them from disk if they are not
+        in memory yet.
+
+        Args:
+            user_id: The user ID.
+            legacy_message_ids: The user's legacy `messages_mined` list,
+                which is migrated if the user has no file yet. Defaults
+                to None.
+
+        Returns:
+            MinedMessages: The mined messages.
+        """
+        if user_id in self.mined_messages:
+            return self.mined_messages[user_id]
+        makedirs(self.directory, exist_ok=True)
+        file_name: str = self.get_file_name(user_id)
+        needs_migration: bool = not exists(file_name)
+        mined_messages = MinedMessages(user_id=user_id, file_name=file_name)
+        if needs_migration and legacy_message_ids:
+            migrated: int = mined_messages.migrate(legacy_message_ids)
+            print(f"Migrated {migrated} mined messages for {user_id}.")
+        if self.max_age is not None:
+            mined_messages.prune(self.max_age)
+        self.mined_messages[user_id] = mined_messages
+        return mined_messages
+# endregion
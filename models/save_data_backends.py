@@ -0,0 +1,303 @@
+# region Imports
+# Standard library
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from os import fsync, listdir, makedirs, replace
+from os.path import dirname, exists, getsize, isdir, join
+from typing import Dict, List
+
+# Local
+from type_aliases import SaveData
+# endregion
+
+# region Backend
+
+
+class SaveDataBackend(ABC):
+    """
+    Abstract base class for the storage of user save data. Subclasses store
+    the save data of each user as a whole, and must implement load(),
+    save(), get_user_ids() and get_user_names().
+
+    Methods:
+        load(user_id):
+            Loads a user's save data.
+        save(user_id, save_data):
+            Saves a user's save data.
+        save_many(save_data):
+            Saves the save data of several users.
+        get_user_ids():
+            Gets the IDs of all users with save data.
+        get_user_names(exclude):
+            Gets the names of all users with save data.
+        close():
+            Closes the backend.
+    """
+
+    @abstractmethod
+    def load(self, user_id: int) -> SaveData | None:
+        """
+        Loads a user's save data.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            SaveData | None: The save data, or None if the user has no
+                save data.
+        """
+
+    @abstractmethod
+    def save(self, user_id: int, save_data: SaveData) -> None:
+        """
+        Saves a user's save data.
+
+        Args:
+            user_id: The user ID.
+            save_data: The save data.
+        """
+
+    def save_many(self, save_data: Dict[int, SaveData]) -> None:
+        """
+        Saves the save data of several users.
+
+        Args:
+            save_data: The save data, keyed by the user ID.
+        """
+        for user_id, user_save_data in save_data.items():
+            self.save(user_id, user_save_data)
+
+    @abstractmethod
+    def get_user_ids(self) -> List[int]:
+        """
+        Gets the IDs of all users with save data.
+
+        Returns:
+            List[int]: The user IDs.
+        """
+
+    @abstractmethod
+    def get_user_names(self,
+                       exclude: set[int] | None = None) -> Dict[int, str]:
+        """
+        Gets the names of all users with save data.
+
+        Args:
+            exclude: The IDs of users to leave out. Defaults to None.
+
+        Returns:
+            Dict[int, str]: The user names, keyed by the user ID.
+        """
+
+    def close(self) -> None:
+        """
+        Closes the backend.
+        """
+        pass
+# endregion
+
+# region JSON backend
+
+
+class JsonSaveDataBackend(SaveDataBackend):
+    """
+    Stores the save data of each user in its own JSON file, at
+    `<directory>/<user_id>/save_data.json`. Files are written to a temporary
+    file first and then renamed.
+
+    Attributes:
+        directory: The save data directory.
+    """
+
+    def __init__(self, directory: str = "data/save_data") -> None:
+        """
+        Initializes the JSON save data backend.
+
+        Args:
+            directory: The save data directory. Defaults to
+                "data/save_data".
+        """
+        self.directory: str = directory
+
+    def get_file_name(self, user_id: int) -> str:
+        """
+        Gets the path to a user's save data file.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            str: The path to the save data file.
+        """
+        return f"{self.directory}/{user_id}/save_data.json"
+
+    def load(self, user_id: int) -> SaveData | None:
+        file_name: str = self.get_file_name(user_id)
+        if not exists(file_name):
+            return None
+        if getsize(file_name) == 0:
+            print(f"ERROR: Save data file for {user_id} is empty.")
+            return None
+        with open(file_name, "r") as file:
+            save_data: SaveData = json.load(file)
+        return save_data
+
+    def save(self, user_id: int, save_data: SaveData) -> None:
+        file_name: str = self.get_file_name(user_id)
+        makedirs(dirname(file_name), exist_ok=True)
+        temporary_file_name: str = file_name + ".tmp"
+        with open(temporary_file_name, "w") as file:
+            json.dump(save_data, file)
+            file.flush()
+            fsync(file.fileno())
+        replace(temporary_file_name, file_name)
+
+    def get_user_ids(self) -> List[int]:
+        if not exists(self.directory):
+            return []
+        return [int(subdir) for subdir in sorted(listdir(self.directory))
+                if subdir.isdigit() and isdir(join(self.directory, subdir))]
+
+    def get_user_names(self,
+                       exclude: set[int] | None = None) -> Dict[int, str]:
+        user_names: Dict[int, str] = {}
+        for user_id in self.get_user_ids():
+            if exclude is not None and user_id in exclude:
+                continue
+            try:
+                save_data: SaveData | None = self.load(user_id)
+            except Exception as e:
+                print(f"ERROR: Error getting save data: {e}")
+                continue
+            if save_data is not None:
+                user_names[user_id] = save_data.get("user_name", "")
+        return user_names
+# endregion
+
+# region SQLite backend
+
+
+class SqliteSaveDataBackend(SaveDataBackend):
+    """
+    Stores the save data of all users in a single SQLite database in WAL
+    mode. Each user's save data is stored as JSON, and the user name and
+    blocked status are also stored in indexed columns for bulk queries.
+
+    Attributes:
+        file_name: The path to the database file.
+    """
+
+    def __init__(self, file_name: str = "data/save_data.sqlite3") -> None:
+        """
+        Initializes the SQLite save data backend and creates the database if
+        it does not exist.
+
+        Args:
+            file_name: The path to the database file. Defaults to
+                "data/save_data.sqlite3".
+        """
+        self.file_name: str = file_name
+        directory: str = dirname(file_name)
+        if directory != "":
+            makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            file_name, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS save_data ("
+                "user_id INTEGER PRIMARY KEY, "
+                "user_name TEXT NOT NULL, "
+                "blocked_from_receiving_coins INTEGER NOT NULL DEFAULT 0, "
+                "data TEXT NOT NULL)")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS save_data_user_name "
+                "ON save_data (user_name)")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS save_data_blocked "
+                "ON save_data (blocked_from_receiving_coins)")
+
+    def load(self, user_id: int) -> SaveData | None:
+        with self._lock:
+            row: tuple[str] | None = self._connection.execute(
+                "SELECT data FROM save_data WHERE user_id = ?",
+                (user_id,)).fetchone()
+        if row is None:
+            return None
+        save_data: SaveData = json.loads(row[0])
+        return save_data
+
+    def _upsert(self, user_id: int, save_data: SaveData) -> None:
+        """
+        Inserts or replaces a user's save data. Must be called inside
+        a transaction.
+        """
+        self._connection.execute(
+            "INSERT INTO save_data "
+            "(user_id, user_name, blocked_from_receiving_coins, data) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET "
+            "user_name = excluded.user_name, "
+            "blocked_from_receiving_coins = "
+            "excluded.blocked_from_receiving_coins, "
+            "data = excluded.data",
+            (user_id,
+             save_data.get("user_name", ""),
+             int(bool(save_data.get("blocked_from_receiving_coins", False))),
+             json.dumps(save_data)))
+
+    def save(self, user_id: int, save_data: SaveData) -> None:
+        with self._lock, self._connection:
+            self._upsert(user_id, save_data)
+
+    def save_many(self, save_data: Dict[int, SaveData]) -> None:
+        # One transaction for all users
+        with self._lock, self._connection:
+            for user_id, user_save_data in save_data.items():
+                self._upsert(user_id, user_save_data)
+
+    def get_user_ids(self) -> List[int]:
+        with self._lock:
+            rows: List[tuple[int]] = self._connection.execute(
+                "SELECT user_id FROM save_data ORDER BY user_id").fetchall()
+        return [row[0] for row in rows]
+
+    def get_user_names(self,
+                       exclude: set[int] | None = None) -> Dict[int, str]:
+        with self._lock:
+            rows: List[tuple[int, str]] = self._connection.execute(
+                "SELECT user_id, user_name FROM save_data").fetchall()
+        return {user_id: user_name for user_id, user_name in rows
+                if exclude is None or user_id not in exclude}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+# endregion
+
+# region Create backend
+
+
+def create_save_data_backend(name: str) -> SaveDataBackend:
+    """
+    Creates the save data backend with the given name.
+
+    Args:
+        name: "json" or "sqlite" (see g.save_data_backend). Unknown names
+            fall back to "json".
+
+    Returns:
+        SaveDataBackend: The backend.
+    """
+    if name == "sqlite":
+        print("Using SQLite save data backend.")
+        return SqliteSaveDataBackend()
+    if name != "json":
+        print(f"WARNING: Unknown save data backend '{name}'. "
+              "The JSON backend will be used.")
+    return JsonSaveDataBackend()
+# endregion
@@ -0,0 +1,250 @@
+# region Imports
+# Standard library
+import asyncio
+from copy import deepcopy
+from typing import Any, Dict
+
+# Local
+from type_aliases import SaveData
+from models.save_data_backends import SaveDataBackend, JsonSaveDataBackend
+# endregion
+
+# region Save data cache
+
+
+class SaveDataCache:
+    """
+    Keeps the save data of users in memory, so that reading a user's save
+    data does not go to the storage backend every time.
+
+    Changes are kept in memory and marked as dirty. In write-back mode, dirty
+    save data is written to the backend when the cache is flushed
+    (periodically, see start_flushing(), and when the bot shuts down).
+    Otherwise each change is written immediately. On the event loop, the
+    cache is flushed with flush_in_executor(), which writes a copy of the
+    dirty save data on a worker thread.
+
+    Attributes:
+        backend: The storage backend (see SaveDataBackend).
+        write_back: Whether changes are written on flush() instead of
+            immediately.
+        save_data: The save data of each loaded user, keyed by the user ID.
+        dirty: The IDs of the users whose save data has changed since the
+            last flush.
+
+    Methods:
+        __init__(backend, write_back = True):
+            Initializes the cache.
+        get(user_id):
+            Gets a user's save data.
+        create(user_id, save_data):
+            Adds the save data of a new user.
+        set(user_id, key, value):
+            Changes a value in a user's save data.
+        set_many(user_id, changes):
+            Changes several values in a user's save data at once.
+        flush():
+            Writes the dirty save data to the backend.
+        flush_in_executor():
+            Writes the dirty save data to the backend without blocking
+            the event loop.
+        start_flushing(interval):
+            Starts flushing periodically.
+        close():
+            Stops flushing periodically and flushes.
+    """
+
+    def __init__(self,
+                 backend: SaveDataBackend | None = None,
+                 write_back: bool = True) -> None:
+        """
+        Initializes the save data cache.
+
+        Args:
+            backend: The storage backend. Defaults to a JsonSaveDataBackend.
+            write_back: Whether changes are written on flush() instead of
+                immediately. Defaults to True.
+        """
+        if backend is None:
+            backend = JsonSaveDataBackend()
+        self.backend: SaveDataBackend = backend
+        self.write_back: bool = write_back
+        self.save_data: Dict[int, SaveData] = {}
+        self.dirty: set[int] = set()
+        self._flush_task: asyncio.Task[None] | None = None
+        # Makes sure that flushes are written one at a time, in order
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+    def get(self, user_id: int) -> SaveData | None:
+        """
+        Gets a user's save data, loading it from the backend if it is not
+        in memory yet.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            SaveData | None: The save data, or None if the user has no save
+                data.
+        """
+        if user_id in self.save_data:
+            return self.save_data[user_id]
+        save_data: SaveData | None = self.backend.load(user_id)
+        if save_data is None:
+            return None
+        self.save_data[user_id] = save_data
+        return save_data
+
+    def create(self, user_id: int, save_data: SaveData) -> None:
+        """
+        Adds the save data of a new user. The save data is written
+        immediately.
+
+        Args:
+            user_id: The user ID.
+            save_data: The save data.
+        """
+        self.save_data[user_id] = save_data
+        self._write(user_id)
+
+    def set(self, user_id: int, key: str, value: Any) -> None:
+        """
+        Changes a value in a user's save data.
+
+        Args:
+            user_id: The user ID.
+            key: The key to change.
+            value: The new value.
+        """
+        self.set_many(user_id, {key: value})
+
+    def set_many(self, user_id: int, changes: Dict[str, Any]) -> None:
+        """
+        Changes several values in a user's save data at once. The changes
+        are applied together, so a flush never writes only some of them, and
+        without write-back they are written in a single write.
+
+        Args:
+            user_id: The user ID.
+            changes: The new values, keyed by the key to change.
+        """
+        save_data: SaveData | None = self.get(user_id)
+        if save_data is None:
+            raise KeyError(f"No save data for user {user_id}.")
+        save_data_dict: Dict[str, Any] = save_data  # type: ignore
+        save_data_dict.update(changes)
+        if self.write_back:
+            self.dirty.add(user_id)
+        else:
+            self._write(user_id)
+
+    def _write(self, user_id: int) -> None:
+        """
+        Writes a user's save data to the backend.
+
+        Args:
+            user_id: The user ID.
+        """
+        self.backend.save(user_id, self.save_data[user_id])
+        self.dirty.discard(user_id)
+
+    def _take_dirty(self) -> Dict[int, SaveData]:
+        """
+        Copies the dirty save data and marks it as clean. Changes made after
+        this are written on the next flush.
+
+        Returns:
+            Dict[int, SaveData]: The copied save data, keyed by the user ID.
+        """
+        dirty_save_data: Dict[int, SaveData] = {
+            user_id: deepcopy(self.save_data[user_id])
+            for user_id in self.dirty}
+        self.dirty.clear()
+        return dirty_save_data
+
+    def flush(self) -> int:
+        """
+        Writes the dirty save data to the backend, blocking until it is
+        written. Use flush_in_executor() on the event loop.
+
+        Returns:
+            int: The number of users whose save data was written.
+        """
+        if len(self.dirty) == 0:
+            return 0
+        dirty_save_data: Dict[int, SaveData] = self._take_dirty()
+        try:
+            self.backend.save_many(dirty_save_data)
+        except Exception as e:
+            print(f"ERROR: Error writing save data: {e}")
+            self.dirty.update(dirty_save_data)
+            return 0
+        return len(dirty_save_data)
+
+    async def flush_in_executor(self) -> int:
+        """
+        Writes the dirty save data to the backend without blocking the
+        event loop. The dirty save data is copied on the event loop and the
+        copy is written on a worker thread, so the save data can keep
+        changing in the meantime. Waits for any flush that is in progress
+        first.
+
+        Returns:
+            int: The number of users whose save data was written.
+        """
+        async with self._flush_lock:
+            if len(self.dirty) == 0:
+                return 0
+            dirty_save_data: Dict[int, SaveData] = self._take_dirty()
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(
+                    None, self.backend.save_many, dirty_save_data)
+            except Exception as e:
+                print(f"ERROR: Error writing save data: {e}")
+                self.dirty.update(dirty_save_data)
+                return 0
+            return len(dirty_save_data)
+
+    async def _flush_periodically(self, interval: float) -> None:
+        """
+        Flushes the dirty save data every `interval` seconds.
+
+        Args:
+            interval: The number of seconds between flushes.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            # A flush that is under way when flushing is stopped is
+            # completed
+            await asyncio.shield(self.flush_in_executor())
+
+    def start_flushing(self, interval: float) -> None:
+        """
+        Starts flushing the dirty save data periodically. Does nothing if it
+        has already been started.
+
+        Args:
+            interval: The number of seconds between flushes.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(
+            self._flush_periodically(interval))
+
+    async def close(self) -> None:
+        """
+        Stops flushing periodically, writes the dirty save data to the
+        backend (after any flush that is in progress) and closes the
+        backend.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_in_executor()
+        self.backend.close()
+# endregion
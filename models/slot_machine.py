@@ -3,9 +3,13 @@
 import json
 import random
 import math
-from os import makedirs
+from bisect import bisect_right
+from fractions import Fraction
+from hashlib import sha256
+from os import makedirs, replace
 from os.path import exists
-from typing import Dict, KeysView, List, LiteralString, cast, Literal, Any
+from typing import (Dict, Iterable, KeysView, List, LiteralString, cast,
+                    Literal, Any)
 
 # Third party
 from sympy import (symbols, Expr, Add, Mul, Float, Integer, Eq, Lt, Ge,
@@ -13,7 +17,9 @@ from sympy import (symbols, Expr, Add, Mul, Float, Integer, Eq, Lt, Ge,
 
 # Local
 import core.global_state as g
-from type_aliases import Reels, ReelSymbol, ReelResults, SlotMachineConfig
+from type_aliases import (Reels, ReelSymbol, ReelResults, SlotMachineConfig,
+                          PayoutEntry)
+from models.jackpot_journal import JackpotJournal
 # endregion
 
 class SlotMachine:
@@ -21,8 +27,17 @@ class SlotMachine:
     Represents a slot machine game with various functionalities, such as
     loading configuration, calculating probabilities, managing reels,
     calculating expected value, and handling jackpots.
+    The jackpot pool changes on every spin. Instead of saving the whole
+    configuration each time, the new jackpot pool is appended to a jackpot
+    journal, which is replayed when the slot machine starts. The
+    configuration (including the jackpot pool) is saved every
+    `jackpot_checkpoint_entries` changes, and whenever it is saved for
+    another reason, after which the journal is cleared.
+
     Methods:
-        __init__(file_name = "data/slot_machine.json"):
+        __init__(file_name = "data/slot_machine.json",
+            jackpot_journal_file_name = "data/jackpot_journal.txt",
+            jackpot_checkpoint_entries = 1000):
             Initializes the SlotMachine class with the given configuration file.
         load_reels():
             Loads the reels configuration from the
@@ -55,6 +70,9 @@ class SlotMachine:
         calculate_losing_probabilities():
             Calculate the probability of losing the entire wager and the
             probability of not getting any symbols to match.
+        get_calculation_key():
+            Hash the parts of the configuration that the probabilities and
+            the expected value depend on.
         calculate_all_probabilities():
             Calculate the probabilities for all possible outcomes in the
             slot machine.
@@ -69,47 +87,101 @@ class SlotMachine:
             seed (start amount) integer.
         calculate_rtp(wager):
             Calculate the return to player (RTP) percentage for a given wager.
+        jackpot_fee_paid(wager):
+            Check if a wager covers the jackpot fee.
+        calculate_fees(wager):
+            Calculate the main fee and the jackpot fee for a wager.
+        calculate_returns(wager, event_name, win_money):
+            Calculate the net return and the total return of a spin.
+        calculate_exact_probabilities():
+            Calculate the probabilities for all possible outcomes as
+            exact fractions.
+        calculate_exact_expected_values(wagers):
+            Calculate the exact expected total return and expected return
+            for several wagers.
+        calculate_exact_rtp(wagers):
+            Calculate the exact return to player (RTP) for several wagers.
+        build_reel_samplers():
+            Builds the cumulative symbol count tables used by stop_reel().
+        compile_payout_table():
+            Builds the payout table used by calculate_award_money().
         stop_reel(reel):
             Stops the specified reel and returns the symbol at the
             stopping position.
         calculate_award_money(wager, results):
             Calculate the award money based on the wager and the results of
             the reels.
+        calculate_combo_award_money(wager, symbols):
+            Calculate the award money of the symbols that the reels
+            stopped at.
         make_friendly_event_name(event_name):
             Make a friendly event name from the event name.
         """
     # region Slot config
-    def __init__(self, file_name: str = "data/slot_machine.json") -> None:
+    def __init__(self,
+                 file_name: str = "data/slot_machine.json",
+                 jackpot_journal_file_name: str = "data/jackpot_journal.txt",
+                 jackpot_checkpoint_entries: int = 1000) -> None:
         """
         Initializes the SlotMachine class with the given configuration file.
 
         Args:
             file_name: The name of the slot machine configuration file. Defaults
                 to "data/slot_machine.json".
+            jackpot_journal_file_name: The name of the jackpot journal file.
+                Defaults to "data/jackpot_journal.txt".
+            jackpot_checkpoint_entries: The number of jackpot changes after
+                which the configuration is saved. Defaults to 1000.
         
         Attributes:
             file_name: The name of the slot machine configuration file
+            jackpot_journal: The journal of jackpot pool changes
+            jackpot_checkpoint_entries: The number of jackpot changes after
+                which the configuration is saved
             configuration: The loaded configuration for the slot machine
             _reels: The loaded reels for the slot machine
             _probabilities: The calculated probabilities for each event
             _jackpot: The current jackpot amount
             _fees: The fees associated with the slot machine
+            _cached_probabilities: The last calculated probabilities and the
+                calculation key they were calculated for
+            _cached_expected_value: The last calculated expected value
+                expressions and the calculation key they were calculated for
+            _cached_exact_probabilities: The last calculated exact
+                probabilities and the calculation key they were calculated for
+            _reel_samplers: The symbols and cumulative symbol counts of each
+                reel, used by stop_reel()
+            payout_table: The payout of each symbol triple, with and without
+                the jackpot fee paid, used by calculate_award_money()
         """
         Coin: str = g.Coin
         print("Starting the slot machines...")
         self.file_name: str = file_name
+        self.jackpot_journal: JackpotJournal = JackpotJournal(
+            file_name=jackpot_journal_file_name)
+        self.jackpot_checkpoint_entries: int = jackpot_checkpoint_entries
+        self._cached_probabilities: (
+            tuple[str, Dict[str, Float]] | None) = None
+        self._cached_expected_value: (
+            tuple[str, tuple[Piecewise, Piecewise]] | None) = None
+        self._cached_exact_probabilities: (
+            tuple[str, Dict[str, Fraction]] | None) = None
+        self._reel_samplers: Dict[str, tuple[List[str], List[int]]] = {}
+        self.payout_table: Dict[tuple[str, str, str, bool], PayoutEntry] = {}
         attributes_set = False
         while attributes_set is False:
             try:
                 self.configuration: SlotMachineConfig = (
                     self.load_config())
                 self._reels: Reels = self.load_reels()
+                self.build_reel_samplers()
                 # self.emoji_ids: Dict[str, int] = (
                 #     cast(Dict[str, int], self.configuration["emoji_ids"]))
+                self._fees: dict[str, int | float] = self.configuration["fees"]
+                self.compile_payout_table()
                 self._probabilities: Dict[str, Float] = (
                     self.calculate_all_probabilities())
                 self._jackpot: int = self.load_jackpot()
-                self._fees: dict[str, int | float] = self.configuration["fees"]
                 self.header: str = f"### {Coin} Slot Machine"
                 self.next_bonus_wait_seconds: int = (
                     self.configuration["new_bonus_wait_seconds"])
@@ -154,12 +226,16 @@ class SlotMachine:
         """
         self._reels = value
         self.configuration["reels"] = self._reels
+        self.build_reel_samplers()
+        self.compile_payout_table()
         self.save_config()
 
     @property
     def probabilities(self) -> Dict[str, Float]:
         """
-        Calculate and return the probabilities for various outcomes.
+        Calculate and return the probabilities for various outcomes. The
+        probabilities are only recalculated when the reels, fees or combo
+        events have changed.
 
         Returns:
             Dict: A dictionary where the keys are event names and the values
@@ -180,22 +256,27 @@ class SlotMachine:
     @jackpot.setter
     def jackpot(self, value: int) -> None:
         """
-        Sets the jackpot value and updates the configuration.
+        Sets the jackpot value and records it in the jackpot journal. The
+        configuration is saved once the journal has
+        `jackpot_checkpoint_entries` entries.
 
         Args:
             value (int): The new jackpot value.
         """
         self._jackpot = value
-        self.configuration["jackpot_pool"] = self._jackpot
-        self.save_config()
+        self.jackpot_journal.append(self._jackpot)
+        if self.jackpot_journal.entries >= self.jackpot_checkpoint_entries:
+            self.save_config()
 
     def load_jackpot(self) -> int:
         """
         Loads the current jackpot pool.
 
         This method retrieves the jackpot seed from the configuration file
-        and compares it to the current jackpot pool. The jackpot pool is
-        automatically set to the jackpot seed if the jackpot pool is lower.
+        and compares it to the current jackpot pool, which is the last entry
+        of the jackpot journal or, if the journal is empty, the jackpot pool
+        in the configuration file. The jackpot pool is automatically set to
+        the jackpot seed if the jackpot pool is lower.
 
         Returns:
             int: The calculated jackpot amount.
@@ -204,7 +285,10 @@ class SlotMachine:
         combo_events: Dict[str,
                            ReelSymbol] = self.configuration["combo_events"]
         jackpot_seed: int = combo_events["jackpot"]["fixed_amount"]
-        jackpot_pool: int = self.configuration["jackpot_pool"]
+        journal_jackpot_pool: int | None = self.jackpot_journal.replay()
+        jackpot_pool: int = (
+            journal_jackpot_pool if journal_jackpot_pool is not None
+            else self.configuration["jackpot_pool"])
         if jackpot_pool < jackpot_seed:
             jackpot: int = jackpot_seed
         else:
@@ -346,15 +430,21 @@ class SlotMachine:
         Saves the current slot machine configuration to a file.
 
         This method writes the current configuration stored in
-        the `configuration` attribute to a file specified by
-        the `file_name` attribute in JSON format.
+        the `configuration` attribute, with the current jackpot pool, to a
+        file specified by the `file_name` attribute in JSON format. The file
+        is written to a temporary file first and then renamed. Afterwards,
+        the jackpot journal is cleared.
 
         Raises:
             IOError: If the file cannot be opened or written to.
         """
         # print("Saving slot machine configuration...")
-        with open(self.file_name, "w") as file:
+        self.configuration["jackpot_pool"] = self._jackpot
+        temporary_file_name: str = self.file_name + ".tmp"
+        with open(temporary_file_name, "w") as file:
             file.write(json.dumps(self.configuration))
+        replace(temporary_file_name, self.file_name)
+        self.jackpot_journal.clear()
         # print("Slot machine configuration saved.")
     # endregion
 
@@ -448,15 +538,34 @@ class SlotMachine:
         return (cast(Float, any_lose_probability),
                 cast(Float, standard_lose_probability))
 
+    def get_calculation_key(self) -> str:
+        """
+        Hash the parts of the configuration that the probabilities and the
+        expected value depend on (the reels, fees and combo events). The
+        reels are hashed by content, so changing them in place also changes
+        the key, while changes to the jackpot pool do not.
+
+        Returns:
+            str: The SHA-256 hex digest of the reels, fees and combo events.
+        """
+        calculation_inputs: str = json.dumps(
+            {"reels": self._reels,
+             "fees": self._fees,
+             "combo_events": self.configuration["combo_events"]},
+            sort_keys=True)
+        return sha256(calculation_inputs.encode()).hexdigest()
+
     def calculate_all_probabilities(self) -> Dict[str, Float]:
         """
         Calculate the probabilities for all possible outcomes in
         the slot machine.
 
-        This method loads the reels, calculates the probability for each
-        symbol on the first reel (presuming all reels will have the same unique
-        symbols, whether in the same or different amounts), and then calculates
-        the probabilities for losing and winning events.
+        This method calculates the probability for each symbol on the first
+        reel (presuming all reels will have the same unique symbols, whether
+        in the same or different amounts), and then calculates the
+        probabilities for losing and winning events. The result is cached
+        until the reels, fees or combo events change
+        (see get_calculation_key()).
 
         Returns:
             Dict: A dictionary where the keys are the event names
@@ -464,7 +573,10 @@ class SlotMachine:
                     and the values are their respective probabilities.
         """
         # TODO Ensure it's still working correctly now after using TypedDicts
-        self.reels = self.load_reels()
+        calculation_key: str = self.get_calculation_key()
+        if (self._cached_probabilities is not None and
+                self._cached_probabilities[0] == calculation_key):
+            return dict(self._cached_probabilities[1])
         probabilities: Dict[str, Float] = {}
         for symbol in self.reels["reel1"]:
             probability: Float = self.calculate_event_probability(symbol)
@@ -476,7 +588,8 @@ class SlotMachine:
         probabilities["standard_lose"] = standard_lose_probability
         probabilities["any_lose"] = any_lose_probability
         probabilities["win"] = cast(Float, Integer(1) - any_lose_probability)
-        return probabilities
+        self._cached_probabilities = (calculation_key, probabilities)
+        return dict(probabilities)
     # endregion
 
     # region Slot count
@@ -580,6 +693,10 @@ class SlotMachine:
             added to the jackpot pool.
         - jackpot_fee_fixed_amount: A fixed amount that is subtracted from the
             player's total return for each spin, and added to the jackpot pool.
+
+        The expressions are cached until the reels, fees or combo events
+        change (see get_calculation_key()). When they come from the cache,
+        only the final expressions are printed.
         """
 
         def print_if_not_silent(*args: Any, **kwargs: Any) -> None:
@@ -590,8 +707,16 @@ class SlotMachine:
             if not silent:
                 print(*args, **kwargs)
 
-        # Load configuration and calculate probabilities
-        self.configuration = self.load_config()
+        calculation_key: str = self.get_calculation_key()
+        if (self._cached_expected_value is not None and
+                self._cached_expected_value[0] == calculation_key):
+            print_if_not_silent(f"Expected total return:")
+            print_if_not_silent(self._cached_expected_value[1][0])
+            print_if_not_silent(f"Expected return:")
+            print_if_not_silent(self._cached_expected_value[1][1])
+            return self._cached_expected_value[1]
+
+        # Calculate probabilities
         probabilities: Dict[str, Float] = self.calculate_all_probabilities()
         events: KeysView[str] = probabilities.keys()
         combo_events: Dict[str, ReelSymbol] = (
@@ -804,8 +929,6 @@ class SlotMachine:
         # BUG The rounding to nearest integer (for the fees esp.) is not accounted for
 
         # Fees
-        # Refresh config
-        self.configuration = self.load_config()
         # Main fee
         low_wager_main_fee: Integer = Integer(self._fees["low_wager_main"])
         medium_wager_main_fee: Float = Float(self._fees["medium_wager_main"])
@@ -853,6 +976,8 @@ class SlotMachine:
         print_if_not_silent(f"Expected return:")
         print_if_not_silent(expected_return)
 
+        self._cached_expected_value = (
+            calculation_key, (expected_total_return, expected_return))
         return (expected_total_return, expected_return)
     # endregion
 
@@ -862,21 +987,27 @@ class SlotMachine:
         Calculate the average jackpot amount on payout
         based on a given seed (start amount) integer.
 
+        The jackpot pool is reset to the seed when the jackpot is won, and
+        grows by 1 coin on every other spin. On payout, the pool therefore
+        holds the seed plus the number of spins since the jackpot was last
+        won, which is 1 / p - 1 on average (p being the jackpot probability,
+        assuming every spin pays the jackpot fee). The exact RTP calculation
+        and the slot simulator use the same model.
+
         Args:
         seed_int -- The starting amount of the jackpot pool
         """
         seed: Integer = Integer(seed_int)
-        # 1 coin is added to the jackpot for every spin
+        # 1 coin is added to the jackpot for every spin that does not win it
         contribution_per_spin: Integer = Integer(1)
         jackpot_probability: Float = (
             self.calculate_all_probabilities()["jackpot"])
         average_spins_to_win = Rational(Integer(1), jackpot_probability)
+        # The winning spin resets the jackpot instead of adding to it
         jackpot_cycle_growth = (
-            Mul(contribution_per_spin, average_spins_to_win))
-        # min + max / 2
-        mean_jackpot = Rational(Add(Integer(0) + jackpot_cycle_growth))
-        # (0 + jackpot_cycle_growth) / 2
-        average_jackpot: Rational = cast(Rational, Add(seed, mean_jackpot))
+            Mul(contribution_per_spin, Add(average_spins_to_win, -1)))
+        average_jackpot: Rational = cast(Rational,
+                                         Add(seed, jackpot_cycle_growth))
         return average_jackpot
     # endregion
 
@@ -905,11 +1036,250 @@ class SlotMachine:
         return rtp_decimal
     # endregion
 
+    # region Slot fees
+    def jackpot_fee_paid(self, wager: int) -> bool:
+        """
+        Check if a wager covers the jackpot fee. If it does not, the player
+        plays in "no jackpot" mode and is not eligible for the jackpot.
+
+        Args:
+            wager: The amount wagered.
+
+        Returns:
+            bool: True if the jackpot fee is paid, otherwise False.
+        """
+        fees_dict: Dict[str, int | float] = self.configuration["fees"]
+        low_wager_main_fee: int = cast(int, fees_dict["low_wager_main"])
+        low_wager_jackpot_fee: int = (
+            cast(int, fees_dict["low_wager_jackpot"]))
+        return wager >= (low_wager_main_fee + low_wager_jackpot_fee)
+
+    def calculate_fees(self, wager: int) -> tuple[int, int]:
+        """
+        Calculate the fees for a wager, rounded to whole coins the same way
+        they are charged.
+
+        Args:
+            wager: The amount wagered.
+
+        Returns:
+            tuple[int, int]: The main fee and the jackpot fee.
+        """
+        fees_dict: Dict[str, int | float] = self.configuration["fees"]
+        low_wager_main_fee: int = cast(int, fees_dict["low_wager_main"])
+        medium_wager_main_fee: float = (
+            cast(float, fees_dict["medium_wager_main"]))
+        high_wager_main_fee: float = (
+            cast(float, fees_dict["high_wager_main"]))
+        low_wager_jackpot_fee: int = (
+            cast(int, fees_dict["low_wager_jackpot"]))
+        medium_wager_jackpot_fee: float = (
+            cast(float, fees_dict["medium_wager_jackpot"]))
+        high_wager_jackpot_fee: float = (
+            cast(float, fees_dict["high_wager_jackpot"]))
+        main_fee: int
+        jackpot_fee: int
+        # Remember to also change the help message if you change the
+        # conditions
+        if not self.jackpot_fee_paid(wager):
+            # IMPROVE Make min_wager config keys
+            main_fee = low_wager_main_fee
+            jackpot_fee = 0
+        elif wager < 10:
+            main_fee = low_wager_main_fee
+            jackpot_fee = low_wager_jackpot_fee
+        elif wager < 100:
+            main_fee = round(wager * medium_wager_main_fee)
+            jackpot_fee = round(wager * medium_wager_jackpot_fee)
+        else:
+            main_fee = round(wager * high_wager_main_fee)
+            jackpot_fee = round(wager * high_wager_jackpot_fee)
+        return (main_fee, jackpot_fee)
+
+    def calculate_returns(self,
+                          wager: int,
+                          event_name: str,
+                          win_money: int) -> tuple[int, int]:
+        """
+        Calculate what the player gets back from a spin. The fees are
+        charged on every spin, except when the player loses the wager, in
+        which case the entire stake (fees included) is lost.
+
+        Args:
+            wager: The amount wagered.
+            event_name: The internal name of the event
+                (see calculate_award_money()).
+            win_money: The money awarded by the event
+                (see calculate_award_money()).
+
+        Returns:
+            tuple[int, int]: The net return (the player's profit or loss,
+                wager excluded) and the total return (the money the player
+                gets back, wager included).
+        """
+        if event_name == "lose_wager":
+            return (-wager, 0)
+        main_fee: int
+        jackpot_fee: int
+        main_fee, jackpot_fee = self.calculate_fees(wager)
+        net_return: int = win_money - main_fee - jackpot_fee
+        return (net_return, wager + net_return)
+    # endregion
+
+    # region Slot exact RTP
+    def calculate_exact_probabilities(self) -> Dict[str, Fraction]:
+        """
+        Calculate the probabilities for all possible outcomes as exact
+        fractions. Unlike calculate_all_probabilities(), the probability of
+        no combo ("standard_lose") is one minus the probabilities of the
+        combos, since the combos cannot happen at the same time. The result
+        is cached until the reels, fees or combo events change.
+
+        Returns:
+            Dict[str, Fraction]: The probabilities, keyed by the event names
+                (symbol combos, "standard_lose", "any_lose", "win").
+        """
+        calculation_key: str = self.get_calculation_key()
+        if (self._cached_exact_probabilities is not None and
+                self._cached_exact_probabilities[0] == calculation_key):
+            return dict(self._cached_exact_probabilities[1])
+        probabilities: Dict[str, Fraction] = {}
+        for symbol in self.reels["reel1"]:
+            probability: Fraction = Fraction(1)
+            for reel in self.reels.values():
+                reel_symbols: Dict[str, int] = cast(Dict[str, int], reel)
+                total_reel_symbols: int = sum(reel_symbols.values())
+                if total_reel_symbols == 0:
+                    probability = Fraction(0)
+                    break
+                probability *= Fraction(reel_symbols.get(symbol, 0),
+                                        total_reel_symbols)
+            probabilities[symbol] = probability
+        standard_lose_probability: Fraction = (
+            1 - sum(probabilities.values(), Fraction(0)))
+        any_lose_probability: Fraction = (
+            standard_lose_probability +
+            probabilities.get("lose_wager", Fraction(0)))
+        probabilities["standard_lose"] = standard_lose_probability
+        probabilities["any_lose"] = any_lose_probability
+        probabilities["win"] = 1 - any_lose_probability
+        self._cached_exact_probabilities = (calculation_key, probabilities)
+        return dict(probabilities)
+
+    def calculate_exact_expected_values(
+            self,
+            wagers: Iterable[int]) -> Dict[int, tuple[Fraction, Fraction]]:
+        """
+        Calculate the exact expected total return and expected return for
+        several wagers. Each event's total return is calculated the way the
+        slot machine pays it out: the fees are rounded to whole coins and the
+        win money is rounded down, so unlike calculate_expected_value(), the
+        result accounts for rounding. The jackpot is valued at its average
+        on payout (see calculate_average_jackpot()).
+
+        Args:
+            wagers: The wagers.
+
+        Returns:
+            Dict[int, tuple[Fraction, Fraction]]: The expected total return
+                and the expected return, keyed by the wager.
+        """
+        probabilities: Dict[str, Fraction] = (
+            self.calculate_exact_probabilities())
+        combo_events: Dict[str, ReelSymbol] = (
+            self.configuration["combo_events"])
+        jackpot_average: Fraction = Fraction(0)
+        jackpot_probability: Fraction = probabilities.get("jackpot",
+                                                          Fraction(0))
+        if jackpot_probability != 0:
+            # Same as calculate_average_jackpot(): the seed plus one coin
+            # for every spin since the jackpot was last won
+            jackpot_seed: int = combo_events["jackpot"]["fixed_amount"]
+            jackpot_average = jackpot_seed + 1 / jackpot_probability - 1
+        events: List[str] = [event for event in probabilities
+                             if event not in ("any_lose", "win") and
+                             probabilities[event] != 0]
+        expected_values: Dict[int, tuple[Fraction, Fraction]] = {}
+        for wager in wagers:
+            main_fee: int
+            jackpot_fee: int
+            main_fee, jackpot_fee = self.calculate_fees(wager)
+            fees: int = main_fee + jackpot_fee
+            jackpot_fee_paid: bool = self.jackpot_fee_paid(wager)
+            expected_total_return: Fraction = Fraction(0)
+            for event in events:
+                event_total_return: Fraction | int
+                win_money: int = 0
+                if event == "jackpot":
+                    if jackpot_fee_paid:
+                        event_total_return = wager + jackpot_average - fees
+                    else:
+                        event_total_return = wager - fees
+                else:
+                    if event not in ("lose_wager", "standard_lose"):
+                        wager_multiplier: Fraction = Fraction(
+                            combo_events[event]["wager_multiplier"])
+                        fixed_amount: int = (
+                            combo_events[event]["fixed_amount"])
+                        win_money = math.floor(
+                            wager * wager_multiplier + fixed_amount - wager)
+                    # Same returns as the ones paid out by the slot machine
+                    event_total_return = self.calculate_returns(
+                        wager=wager, event_name=event, win_money=win_money)[1]
+                expected_total_return += (
+                    probabilities[event] * event_total_return)
+            expected_values[wager] = (expected_total_return,
+                                      expected_total_return - wager)
+        return expected_values
+
+    def calculate_exact_rtp(self,
+                            wagers: Iterable[int]) -> Dict[int, Fraction]:
+        """
+        Calculate the exact return to player (RTP) for several wagers in one
+        pass, without sympy. See calculate_exact_expected_values().
+
+        Args:
+            wagers: The wagers. Wagers that are not positive are skipped.
+
+        Returns:
+            Dict[int, Fraction]: The RTP as a fraction, keyed by the wager.
+        """
+        positive_wagers: List[int] = [wager for wager in wagers if wager > 0]
+        expected_values: Dict[int, tuple[Fraction, Fraction]] = (
+            self.calculate_exact_expected_values(positive_wagers))
+        return {wager: expected_total_return / wager
+                for wager, (expected_total_return, _)
+                in expected_values.items()}
+    # endregion
+
     # region Slot stop reel
+    def build_reel_samplers(self) -> None:
+        """
+        Builds a table of the cumulative symbol counts of each reel, which
+        stop_reel() searches instead of listing every symbol on the reel.
+        This is done when the reels are loaded or set, so changing the reels
+        in place has no effect on stop_reel() until they are set again.
+        """
+        self._reel_samplers = {}
+        for reel_name, reel in self._reels.items():
+            reel_symbols: Dict[str, int] = cast(Dict[str, int], reel)
+            symbols_on_reel: List[str] = []
+            cumulative_counts: List[int] = []
+            total: int = 0
+            for symbol, count in reel_symbols.items():
+                if count <= 0:
+                    continue
+                total += count
+                symbols_on_reel.append(symbol)
+                cumulative_counts.append(total)
+            self._reel_samplers[reel_name] = (symbols_on_reel,
+                                              cumulative_counts)
+
     def stop_reel(self, reel: Literal["reel1", "reel2", "reel3"]) -> str:
         """
         Stops the specified reel and returns the symbol at the
-        stopping position.
+        stopping position. Each unit of a symbol on the reel is equally
+        likely to be picked.
 
         Args:
             reel: The reel to stop.
@@ -917,16 +1287,61 @@ class SlotMachine:
         Returns:
             str: The symbol at the stopping position.
         """
-        # Create a list with all units of each symbol type on the reel
-        reel_symbols: List[str] = []
-        for s in self.reels[reel]:
-            reel_symbols.extend([s] * self.reels[reel][s])
-        # Randomly select a symbol from the list
-        symbol: str = random.choice(reel_symbols)
+        symbols_on_reel: List[str]
+        cumulative_counts: List[int]
+        symbols_on_reel, cumulative_counts = self._reel_samplers[reel]
+        if len(cumulative_counts) == 0:
+            raise IndexError(f"There are no symbols on {reel}.")
+        # Pick a position on the reel and find the symbol it belongs to
+        position: int = random.randrange(cumulative_counts[-1])
+        symbol: str = symbols_on_reel[
+            bisect_right(cumulative_counts, position)]
         return symbol
     # endregion
 
     # region Slot win money
+    def compile_payout_table(self) -> None:
+        """
+        Builds the payout table used by calculate_award_money(). The table
+        holds the event of every combination of three symbols, for spins with
+        and without the jackpot fee paid, along with the event's friendly
+        name, wager multiplier and fixed amount. It is built when the slot
+        machine starts and when the reels are set.
+        """
+        combo_events: Dict[str, ReelSymbol] = (
+            self.configuration["combo_events"])
+        standard_lose: PayoutEntry = {
+            "event_name": "standard_lose",
+            "event_name_friendly": "No win",
+            "wager_multiplier": 1.0,
+            "fixed_amount": 0
+        }
+        payout_table: Dict[tuple[str, str, str, bool], PayoutEntry] = {}
+        for symbol1 in combo_events:
+            for symbol2 in combo_events:
+                for symbol3 in combo_events:
+                    payout_table[(symbol1, symbol2, symbol3, True)] = (
+                        standard_lose)
+                    payout_table[(symbol1, symbol2, symbol3, False)] = (
+                        standard_lose)
+        for symbol, combo_event in combo_events.items():
+            payout: PayoutEntry = {
+                "event_name": symbol,
+                "event_name_friendly": self.make_friendly_event_name(symbol),
+                "wager_multiplier": combo_event["wager_multiplier"],
+                "fixed_amount": combo_event["fixed_amount"]
+            }
+            payout_table[(symbol, symbol, symbol, True)] = payout
+            if symbol == "jackpot":
+                payout = {
+                    "event_name": "jackpot_fail",
+                    "event_name_friendly": "No Jackpot",
+                    "wager_multiplier": 1.0,
+                    "fixed_amount": 0
+                }
+            payout_table[(symbol, symbol, symbol, False)] = payout
+        self.payout_table = payout_table
+
     def calculate_award_money(self,
                               wager: int,
                               results: ReelResults
@@ -937,7 +1352,8 @@ class SlotMachine:
         that a combo event would award the player. It will not return a negative
         value.
         It also returns the internal name of the event and a user-friendly name
-        of the event.
+        of the event. The event is looked up in the payout table (see
+        compile_payout_table()).
         Args:
             wager: The amount of money wagered.
             results: The results of the reels, containing associated
@@ -949,62 +1365,51 @@ class SlotMachine:
                 - win_money_rounded: The amount of money won, rounded down to
                     the nearest integer.
         """
-        if (not (
-            results["reel1"]["associated_combo_event"].keys()
-            == results["reel2"]["associated_combo_event"].keys()
-                == results["reel3"]["associated_combo_event"].keys())):
-            return ("standard_lose", "No win", 0)
-
-        # IMPROVE Code is repeated from slots() function
-        fees_dict: Dict[str, int | float] = self.configuration["fees"]
-        low_wager_main_fee: int = (
-            cast(int, fees_dict["low_wager_main"]))
-        low_wager_jackpot_fee: int = (
-            cast(int, fees_dict["low_wager_jackpot"]))
-        jackpot_fee_paid: bool = (
-            wager >= (low_wager_jackpot_fee + low_wager_main_fee))
-        no_jackpot_mode: bool = False if jackpot_fee_paid else True
         # Since associated_combo_event is a dict with only one key,
-        # we can get the key name (thus event name) by getting the first key
-        event_name: str = next(
-            iter(results["reel1"]["associated_combo_event"]))
-        # print(f"event_name: {event_name}")
-        wager_multiplier: float = (
-            results["reel1"]["associated_combo_event"][event_name]
-            ["wager_multiplier"])
-        fixed_amount_payout: int = (
-            results["reel1"]["associated_combo_event"][event_name]
-            ["fixed_amount"])
-        # print(f"event_multiplier: {wager_multiplier}")
-        # print(f"fixed_amount_payout: {fixed_amount_payout}")
-        event_name_friendly: str = ""
-        win_money: float = 0.0
-        win_money_rounded: int = 0
-        if event_name == "lose_wager":
-            event_name_friendly = "Lose wager"
-            return (event_name, event_name_friendly, 0)
+        # we can get the key name (thus symbol name) by getting the first key
+        return self.calculate_combo_award_money(
+            wager=wager,
+            symbols=(next(iter(results["reel1"]["associated_combo_event"])),
+                     next(iter(results["reel2"]["associated_combo_event"])),
+                     next(iter(results["reel3"]["associated_combo_event"]))))
+
+    def calculate_combo_award_money(self,
+                                    wager: int,
+                                    symbols: tuple[str, str, str]
+                                    ) -> tuple[str, str, int]:
+        """
+        Calculate the award money of the symbols that the reels stopped at.
+        See calculate_award_money().
+
+        Args:
+            wager: The amount of money wagered.
+            symbols: The symbols of reel 1, reel 2 and reel 3.
+
+        Returns:
+            tuple: A tuple containing:
+                - event_name: The internal name of the event.
+                - event_name_friendly: A user-friendly name of the event.
+                - win_money_rounded: The amount of money won, rounded down to
+                    the nearest integer.
+        """
+        payout: PayoutEntry | None = self.payout_table.get(
+            (symbols[0], symbols[1], symbols[2],
+             self.jackpot_fee_paid(wager)))
+        if payout is None:
+            # A reel has not been stopped
+            return ("standard_lose", "No win", 0)
+        event_name: str = payout["event_name"]
+        event_name_friendly: str = payout["event_name_friendly"]
+        win_money_rounded: int
+        if event_name in ("standard_lose", "lose_wager", "jackpot_fail"):
+            win_money_rounded = 0
         elif event_name == "jackpot":
-            if no_jackpot_mode:
-                event_name = "jackpot_fail"
-                event_name_friendly = "No Jackpot"
-                win_money_rounded = 0
-            else:
-                event_name_friendly = "JACKPOT"
-                win_money_rounded = self.jackpot
-            return (event_name, event_name_friendly, win_money_rounded)
-        win_money = (
-            (wager * wager_multiplier) + fixed_amount_payout) - wager
-        win_money_rounded: int = math.floor(win_money)
-        # Get rid of ".0"
-        event_multiplier_friendly: str
-        event_multiplier_floored: int = math.floor(wager_multiplier)
-        if wager_multiplier == event_multiplier_floored:
-            event_multiplier_friendly = str(int(wager_multiplier))
+            win_money_rounded = self.jackpot
         else:
-            event_multiplier_friendly = str(wager_multiplier)
-        event_name_friendly += "{}X".format(event_multiplier_friendly)
-        if fixed_amount_payout > 0:
-            event_name_friendly = "+{}".format(fixed_amount_payout)
+            win_money: float = (
+                (wager * payout["wager_multiplier"]) +
+                payout["fixed_amount"]) - wager
+            win_money_rounded = math.floor(win_money)
         return (event_name, event_name_friendly, win_money_rounded)
     # endregion
 
@@ -1018,7 +1423,7 @@ class SlotMachine:
         constructs a friendly name based on the wager multiplier
         and fixed amount payout from the configuration.
 
-        This code is copied from calculate_award_money().
+        It is also used to compile the payout table.
 
         Args:
             event_name: The internal name of the event.
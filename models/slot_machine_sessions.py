@@ -0,0 +1,206 @@
+# region Imports
+# Standard library
+import asyncio
+from time import time
+from typing import Any, Dict
+# endregion
+
+# region Slot machine sessions
+
+
+class SlotMachineSessions:
+    """
+    Makes sure that each user plays on only one slot machine at a time.
+
+    Each user gets an asyncio lock. A spin waits for the lock for at most
+    `wait_timeout` seconds, and starts as soon as the user's previous spin
+    releases it. Waiting spins get the lock in the order they asked for it.
+    Sessions whose task has ended without releasing the lock, or that are
+    older than `max_session_age` seconds, are stale and are released when a
+    new session is requested. A task holding a session is never cancelled,
+    so a spin that is under way is always paid out and charged. A session
+    can only be released by the task that started it (or as stale), so a
+    spin whose stale session was released cannot end the session of the
+    user's next spin.
+
+    Attributes:
+        wait_timeout: The number of seconds to wait for the user's previous
+            session to end.
+        max_session_age: If set, sessions older than this many seconds are
+            stale.
+        start_times: The time each active session started, keyed by the
+            user ID.
+
+    Methods:
+        __init__(wait_timeout = 2, max_session_age = None):
+            Initializes the sessions.
+        is_active(user_id):
+            Checks if a user has an active session.
+        holds(user_id):
+            Checks if the current task holds the user's session.
+        acquire(user_id):
+            Starts a session, waiting for the previous one to end.
+        release(user_id):
+            Ends a session started by the current task.
+        is_stale(user_id):
+            Checks if a session was left behind or is too old.
+        release_if_stale(user_id):
+            Ends a session if it is stale.
+        clean_up():
+            Ends all stale sessions.
+    """
+
+    def __init__(self,
+                 wait_timeout: float = 2,
+                 max_session_age: float | None = None) -> None:
+        """
+        Initializes the slot machine sessions.
+
+        Args:
+            wait_timeout: The number of seconds to wait for the user's
+                previous session to end. Defaults to 2.
+            max_session_age: If set, sessions older than this many seconds
+                are stale. Defaults to None.
+        """
+        self.wait_timeout: float = wait_timeout
+        self.max_session_age: float | None = max_session_age
+        self.start_times: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._owners: Dict[int, "asyncio.Task[Any] | None"] = {}
+        # Number of tasks waiting for each user's lock
+        self._waiting: Dict[int, int] = {}
+
+    def is_active(self, user_id: int) -> bool:
+        """
+        Checks if a user has an active session.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if the user has an active session.
+        """
+        return user_id in self.start_times
+
+    def holds(self, user_id: int) -> bool:
+        """
+        Checks if the current task holds the user's session.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if the session was started by the current task.
+        """
+        return (self.is_active(user_id) and
+                self._owners.get(user_id) is asyncio.current_task())
+
+    async def acquire(self, user_id: int) -> bool:
+        """
+        Starts a session for a user. If the user already has a session, this
+        waits for it to end, for at most `wait_timeout` seconds.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if the session was started, False if the previous
+                session did not end in time.
+        """
+        self.clean_up()
+        lock: asyncio.Lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiting[user_id] = self._waiting.get(user_id, 0) + 1
+        try:
+            await asyncio.wait_for(lock.acquire(), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting[user_id] -= 1
+            if self._waiting[user_id] == 0:
+                del self._waiting[user_id]
+        self.start_times[user_id] = time()
+        self._owners[user_id] = asyncio.current_task()
+        return True
+
+    def release(self, user_id: int) -> bool:
+        """
+        Ends a user's session, letting the next waiting spin start. Does
+        nothing if the session was not started by the current task (for
+        example, because it was released as stale and another spin has
+        started since).
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if the session was ended.
+        """
+        if not self.holds(user_id):
+            print(f"WARNING: The slot machine session of {user_id} is not "
+                  "held by this spin and will not be ended.")
+            return False
+        self._end(user_id)
+        return True
+
+    def _end(self, user_id: int) -> None:
+        """
+        Ends a user's session, whichever task started it.
+
+        Args:
+            user_id: The user ID.
+        """
+        del self.start_times[user_id]
+        del self._owners[user_id]
+        lock: asyncio.Lock | None = self._locks.get(user_id)
+        if lock is not None and lock.locked():
+            lock.release()
+        if user_id not in self._waiting:
+            # Nobody is waiting, so the lock is no longer needed
+            self._locks.pop(user_id, None)
+
+    def is_stale(self, user_id: int) -> bool:
+        """
+        Checks if a user's session is stale: its task has ended without
+        releasing it, or it is older than `max_session_age` seconds.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if the user has a stale session.
+        """
+        if not self.is_active(user_id):
+            return False
+        owner: "asyncio.Task[Any] | None" = self._owners.get(user_id)
+        if owner is not None and owner.done():
+            return True
+        return (self.max_session_age is not None and
+                time() - self.start_times[user_id] >= self.max_session_age)
+
+    def release_if_stale(self, user_id: int) -> bool:
+        """
+        Ends a user's session if it is stale. The task holding the session
+        is not cancelled, so a spin that is still running completes (and
+        is charged) normally.
+
+        Args:
+            user_id: The user ID.
+
+        Returns:
+            bool: True if a stale session was ended.
+        """
+        if not self.is_stale(user_id):
+            return False
+        print(f"WARNING: The slot machine session of {user_id} is stale "
+              f"(started {time() - self.start_times[user_id]:.0f} seconds "
+              "ago). It will be ended.")
+        self._end(user_id)
+        return True
+
+    def clean_up(self) -> None:
+        """
+        Ends all stale sessions.
+        """
+        for user_id in list(self.start_times):
+            self.release_if_stale(user_id)
+# endregion
@@ -0,0 +1,220 @@
+# region Imports
+# Standard library
+import math
+from itertools import product
+from typing import Dict, Iterable, List, cast
+
+# Third party
+import numpy as np
+from numpy.typing import NDArray
+
+# Local
+from type_aliases import SlotSimulationResult
+from models.slot_machine import SlotMachine
+# endregion
+
+# region Slot simulator
+
+
+class SlotSimulator:
+    """
+    Simulates spins of a slot machine in batches with NumPy, to check the
+    analytical return to player (RTP) against empirical results.
+
+    Each spin is paid out the way insert_coins pays it: the event and win
+    money come from the slot machine's payout table
+    (SlotMachine.calculate_combo_award_money()) and the returns from
+    SlotMachine.calculate_returns(). A jackpot win pays the current jackpot
+    pool, and every other spin adds one coin to the pool, which starts at
+    the jackpot seed (see SlotMachine.calculate_average_jackpot()).
+
+    Attributes:
+        slot_machine: The slot machine to simulate.
+        symbols: The symbols on the reels.
+
+    Methods:
+        __init__(slot_machine, seed = None):
+            Initializes the simulator.
+        simulate(wager, spins, batch_size = 1000000):
+            Simulates spins with the same wager.
+        simulate_wagers(wagers, spins, batch_size = 1000000):
+            Simulates spins for each of several wagers.
+    """
+
+    def __init__(self,
+                 slot_machine: SlotMachine,
+                 seed: int | None = None) -> None:
+        """
+        Initializes the simulator.
+
+        Args:
+            slot_machine: The slot machine to simulate.
+            seed: The seed of the random number generator, for reproducible
+                results. Defaults to None.
+        """
+        self.slot_machine: SlotMachine = slot_machine
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self.symbols: List[str] = list(slot_machine.reels["reel1"])
+        self._reel_probabilities: List[NDArray[np.float64]] = []
+        for reel in slot_machine.reels.values():
+            reel_symbols: Dict[str, int] = cast(Dict[str, int], reel)
+            counts: NDArray[np.float64] = np.array(
+                [reel_symbols.get(symbol, 0) for symbol in self.symbols],
+                dtype=np.float64)
+            if counts.sum() == 0:
+                raise ValueError("Cannot simulate a reel without symbols.")
+            self._reel_probabilities.append(counts / counts.sum())
+
+    def _get_payouts(
+            self,
+            wager: int
+    ) -> tuple[NDArray[np.int64], NDArray[np.bool_], NDArray[np.bool_]]:
+        """
+        Gets the total return of every combination of symbols for a wager,
+        from the slot machine's payout table. The jackpot's total return
+        leaves out the jackpot pool, which is added per win.
+
+        Args:
+            wager: The wager.
+
+        Returns:
+            tuple: Three arrays, indexed by the symbol indices (in the order
+                of `symbols`) of reel 1, reel 2 and reel 3:
+                - The total returns.
+                - Whether the combination wins a combo.
+                - Whether the combination wins the jackpot.
+        """
+        shape: tuple[int, int, int] = (len(self.symbols),) * 3
+        total_returns: NDArray[np.int64] = np.zeros(shape, dtype=np.int64)
+        winning_combos: NDArray[np.bool_] = np.zeros(shape, dtype=np.bool_)
+        jackpot_combos: NDArray[np.bool_] = np.zeros(shape, dtype=np.bool_)
+        for indices in product(range(len(self.symbols)), repeat=3):
+            event_name: str
+            win_money: int
+            event_name, _, win_money = (
+                self.slot_machine.calculate_combo_award_money(
+                    wager=wager,
+                    symbols=(self.symbols[indices[0]],
+                             self.symbols[indices[1]],
+                             self.symbols[indices[2]])))
+            if event_name == "jackpot":
+                # The jackpot pool depends on the spins since the last win
+                win_money = 0
+                jackpot_combos[indices] = True
+            total_returns[indices] = self.slot_machine.calculate_returns(
+                wager=wager, event_name=event_name, win_money=win_money)[1]
+            winning_combos[indices] = event_name not in (
+                "standard_lose", "lose_wager", "jackpot_fail")
+        return (total_returns, winning_combos, jackpot_combos)
+
+    def simulate(self,
+                 wager: int,
+                 spins: int,
+                 batch_size: int = 1000000) -> SlotSimulationResult:
+        """
+        Simulates spins with the same wager.
+
+        Args:
+            wager: The wager. Must be positive.
+            spins: The number of spins.
+            batch_size: The number of spins drawn at once. Defaults to
+                1000000.
+
+        Returns:
+            SlotSimulationResult: The empirical RTP (with its standard error
+                and the exact RTP from SlotMachine.calculate_exact_rtp()),
+                the variance of the net return per spin, the share of spins
+                that won a combo, and the number of jackpot wins and the
+                average number of spins between them.
+        """
+        if wager <= 0:
+            raise ValueError("The wager must be positive.")
+        payout_total_returns: NDArray[np.int64]
+        payout_winning_combos: NDArray[np.bool_]
+        payout_jackpot_combos: NDArray[np.bool_]
+        (payout_total_returns, payout_winning_combos,
+         payout_jackpot_combos) = self._get_payouts(wager)
+        jackpot_seed: int = (
+            self.slot_machine.configuration["combo_events"]
+            ["jackpot"]["fixed_amount"])
+
+        total_return_sum: float = 0.0
+        net_return_square_sum: float = 0.0
+        hits: int = 0
+        jackpot_wins: int = 0
+        jackpot_cycle_sum: int = 0
+        # Spins since the jackpot was last won (or since the start)
+        spins_since_jackpot: int = 0
+        spins_done: int = 0
+        while spins_done < spins:
+            batch: int = min(batch_size, spins - spins_done)
+            stops: List[NDArray[np.int64]] = [
+                self._rng.choice(len(self.symbols), size=batch, p=p)
+                for p in self._reel_probabilities]
+            total_returns: NDArray[np.int64] = (
+                payout_total_returns[stops[0], stops[1], stops[2]])
+            winning_combo: NDArray[np.bool_] = (
+                payout_winning_combos[stops[0], stops[1], stops[2]])
+            win_positions: NDArray[np.int64] = np.flatnonzero(
+                payout_jackpot_combos[stops[0], stops[1], stops[2]])
+            if len(win_positions) > 0:
+                # The pool grows by one coin on every spin that does not
+                # win it
+                previous_positions: NDArray[np.int64] = np.concatenate(
+                    ([-1 - spins_since_jackpot], win_positions[:-1]))
+                cycles: NDArray[np.int64] = (
+                    win_positions - previous_positions)
+                total_returns[win_positions] += jackpot_seed + cycles - 1
+                jackpot_wins += len(win_positions)
+                jackpot_cycle_sum += int(cycles.sum())
+                spins_since_jackpot = batch - 1 - int(win_positions[-1])
+            else:
+                spins_since_jackpot += batch
+            net_returns: NDArray[np.float64] = (
+                total_returns.astype(np.float64) - wager)
+            total_return_sum += float(total_returns.sum())
+            net_return_square_sum += float(np.square(net_returns).sum())
+            hits += int(winning_combo.sum())
+            spins_done += batch
+
+        mean_net_return: float = total_return_sum / spins - wager
+        return_variance: float = (
+            net_return_square_sum / spins - mean_net_return ** 2)
+        expected_rtp: float = float(
+            self.slot_machine.calculate_exact_rtp([wager])[wager])
+        result: SlotSimulationResult = {
+            "wager": wager,
+            "spins": spins,
+            "rtp": total_return_sum / spins / wager,
+            "rtp_standard_error": (
+                math.sqrt(max(return_variance, 0.0) / spins) / wager),
+            "expected_rtp": expected_rtp,
+            "return_variance": return_variance,
+            "hit_frequency": hits / spins,
+            "jackpot_wins": jackpot_wins,
+            "average_jackpot_cycle": (
+                jackpot_cycle_sum / jackpot_wins
+                if jackpot_wins > 0 else None)
+        }
+        return result
+
+    def simulate_wagers(
+            self,
+            wagers: Iterable[int],
+            spins: int,
+            batch_size: int = 1000000) -> List[SlotSimulationResult]:
+        """
+        Simulates spins for each of several wagers.
+
+        Args:
+            wagers: The wagers.
+            spins: The number of spins per wager.
+            batch_size: The number of spins drawn at once. Defaults to
+                1000000.
+
+        Returns:
+            List[SlotSimulationResult]: The results, in the order of
+                the wagers.
+        """
+        return [self.simulate(wager, spins, batch_size) for wager in wagers]
+# endregion
@@ -0,0 +1,190 @@
+# region Imports
+# Standard library
+import asyncio
+from typing import Awaitable, Callable, List
+
+# Local
+from sponsorblockchain.sponsorblockchain_type_aliases import TransactionDict
+from sponsorblockchain.models.block import Block
+# endregion
+
+# region Tx batcher
+
+
+class TransactionBatcher:
+    """
+    Packs transactions that arrive close together into a single block
+    (group commit).
+
+    Transactions are queued as they are submitted. The first transaction in
+    a batch opens a window; every transaction that arrives before the window
+    closes, or until the batch is full, is committed together with it.
+    Each submitter waits until the block that holds its transaction has
+    been written, and gets that block back. When the batcher is closed, the
+    open window ends right away.
+
+    Attributes:
+        commit: The coroutine function that writes a batch of transactions
+            to the blockchain as one block and returns the block.
+        window_seconds: How long to wait for more transactions after the
+            first transaction of a batch arrives.
+        max_batch_size: The maximum number of transactions in a block.
+
+    Methods:
+        __init__(commit, window_seconds, max_batch_size):
+            Initializes the batcher.
+        submit(transaction):
+            Queues a transaction and waits until it has been committed.
+        close():
+            Waits for the queued transactions to be committed and stops
+            the batcher.
+    """
+
+    def __init__(self,
+                 commit: Callable[[List[TransactionDict]], Awaitable[Block]],
+                 window_seconds: float = 0.05,
+                 max_batch_size: int = 100) -> None:
+        """
+        Initializes the transaction batcher. The batch worker is started when
+        the first transaction is submitted.
+
+        Args:
+            commit: The coroutine function that writes a batch of
+                transactions to the blockchain as one block and returns
+                the block.
+            window_seconds: How long to wait for more transactions after the
+                first transaction of a batch arrives. Defaults to 0.05.
+            max_batch_size: The maximum number of transactions in a block.
+                Defaults to 100.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.commit: Callable[[List[TransactionDict]], Awaitable[Block]] = (
+            commit)
+        self.window_seconds: float = window_seconds
+        self.max_batch_size: int = max_batch_size
+        self._queue: (
+            asyncio.Queue[tuple[TransactionDict, asyncio.Future[Block]]] |
+            None) = None
+        self._worker: asyncio.Task[None] | None = None
+        self._closing: asyncio.Event = asyncio.Event()
+
+    async def submit(self, transaction: TransactionDict) -> Block:
+        """
+        Queues a transaction and waits until the block that holds it has
+        been written.
+
+        Args:
+            transaction: The transaction to commit.
+
+        Returns:
+            Block: The block that holds the transaction.
+
+        Raises:
+            Exception: If the block could not be written.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        committed: asyncio.Future[Block] = loop.create_future()
+        self._queue.put_nowait((transaction, committed))
+        return await committed
+
+    async def _collect_batch(
+            self) -> List[tuple[TransactionDict, asyncio.Future[Block]]]:
+        """
+        Waits for a transaction, and then collects the transactions that
+        arrive within the window, up to the maximum batch size. The window
+        ends early if the batcher is being closed.
+
+        Returns:
+            List: The transactions of the batch and their futures.
+        """
+        assert self._queue is not None, "The queue has not been created."
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        batch: List[tuple[TransactionDict, asyncio.Future[Block]]] = [
+            await self._queue.get()]
+        window_end: float = loop.time() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            seconds_left: float = window_end - loop.time()
+            if seconds_left <= 0 or self._closing.is_set():
+                break
+            getter: asyncio.Task[
+                tuple[TransactionDict, asyncio.Future[Block]]] = (
+                    asyncio.create_task(self._queue.get()))
+            closing: asyncio.Task[bool] = asyncio.create_task(
+                self._closing.wait())
+            try:
+                await asyncio.wait({getter, closing}, timeout=seconds_left,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closing.cancel()
+                if not getter.done():
+                    # A cancelled get leaves its transaction in the queue
+                    getter.cancel()
+            await asyncio.wait({getter})
+            if getter.cancelled():
+                break
+            batch.append(getter.result())
+        return batch
+
+    async def _commit_batch(
+            self,
+            batch: List[tuple[TransactionDict, asyncio.Future[Block]]]
+    ) -> None:
+        """
+        Commits a batch and resolves the futures of its submitters.
+
+        Args:
+            batch: The transactions of the batch and their futures.
+        """
+        assert self._queue is not None, "The queue has not been created."
+        transactions: List[TransactionDict] = (
+            [transaction for transaction, _ in batch])
+        try:
+            block: Block = await self.commit(transactions)
+        except Exception as e:
+            for _, committed in batch:
+                if not committed.done():
+                    committed.set_exception(e)
+        else:
+            for _, committed in batch:
+                if not committed.done():
+                    committed.set_result(block)
+        for _ in batch:
+            self._queue.task_done()
+
+    async def _run(self) -> None:
+        """
+        Commits batches of transactions as they arrive.
+        """
+        while True:
+            batch: List[tuple[TransactionDict, asyncio.Future[Block]]] = (
+                await self._collect_batch())
+            if len(batch) > 1:
+                print(f"Committing {len(batch)} transactions in one block...")
+            await self._commit_batch(batch)
+
+    async def close(self) -> None:
+        """
+        Ends the open window, waits until the queued transactions have been
+        committed and stops the batch worker.
+        """
+        if self._worker is None:
+            return
+        self._closing.set()
+        if self._queue is not None and not self._worker.done():
+            await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._closing.clear()
+# endregion
@@ -0,0 +1,282 @@
+# region Imports
+# Standard library
+from os import makedirs, remove, truncate
+from os.path import dirname, exists, getsize
+from typing import Iterator, List, Set
+# endregion
+
+# region Tx user index
+# The number of bytes read at a time when looking for the last line of the
+# index file
+TAIL_READ_SIZE: int = 4096
+
+
+class TransactionUserIndex:
+    """
+    Indexes the rows of the transactions spreadsheet by user, so that one
+    user's transactions can be read without loading the whole spreadsheet.
+
+    The index holds the byte offset and length of each row of the
+    spreadsheet, along with the user ID hashes of the row's sender and
+    receiver. It is stored next to the spreadsheet as a tab separated file
+    with one line per indexed row (offset, length, sender, receiver) that is
+    only ever appended to. The index is not kept in memory: only the
+    position in the spreadsheet up to which rows have been indexed is read
+    from the index file's last line, and the index file is scanned for the
+    requested users on each lookup. Rows that have been added to the
+    spreadsheet since the last update are indexed before each lookup.
+
+    Attributes:
+        spreadsheet_file_name: The path to the transactions spreadsheet.
+        file_name: The path to the index file.
+        indexed_offset: The byte offset in the spreadsheet up to which rows
+            have been indexed.
+
+    Methods:
+        __init__(spreadsheet_file_name = "data/transactions.tsv",
+            file_name = "data/transactions_user_index.tsv"):
+            Initializes the index and loads it from disk.
+        load():
+            Finds where the index file left off.
+        rebuild():
+            Deletes the index file and indexes the whole spreadsheet.
+        catch_up():
+            Indexes the rows appended to the spreadsheet since the
+            last update.
+        read_header():
+            Reads the header line of the spreadsheet.
+        read_user_hashes():
+            Reads the user ID hashes of everyone in the spreadsheet.
+        read_user_rows(user_hashes):
+            Reads the rows that involve any of the given users.
+    """
+
+    def __init__(
+            self,
+            spreadsheet_file_name: str = "data/transactions.tsv",
+            file_name: str = "data/transactions_user_index.tsv") -> None:
+        """
+        Initializes the transaction user index, loads it from disk and
+        indexes any rows that are not indexed yet.
+
+        Args:
+            spreadsheet_file_name: The path to the transactions spreadsheet.
+                Defaults to "data/transactions.tsv".
+            file_name: The path to the index file. Defaults to
+                "data/transactions_user_index.tsv".
+        """
+        print("Initializing transaction user index...")
+        self.spreadsheet_file_name: str = spreadsheet_file_name
+        self.file_name: str = file_name
+        self.indexed_offset: int = 0
+        self._sender_column: int | None = None
+        self._receiver_column: int | None = None
+        self.load()
+        self.catch_up()
+        print("Transaction user index initialized.")
+
+    def load(self) -> None:
+        """
+        Finds the position in the spreadsheet up to which rows have been
+        indexed, from the last line of the index file. A partially written
+        last line (after a crash) is cut off, so that the next line is not
+        appended to it.
+        """
+        self.indexed_offset = 0
+        if not exists(self.file_name):
+            return
+        file_size: int = getsize(self.file_name)
+        # Read the end of the file until it holds the last complete line
+        tail: bytes = b""
+        position: int = file_size
+        with open(self.file_name, "rb") as file:
+            while position > 0 and tail.count(b"\n") < 2:
+                read_size: int = min(TAIL_READ_SIZE, position)
+                position -= read_size
+                file.seek(position)
+                tail = file.read(read_size) + tail
+        complete_length: int = tail.rfind(b"\n") + 1
+        if position + complete_length != file_size:
+            print("WARNING: The transaction user index ends with a partial "
+                  "line, which will be removed.")
+            truncate(self.file_name, position + complete_length)
+        if complete_length == 0:
+            return
+        last_line: bytes = (
+            tail[:complete_length - 1].rsplit(b"\n", 1)[-1])
+        fields: List[str] = last_line.decode(errors="replace").split("\t")
+        try:
+            self.indexed_offset = int(fields[0]) + int(fields[1])
+        except (IndexError, ValueError):
+            print("ERROR: Invalid last line in transaction user index. "
+                  "The index will be rebuilt.")
+            self.rebuild()
+
+    def rebuild(self) -> int:
+        """
+        Deletes the index file and indexes the whole spreadsheet.
+
+        Returns:
+            int: The number of rows that were indexed.
+        """
+        print("Rebuilding transaction user index...")
+        if exists(self.file_name):
+            remove(self.file_name)
+        self.indexed_offset = 0
+        self._sender_column = None
+        self._receiver_column = None
+        return self.catch_up()
+
+    def _find_columns(self, header: str) -> bool:
+        """
+        Finds the positions of the Sender and Receiver columns.
+
+        Args:
+            header: The header line of the spreadsheet.
+
+        Returns:
+            bool: True if both columns were found, otherwise False.
+        """
+        column_names: List[str] = header.rstrip("\r\n").split("\t")
+        if "Sender" not in column_names or "Receiver" not in column_names:
+            print("ERROR: The transactions spreadsheet has no "
+                  "Sender or Receiver column.")
+            return False
+        self._sender_column = column_names.index("Sender")
+        self._receiver_column = column_names.index("Receiver")
+        return True
+
+    def catch_up(self) -> int:
+        """
+        Indexes the rows that have been appended to the spreadsheet since the
+        last update. A row that does not end with a line break is assumed to
+        still be in the process of being written and is left for the
+        next update.
+
+        Returns:
+            int: The number of rows that were indexed.
+        """
+        if not exists(self.spreadsheet_file_name):
+            return 0
+        file_size: int = getsize(self.spreadsheet_file_name)
+        if file_size < self.indexed_offset:
+            print("WARNING: The transactions spreadsheet has shrunk. "
+                  "The transaction user index will be rebuilt.")
+            return self.rebuild()
+        if (file_size == self.indexed_offset and
+                self._sender_column is not None):
+            return 0
+        rows_indexed: int = 0
+        index_lines: List[str] = []
+        with open(self.spreadsheet_file_name, "rb") as spreadsheet:
+            header: bytes = spreadsheet.readline()
+            if not header.endswith(b"\n"):
+                return 0
+            if self._sender_column is None or self._receiver_column is None:
+                if not self._find_columns(header.decode()):
+                    return 0
+            assert self._sender_column is not None
+            assert self._receiver_column is not None
+            offset: int = max(self.indexed_offset, len(header))
+            spreadsheet.seek(offset)
+            for line in spreadsheet:
+                if not line.endswith(b"\n"):
+                    break
+                length: int = len(line)
+                fields: List[str] = line.decode().rstrip("\r\n").split("\t")
+                offset += length
+                self.indexed_offset = offset
+                if len(fields) <= max(self._sender_column,
+                                      self._receiver_column):
+                    # Blank or malformed row
+                    continue
+                sender: str = fields[self._sender_column]
+                receiver: str = fields[self._receiver_column]
+                index_lines.append(
+                    f"{offset - length}\t{length}\t{sender}\t{receiver}\n")
+                rows_indexed += 1
+        if len(index_lines) > 0:
+            directory: str = dirname(self.file_name)
+            if directory != "":
+                makedirs(directory, exist_ok=True)
+            with open(self.file_name, "a") as file:
+                file.writelines(index_lines)
+        return rows_indexed
+
+    def _read_index(self) -> Iterator[tuple[int, int, str, str]]:
+        """
+        Reads the index file line by line.
+
+        Yields:
+            tuple: The offset and length of a row, and the user ID hashes of
+                its sender and receiver.
+        """
+        if not exists(self.file_name):
+            return
+        with open(self.file_name, "r") as file:
+            for line in file:
+                if not line.endswith("\n"):
+                    break
+                fields: List[str] = line.rstrip("\n").split("\t")
+                if len(fields) != 4:
+                    print("ERROR: Invalid line in transaction user index.")
+                    continue
+                yield (int(fields[0]), int(fields[1]), fields[2], fields[3])
+
+    def read_header(self) -> str:
+        """
+        Reads the header line of the spreadsheet.
+
+        Returns:
+            str: The header line, or an empty string if there is
+                no spreadsheet.
+        """
+        if not exists(self.spreadsheet_file_name):
+            return ""
+        with open(self.spreadsheet_file_name, "rb") as spreadsheet:
+            return spreadsheet.readline().decode()
+
+    def read_user_hashes(self) -> Set[str]:
+        """
+        Reads the user ID hashes of everyone who is the sender or the
+        receiver of a row in the spreadsheet.
+
+        Returns:
+            Set[str]: The user ID hashes.
+        """
+        self.catch_up()
+        user_hashes: Set[str] = set()
+        for _, _, sender, receiver in self._read_index():
+            user_hashes.add(sender)
+            user_hashes.add(receiver)
+        return user_hashes
+
+    def read_user_rows(self, user_hashes: List[str]) -> List[str]:
+        """
+        Reads the rows that involve any of the given users, in the order
+        they appear in the spreadsheet.
+
+        Args:
+            user_hashes: The user ID hashes.
+
+        Returns:
+            List[str]: The rows, including their line breaks.
+        """
+        self.catch_up()
+        user_rows: List[str] = []
+        if len(user_hashes) == 0:
+            return user_rows
+        requested_user_hashes: Set[str] = set(user_hashes)
+        row_positions: List[tuple[int, int]] = [
+            (offset, length)
+            for offset, length, sender, receiver in self._read_index()
+            if (sender in requested_user_hashes or
+                receiver in requested_user_hashes)]
+        if len(row_positions) == 0:
+            return user_rows
+        with open(self.spreadsheet_file_name, "rb") as spreadsheet:
+            for offset, length in row_positions:
+                spreadsheet.seek(offset)
+                user_rows.append(spreadsheet.read(length).decode())
+        return user_rows
+# endregion
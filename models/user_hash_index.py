@@ -0,0 +1,199 @@
+# region Imports
+# Standard library
+import json
+from functools import lru_cache
+from hashlib import sha256
+from os import makedirs, truncate
+from os.path import dirname, exists
+from typing import Dict
+
+# Local
+from models.save_data_backends import SaveDataBackend, JsonSaveDataBackend
+# endregion
+
+# region Hash user ID
+
+
+@lru_cache(maxsize=4096)
+def hash_user_id(user_id: int) -> str:
+    """
+    Pseudonymizes a user ID the way it is stored in the blockchain. Recently
+    used IDs are cached.
+
+    Args:
+        user_id: The user ID.
+
+    Returns:
+        str: The SHA-256 hex digest of the user ID.
+    """
+    return sha256(str(user_id).encode()).hexdigest()
+# endregion
+
+# region User hash index
+
+
+class UserHashIndex:
+    """
+    Maps user ID hashes back to user IDs and names, so that the blockchain's
+    transactions can be decrypted without going through every user's
+    save data.
+
+    The index is stored as a JSON lines file that is only ever appended to.
+    When a user is added again with a different name, the new line replaces
+    the old one when the file is loaded. If the file does not exist yet, it
+    is seeded from the save data backend.
+
+    Attributes:
+        file_name: The path to the index file.
+        save_data_backend: The backend the user save data is stored in.
+        user_ids: The user ID of each user, keyed by the user ID hash.
+        user_names: The user name of each user, keyed by the user ID hash.
+
+    Methods:
+        __init__(file_name = "data/user_hashes.jsonl",
+            save_data_backend = None):
+            Initializes the index and loads it from disk.
+        load():
+            Loads the index file.
+        add(user_id, user_name):
+            Adds a user to the index.
+        sync():
+            Adds the users with save data that are missing from the index.
+        get_user_id(user_hash):
+            Gets the user ID for a hash.
+        get_user_name(user_hash):
+            Gets the user name for a hash.
+    """
+
+    def __init__(self,
+                 file_name: str = "data/user_hashes.jsonl",
+                 save_data_backend: SaveDataBackend | None = None) -> None:
+        """
+        Initializes the user hash index.
+
+        Args:
+            file_name: The path to the index file. Defaults to
+                "data/user_hashes.jsonl".
+            save_data_backend: The backend the user save data is stored in.
+                Defaults to a JsonSaveDataBackend.
+        """
+        print("Initializing user hash index...")
+        self.file_name: str = file_name
+        if save_data_backend is None:
+            save_data_backend = JsonSaveDataBackend()
+        self.save_data_backend: SaveDataBackend = save_data_backend
+        self.user_ids: Dict[str, int] = {}
+        self.user_names: Dict[str, str] = {}
+        if exists(self.file_name):
+            self.load()
+        else:
+            self.sync()
+        print(f"User hash index initialized ({len(self.user_ids)} users).")
+
+    def load(self) -> None:
+        """
+        Loads the index file. Later lines take precedence over earlier ones.
+        A partially written last line (after a crash) is cut off, so that
+        the next user is not appended to it.
+        """
+        self.user_ids = {}
+        self.user_names = {}
+        complete_size: int = 0
+        partial_line: bool = False
+        with open(self.file_name, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    partial_line = True
+                    break
+                complete_size += len(line)
+                if line.strip() == b"":
+                    continue
+                try:
+                    entry: Dict[str, str | int] = json.loads(line)
+                    user_id: int = int(entry["user_id"])
+                    user_name: str = str(entry["user_name"])
+                except (json.JSONDecodeError, UnicodeDecodeError,
+                        KeyError, ValueError) as e:
+                    print(f"ERROR: Invalid line in user hash index: {e}")
+                    continue
+                user_hash: str = hash_user_id(user_id)
+                self.user_ids[user_hash] = user_id
+                self.user_names[user_hash] = user_name
+        if partial_line:
+            print("WARNING: The user hash index ends with a partial line, "
+                  "which will be removed.")
+            truncate(self.file_name, complete_size)
+
+    def add(self, user_id: int, user_name: str) -> str:
+        """
+        Adds a user to the index. Nothing is written if the user is already
+        indexed with the same name.
+
+        Args:
+            user_id: The user ID.
+            user_name: The user name.
+
+        Returns:
+            str: The user ID hash.
+        """
+        user_hash: str = hash_user_id(user_id)
+        if self.user_names.get(user_hash) == user_name:
+            return user_hash
+        self.user_ids[user_hash] = user_id
+        self.user_names[user_hash] = user_name
+        directory: str = dirname(self.file_name)
+        if directory != "":
+            makedirs(directory, exist_ok=True)
+        with open(self.file_name, "a") as file:
+            file.write(json.dumps({"user_id": user_id,
+                                   "user_name": user_name}) + "\n")
+        return user_hash
+
+    def sync(self) -> int:
+        """
+        Adds the users with save data that are missing from the index. Users
+        that are already indexed are not read.
+
+        Returns:
+            int: The number of users that were added.
+        """
+        print("Indexing user hashes from save data...")
+        indexed_user_ids: set[int] = set(self.user_ids.values())
+        try:
+            user_names: Dict[int, str] = (
+                self.save_data_backend.get_user_names(
+                    exclude=indexed_user_ids))
+        except Exception as e:
+            print(f"ERROR: Error getting save data: {e}")
+            return 0
+        users_added: int = 0
+        for user_id, user_name in sorted(user_names.items()):
+            self.add(user_id, user_name)
+            users_added += 1
+        print(f"Indexed {users_added} user hashes from save data.")
+        return users_added
+
+    def get_user_id(self, user_hash: str) -> int | None:
+        """
+        Gets the user ID for a hash.
+
+        Args:
+            user_hash: The user ID hash.
+
+        Returns:
+            int | None: The user ID, or None if the hash is not indexed.
+        """
+        return self.user_ids.get(user_hash)
+
+    def get_user_name(self, user_hash: str) -> str | None:
+        """
+        Gets the user name for a hash.
+
+        Args:
+            user_hash: The user ID hash.
+
+        Returns:
+            str | None: The user name, or None if the hash is not indexed.
+        """
+        return self.user_names.get(user_hash)
+# endregion
@@ -1,15 +1,36 @@
 # region Imports
 # Standard library
-import json
-from os import makedirs, stat
-from os.path import exists
-from typing import (List, cast)
+from contextlib import contextmanager
+from typing import (Any, Dict, Iterator, List, cast)
 
 # Local
+import core.global_state as g
 from type_aliases import (SaveData, T)
+from models.mined_messages import MinedMessages, MinedMessagesStore
+from models.save_data_backends import create_save_data_backend
+from models.save_data_cache import SaveDataCache
+from models.user_hash_index import UserHashIndex
 # endregion
 
 # region UserSaveData
+# Used when g.save_data_cache has not been set up (e.g. in scripts)
+_fallback_save_data_cache: SaveDataCache | None = None
+
+
+def _get_fallback_save_data_cache() -> SaveDataCache:
+    """
+    Gets a save data cache that writes changes immediately, using the
+    backend configured in g.save_data_backend. It is created on first use.
+
+    Returns:
+        SaveDataCache: The save data cache.
+    """
+    global _fallback_save_data_cache
+    if _fallback_save_data_cache is None:
+        _fallback_save_data_cache = SaveDataCache(
+            backend=create_save_data_backend(g.save_data_backend),
+            write_back=False)
+    return _fallback_save_data_cache
 
 
 
@@ -41,19 +62,42 @@ class UserSaveData:
     what their balance is at that moment. `when_last_bonus_received` means: the
     point in time when the user last received a bonus.
 
+    ### Caching
+
+    Save data is read from and written to the process-wide save data cache
+    (`g.save_data_cache`), which writes changes to disk periodically. If the
+    cache has not been initialized (outside of the bot), a private cache
+    that writes every change immediately is used.
+
+    ### Mined messages
+
+    The IDs of the messages the user has mined are not kept in the save data
+    but in the mined messages store (`g.mined_messages_store`), see the
+    `mined_messages` property. The legacy `messages_mined` list is moved
+    there the first time it is accessed.
+
+    ### Transactions
+
+    Changes that belong together can be made inside `transaction()`. They
+    are collected and handed to the save data cache in one go when the block
+    ends, so the save data is never written with only some of them. If the
+    block raises an exception, the changes are discarded.
+
 
     Methods:
         __init__(user_id, user_name):
             Initializes the UserSaveData instance with the given user ID
             and name.
         create():
-            Creates the necessary directories and files for the user.
+            Creates the save data for the user.
         save(key, value):
-            Saves a key-value pair to a JSON file. If the file does not exist,
-            it creates a new one.
+            Saves a key-value pair to the user's save data.
+        transaction():
+            Collects the changes made inside a `with` block and saves them
+            together.
         load(key):
-            Loads the value associated with the given key from a JSON file.
-            Returns the value associated with the key if it exists,
+            Loads the value associated with the given key from the user's
+            save data. Returns the value associated with the key if it exists,
             otherwise None.
     """
 
@@ -69,18 +113,17 @@ class UserSaveData:
         self._blocked_from_receiving_coins: bool
         self._blocked_from_receiving_coins_reason: str | None
         self._user_name: str
-        file_exists: bool = exists(self.file_name)
-        file_empty: bool | None = None
-        file_size: int
-        if file_exists:
-            file_size = stat(self.file_name).st_size
-            file_empty = file_size == 0
-        if file_empty:
-            print(f"ERROR: Save data file for {self.user_id} is empty.")
-        if (not file_exists or file_empty) and (user_name is None):
+        self._cache: SaveDataCache
+        self._pending_changes: Dict[str, Any] | None = None
+        if isinstance(g.save_data_cache, SaveDataCache):
+            self._cache = g.save_data_cache
+        else:
+            self._cache = _get_fallback_save_data_cache()
+        save_data_exists: bool = self._cache.get(user_id) is not None
+        if (not save_data_exists) and (user_name is None):
             raise ValueError("user_name must be provided if save data "
                              "does not exist for the user.")
-        elif (not file_exists or file_empty) and (user_name is not None):
+        elif (not save_data_exists) and (user_name is not None):
             self._user_name: str = user_name
             self._has_visited_casino = False
             self._starting_bonus_available = True
@@ -90,7 +133,7 @@ class UserSaveData:
             self._blocked_from_receiving_coins = False
             self._blocked_from_receiving_coins_reason = None
             self.create()
-        elif (file_exists) and (not file_empty) and (user_name is None):
+        elif (save_data_exists) and (user_name is None):
             self.user_name: str = self._load_value(
                 key="user_name",
                 expected_type=str, default="")
@@ -240,6 +283,25 @@ class UserSaveData:
         self._blocked_from_receiving_coins = value
         self.save("blocked_from_receiving_coins", value)
 
+    @property
+    def mined_messages(self) -> MinedMessages:
+        """
+        The IDs of the messages the user has mined.
+        """
+        assert isinstance(g.mined_messages_store, MinedMessagesStore), (
+            "g.mined_messages_store has not been initialized.")
+        legacy_message_ids: List[int] = []
+        if self.load("messages_mined") is not None:
+            # Only users from before the mined messages store have the key
+            legacy_message_ids = self._load_value(
+                key="messages_mined", expected_type=list, default=[])
+        mined_messages: MinedMessages = g.mined_messages_store.get(
+            self.user_id, legacy_message_ids)
+        if len(legacy_message_ids) > 0:
+            # The IDs are stored by the mined messages store from now on
+            self.save("messages_mined", [])
+        return mined_messages
+
     @property
     def blocked_from_receiving_coins_reason(self) -> str | None:
         """
@@ -257,12 +319,12 @@ class UserSaveData:
 
     def create(self) -> None:
         """
-        Creates the necessary directories and files for the user.
+        Creates the save data for the user.
         This method performs the following actions:
-        1. Creates any missing directories based on the file path.
-        2. If a directory name matches the user ID, it creates a JSON file 
-           containing the user's name, user ID, and starting bonus status.
-        3. Creates an empty save data file specified by `self.file_name`.
+        1. Adds the user's name, user ID, and starting bonus status (and the
+           defaults of the other properties) to the save data cache, which
+           writes the save data file specified by `self.file_name`.
+        2. Adds the user to the user hash index, if it has been initialized.
         Attributes:
             self.file_name: The path to the save data file.
             self.user_name: The name of the user.
@@ -270,65 +332,81 @@ class UserSaveData:
             self._starting_bonus_available: Indicates if the user can receive
             free coins.
         """
-        # Create missing directories and create save data file
-        directories: str = self.file_name[:self.file_name.rfind("/")]
-        for i, directory in enumerate(directories.split("/")):
-            path: str = "/".join(directories.split("/")[:i+1])
-            if not exists(directory):
-                makedirs(path, exist_ok=True)
-            if directory.isdigit() and int(directory) == self.user_id:
-                with open(self.file_name, "w") as file:
-                    file_contents: SaveData = {
-                        "user_name": self._user_name,
-                        "user_id": self.user_id,
-                        "has_visited_casino": False,
-                        "starting_bonus_available": (
-                            self._starting_bonus_available),
-                        "when_last_bonus_received": None,
-                        "messages_mined": [],
-                        "reaction_message_received": False,
-                        "mining_messages_enabled": True,
-                        "blocked_from_receiving_coins": False,
-                        "blocked_from_receiving_coins_reason": None
-                    }
-                    file_contents_json: str = json.dumps(file_contents)
-                    file.write(file_contents_json)
+        file_contents: SaveData = {
+            "user_name": self._user_name,
+            "user_id": self.user_id,
+            "has_visited_casino": False,
+            "starting_bonus_available": (
+                self._starting_bonus_available),
+            "when_last_bonus_received": None,
+            "messages_mined": [],
+            "reaction_message_received": False,
+            "mining_messages_enabled": True,
+            "blocked_from_receiving_coins": False,
+            "blocked_from_receiving_coins_reason": None
+        }
+        self._cache.create(self.user_id, file_contents)
+        if isinstance(g.user_hash_index, UserHashIndex):
+            g.user_hash_index.add(self.user_id, self._user_name)
 
     def save(self, key: str, value: str | List[int] | float | None) -> None:
         """
-        Saves a key-value pair to a JSON file. If the file does not exist,
-        it creates a new one.
+        Saves a key-value pair to the user's save data. The change is
+        written to disk by the save data cache.
 
         Args:
             key: The key to be saved.
             value: The value to be saved.
         """
-
-        # Read the existing data
-        save_data: SaveData
-        with open(self.file_name, "r") as file:
-            save_data = json.load(file)
-        # Update the data with the new key-value pair
-        save_data[key] = value
-
-        # Write the updated data back to the file
-        with open(self.file_name, "w") as file:
-            json.dump(save_data, file)
+        if self._pending_changes is not None:
+            self._pending_changes[key] = value
+            return
+        self._cache.set(self.user_id, key, value)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Collects the changes made inside a `with` block and saves them
+        together when the block ends. If the block raises an exception, the
+        changes are discarded and the properties are reloaded. A transaction
+        started inside another one becomes part of the outer one.
+
+        Example:
+            with save_data.transaction():
+                save_data.has_visited_casino = True
+                save_data.starting_bonus_available = False
+        """
+        if self._pending_changes is not None:
+            yield
+            return
+        self._pending_changes = {}
+        try:
+            yield
+        except BaseException:
+            self._pending_changes = None
+            self._load_all_properties()
+            raise
+        changes: Dict[str, Any] = self._pending_changes
+        self._pending_changes = None
+        if len(changes) > 0:
+            self._cache.set_many(self.user_id, changes)
 
     def load(self, key: str) -> str | List[int] | bool | float | None:
         """
-        Loads the value associated with the given key from a JSON file.
+        Loads the value associated with the given key from the user's
+        save data.
         Args:
             key: The key whose value needs to be retrieved.
         Returns:
             str | None: The value associated with the key if it exists,
                             otherwise None.
         """
-        if not exists(self.file_name):
+        if (self._pending_changes is not None and
+                key in self._pending_changes):
+            return self._pending_changes[key]
+        all_data: SaveData | None = self._cache.get(self.user_id)
+        if all_data is None:
             return None
-        all_data: SaveData
-        with open(self.file_name, "r") as file:
-            all_data = json.load(file)
         requested_value: str | List[int] | None = all_data.get(key)
         if ((isinstance(requested_value, str)) and
                 (requested_value.lower() == "true")):
@@ -0,0 +1,133 @@
+# region Imports
+# Standard library
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Local
+from type_aliases import LedgerSnapshotData
+from models.chain_reader import block_from_dict
+from models.chain_validator import ChainValidator
+# endregion
+
+# region Helpers
+
+
+def make_block(index: int,
+               previous_block_hash: str,
+               data: List[Any] | None = None) -> Dict[str, Any]:
+    block: Dict[str, Any] = {
+        "index": index,
+        "timestamp": 1700000000.0 + index,
+        "data": data if data is not None else [f"block {index}"],
+        "previous_block_hash": previous_block_hash,
+        "nonce": 0
+    }
+    block["block_hash"] = block_from_dict(block).calculate_hash()
+    return block
+
+
+def append_blocks(file_name: Path,
+                  count: int,
+                  chain: List[Dict[str, Any]]) -> None:
+    with open(file_name, "a") as file:
+        for _ in range(count):
+            previous_block_hash: str = (
+                chain[-1]["block_hash"] if chain else "0")
+            block: Dict[str, Any] = make_block(len(chain),
+                                               previous_block_hash)
+            chain.append(block)
+            file.write(json.dumps(block) + "\n")
+# endregion
+
+# region Tests
+
+
+def test_validates_only_blocks_after_watermark(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "blockchain.json"
+    chain: List[Dict[str, Any]] = []
+    append_blocks(file_name, 3, chain)
+    validator = ChainValidator(file_name=str(file_name),
+                               full_validation_interval=None)
+    assert validator.validate()
+    assert validator.validated_height == 3
+    assert validator.validated_offset == file_name.stat().st_size
+    assert validator.last_block_hash == chain[-1]["block_hash"]
+
+    # Tamper with a validated block without changing the file size. Only
+    # the blocks after the watermark are read, so this goes unnoticed
+    # until the next full validation.
+    content: str = file_name.read_text()
+    file_name.write_text(content.replace('"block 1"', '"block X"'))
+    append_blocks(file_name, 2, chain)
+    assert validator.validate()
+    assert validator.validated_height == 5
+    assert validator.last_block_index == 4
+    assert not validator.validate(full=True)
+
+
+def test_invalid_block_does_not_move_watermark(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "blockchain.json"
+    chain: List[Dict[str, Any]] = []
+    append_blocks(file_name, 2, chain)
+    validator = ChainValidator(file_name=str(file_name),
+                               full_validation_interval=None)
+    assert validator.validate()
+    validated_offset: int = validator.validated_offset
+
+    unlinked_block: Dict[str, Any] = make_block(2, "not the last hash")
+    with open(file_name, "a") as file:
+        file.write(json.dumps(unlinked_block) + "\n")
+    assert not validator.validate()
+    assert validator.validated_height == 2
+    assert validator.validated_offset == validated_offset
+
+
+def test_partial_block_is_validated_once_complete(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "blockchain.json"
+    chain: List[Dict[str, Any]] = []
+    append_blocks(file_name, 1, chain)
+    validator = ChainValidator(file_name=str(file_name),
+                               full_validation_interval=None)
+    assert validator.validate()
+
+    block_line: str = json.dumps(make_block(1, chain[0]["block_hash"]))
+    with open(file_name, "a") as file:
+        file.write(block_line[:20])
+    assert validator.validate()
+    assert validator.validated_height == 1
+    with open(file_name, "a") as file:
+        file.write(block_line[20:] + "\n")
+    assert validator.validate()
+    assert validator.validated_height == 2
+
+
+def test_restore_from_snapshot(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "blockchain.json"
+    chain: List[Dict[str, Any]] = []
+    append_blocks(file_name, 3, chain)
+    validator = ChainValidator(file_name=str(file_name),
+                               full_validation_interval=None)
+    assert validator.validate()
+
+    snapshot: LedgerSnapshotData = {
+        "created": 0.0,
+        "height": 3,
+        "offset": validator.validated_offset,
+        "balances": {},
+        "last_block": chain[-1],
+        "last_block_offset": 0,
+        "validated_height": validator.validated_height,
+        "validated_offset": validator.validated_offset,
+        "last_validated_block_hash": validator.last_block_hash,
+        "last_validated_block_index": validator.last_block_index,
+        "last_full_validation": validator.last_full_validation
+    }
+    restored = ChainValidator(file_name=str(file_name),
+                              full_validation_interval=None,
+                              snapshot=snapshot)
+    append_blocks(file_name, 1, chain)
+    assert not restored.full_validation_due()
+    assert restored.validate()
+    assert restored.validated_height == 4
+# endregion
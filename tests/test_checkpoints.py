@@ -0,0 +1,98 @@
+# region Imports
+# Standard library
+import asyncio
+import json
+from pathlib import Path
+from typing import List
+
+# Local
+from models.checkpoints import CheckpointStore
+# endregion
+
+# region Helpers
+
+
+def make_legacy_channel(legacy_directory: Path,
+                        guild_id: int,
+                        channel_id: int,
+                        last_message_ids: List[int]) -> None:
+    guild_directory: Path = legacy_directory / str(guild_id)
+    channel_directory: Path = (
+        guild_directory / "channels" / str(channel_id))
+    channel_directory.mkdir(parents=True)
+    (guild_directory / "guild_name.json").write_text(
+        json.dumps({"guild_name": "Guild"}))
+    (channel_directory / "channel_name.json").write_text(
+        json.dumps({"channel_name": f"channel-{channel_id}"}))
+    (channel_directory / "channel_checkpoints.json").write_text(
+        "".join(json.dumps({"last_message_id": message_id}) + "\n"
+                for message_id in last_message_ids))
+# endregion
+
+# region Tests
+
+
+def test_legacy_files_are_imported_once(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "checkpoints.json"
+    legacy_directory: Path = tmp_path / "guilds"
+    make_legacy_channel(legacy_directory, 1, 10, [100, 101])
+    make_legacy_channel(legacy_directory, 1, 11, [200])
+
+    store = CheckpointStore(file_name=str(file_name),
+                            legacy_directory=str(legacy_directory))
+    assert store.dirty
+    assert store.get(10) == {"guild_id": 1,
+                             "guild_name": "Guild",
+                             "channel_name": "channel-10",
+                             "last_message_ids": [100, 101]}
+    assert store.get(11) is not None
+    assert store.get(12) is None
+    assert store.flush()
+    assert not store.flush()
+
+    # Once the file exists, the legacy files are no longer read
+    make_legacy_channel(legacy_directory, 1, 12, [300])
+    reloaded = CheckpointStore(file_name=str(file_name),
+                               legacy_directory=str(legacy_directory))
+    assert not reloaded.dirty
+    assert reloaded.channels == store.channels
+    assert reloaded.get(12) is None
+
+
+def test_save_keeps_latest_checkpoints(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "checkpoints.json"
+    store = CheckpointStore(file_name=str(file_name),
+                            legacy_directory=str(tmp_path / "guilds"))
+    assert not store.dirty
+    for message_id in range(5):
+        store.save(guild_name="Guild", guild_id=1, channel_name="general",
+                   channel_id=10, message_id=message_id, max_checkpoints=3)
+    store.save(guild_name="Guild", guild_id=1, channel_name="renamed",
+               channel_id=10, message_id=5, max_checkpoints=3)
+    assert store.dirty
+
+    async def close() -> None:
+        store.start_flushing(interval=60)
+        await store.close()
+
+    asyncio.run(close())
+    reloaded = CheckpointStore(file_name=str(file_name),
+                               legacy_directory=str(tmp_path / "guilds"))
+    assert reloaded.get(10) == {"guild_id": 1,
+                                "guild_name": "Guild",
+                                "channel_name": "renamed",
+                                "last_message_ids": [3, 4, 5]}
+
+
+def test_broken_file_is_moved_aside(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "checkpoints.json"
+    file_name.write_text('{"channels": {"10": ')
+    store = CheckpointStore(file_name=str(file_name),
+                            legacy_directory=str(tmp_path / "guilds"))
+    assert store.channels == {}
+    assert not file_name.exists()
+    broken_files: List[Path] = list(
+        tmp_path.glob("checkpoints.json.broken-*"))
+    assert len(broken_files) == 1
+    assert broken_files[0].read_text() == '{"channels": {"10": '
+# endregion
@@ -0,0 +1,55 @@
+# region Imports
+# Standard library
+from pathlib import Path
+
+# Local
+from models.jackpot_journal import JackpotJournal
+# endregion
+
+# region Tests
+
+
+def test_replay_returns_last_jackpot(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "jackpot_journal.txt"
+    journal = JackpotJournal(file_name=str(file_name))
+    assert journal.replay() is None
+    for jackpot in (101, 102, 103):
+        journal.append(jackpot)
+    journal.close()
+    assert journal.entries == 3
+
+    replayed = JackpotJournal(file_name=str(file_name))
+    assert replayed.replay() == 103
+    assert replayed.entries == 3
+
+
+def test_partial_last_line_is_cut_off(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "jackpot_journal.txt"
+    file_name.write_bytes(b"101\n102\n10")
+    journal = JackpotJournal(file_name=str(file_name))
+    assert journal.replay() == 102
+    assert journal.entries == 2
+    assert file_name.read_bytes() == b"101\n102\n"
+
+    # The next entry starts on a line of its own
+    journal.append(104)
+    journal.close()
+    assert JackpotJournal(file_name=str(file_name)).replay() == 104
+
+
+def test_invalid_line_is_skipped(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "jackpot_journal.txt"
+    file_name.write_bytes(b"101\nnot a jackpot\n")
+    journal = JackpotJournal(file_name=str(file_name))
+    assert journal.replay() == 101
+    assert journal.entries == 1
+
+
+def test_clear_empties_journal(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "jackpot_journal.txt"
+    journal = JackpotJournal(file_name=str(file_name))
+    journal.append(101)
+    journal.clear()
+    assert journal.entries == 0
+    assert journal.replay() is None
+# endregion
@@ -0,0 +1,67 @@
+# region Imports
+# Standard library
+from pathlib import Path
+from time import time
+
+# Local
+from models.mined_messages import (
+    DISCORD_EPOCH_MS, HEADER_SIZE, ID_SIZE, MinedMessages,
+    MinedMessagesStore)
+# endregion
+
+# region Helpers
+
+
+def make_snowflake(timestamp: float) -> int:
+    return (int(timestamp * 1000) - DISCORD_EPOCH_MS) << 22
+# endregion
+
+# region Tests
+
+
+def test_partial_message_id_is_cut_off(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "1.bin"
+    mined_messages = MinedMessages(user_id=1, file_name=str(file_name))
+    assert mined_messages.add(10)
+    assert mined_messages.add(20)
+    assert not mined_messages.add(10)
+    with open(file_name, "ab") as file:
+        file.write(b"\x01\x02\x03")
+
+    reloaded = MinedMessages(user_id=1, file_name=str(file_name))
+    assert file_name.stat().st_size == HEADER_SIZE + 2 * ID_SIZE
+    assert reloaded.message_ids == {10, 20}
+
+    # New IDs are appended after the last complete one
+    assert reloaded.add(30)
+    assert MinedMessages(user_id=1, file_name=str(file_name)).message_ids == {
+        10, 20, 30}
+
+
+def test_file_without_header_is_ignored(tmp_path: Path) -> None:
+    file_name: Path = tmp_path / "1.bin"
+    file_name.write_bytes(b"\x00\x00")
+    mined_messages = MinedMessages(user_id=1, file_name=str(file_name))
+    assert len(mined_messages) == 0
+    assert mined_messages.count == 0
+
+
+def test_store_migrates_and_prunes(tmp_path: Path) -> None:
+    old_message_id: int = make_snowflake(time() - 1000)
+    new_message_id: int = make_snowflake(time())
+    store = MinedMessagesStore(directory=str(tmp_path), max_age=100)
+    mined_messages: MinedMessages = store.get(
+        1, legacy_message_ids=[old_message_id, new_message_id,
+                               new_message_id])
+    assert store.get(1) is mined_messages
+    assert new_message_id in mined_messages
+    assert old_message_id not in mined_messages
+    assert mined_messages.count == 2
+
+    # The pruned count survives a reload, and the legacy list is only
+    # migrated once
+    reloaded: MinedMessages = MinedMessagesStore(
+        directory=str(tmp_path)).get(1, legacy_message_ids=[5])
+    assert reloaded.message_ids == {new_message_id}
+    assert reloaded.pruned_count == 1
+# endregion
@@ -0,0 +1,89 @@
+# region Imports
+# Standard library
+import json
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict
+
+# Local
+from models.slot_machine import SlotMachine
+# endregion
+
+# region Helpers
+
+
+def make_event(fixed_amount: int,
+               wager_multiplier: float) -> Dict[str, Any]:
+    return {"emoji_name": "", "emoji_id": 0,
+            "fixed_amount": fixed_amount,
+            "wager_multiplier": wager_multiplier}
+
+
+def make_slot_machine(tmp_path: Path) -> SlotMachine:
+    """
+    Makes a slot machine whose reels each hold one lose_wager, two
+    small_win and one jackpot symbol.
+    """
+    reel: Dict[str, int] = {"lose_wager": 1, "small_win": 2, "jackpot": 1}
+    configuration: Dict[str, Any] = {
+        "combo_events": {
+            "lose_wager": make_event(0, -1.0),
+            "small_win": make_event(3, 1.0),
+            "jackpot": make_event(100, 1.0)
+        },
+        "reels": {"reel1": reel, "reel2": reel, "reel3": reel},
+        "reel_spin_emojis": {
+            f"spin{number}": {"emoji_name": "slot_spin_1", "emoji_id": 0}
+            for number in range(1, 4)
+        },
+        "fees": {
+            "low_wager_main": 1,
+            "medium_wager_main": 0.1,
+            "high_wager_main": 0.05,
+            "low_wager_jackpot": 1,
+            "medium_wager_jackpot": 0.1,
+            "high_wager_jackpot": 0.01
+        },
+        "jackpot_pool": 100,
+        "new_bonus_wait_seconds": 86400
+    }
+    file_name: Path = tmp_path / "slot_machine.json"
+    file_name.write_text(json.dumps(configuration))
+    return SlotMachine(
+        file_name=str(file_name),
+        jackpot_journal_file_name=str(tmp_path / "jackpot_journal.txt"))
+# endregion
+
+# region Tests
+
+
+def test_exact_probabilities(tmp_path: Path) -> None:
+    slot_machine: SlotMachine = make_slot_machine(tmp_path)
+    probabilities: Dict[str, Fraction] = (
+        slot_machine.calculate_exact_probabilities())
+    assert probabilities["lose_wager"] == Fraction(1, 64)
+    assert probabilities["small_win"] == Fraction(8, 64)
+    assert probabilities["jackpot"] == Fraction(1, 64)
+    assert probabilities["standard_lose"] == Fraction(54, 64)
+    assert probabilities["win"] == Fraction(9, 64)
+
+
+def test_exact_rtp(tmp_path: Path) -> None:
+    slot_machine: SlotMachine = make_slot_machine(tmp_path)
+    # Wager 1 does not cover the jackpot fee: every spin costs the 1 coin
+    # main fee, and only a small win (3 coins, 1/8) pays anything back.
+    # Wager 10 pays 1 coin of each fee. A standard loss (54/64) returns 8,
+    # a small win (8/64) returns 11, and a jackpot (1/64) returns
+    # 8 + 163, where 163 = 100 (seed) + 64 (1/p) - 1 is the average pool.
+    assert slot_machine.calculate_exact_rtp([0, 1, 10]) == {
+        1: Fraction(3, 8),
+        10: Fraction(54 * 8 + 8 * 11 + 1 * 171, 64) / 10
+    }
+
+
+def test_lost_wager_takes_the_entire_stake(tmp_path: Path) -> None:
+    slot_machine: SlotMachine = make_slot_machine(tmp_path)
+    assert slot_machine.calculate_returns(10, "lose_wager", 0) == (-10, 0)
+    assert slot_machine.calculate_returns(10, "standard_lose", 0) == (-2, 8)
+    assert slot_machine.calculate_returns(10, "small_win", 3) == (1, 11)
+# endregion
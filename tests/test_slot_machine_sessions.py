@@ -0,0 +1,88 @@
+# region Imports
+# Standard library
+import asyncio
+from typing import List
+
+# Local
+from models.slot_machine_sessions import SlotMachineSessions
+# endregion
+
+# region Tests
+
+
+def test_spins_wait_for_previous_spin() -> None:
+    async def main() -> None:
+        sessions = SlotMachineSessions(wait_timeout=1)
+        order: List[str] = []
+
+        async def spin(name: str) -> None:
+            assert await sessions.acquire(1)
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+            assert sessions.release(1)
+
+        await asyncio.gather(spin("first"), spin("second"))
+        assert order == ["first start", "first end",
+                         "second start", "second end"]
+        assert not sessions.is_active(1)
+
+    asyncio.run(main())
+
+
+def test_acquire_times_out() -> None:
+    async def main() -> None:
+        sessions = SlotMachineSessions(wait_timeout=0.01)
+        assert await sessions.acquire(1)
+        waiting: asyncio.Task[bool] = asyncio.create_task(
+            sessions.acquire(1))
+        assert not await waiting
+        # Other users are not affected
+        assert await asyncio.create_task(sessions.acquire(2))
+
+    asyncio.run(main())
+
+
+def test_session_of_ended_task_is_stale() -> None:
+    async def main() -> None:
+        sessions = SlotMachineSessions(wait_timeout=0.1)
+
+        async def abandoned_spin() -> None:
+            assert await sessions.acquire(1)
+
+        await asyncio.create_task(abandoned_spin())
+        assert sessions.is_stale(1)
+        assert await asyncio.create_task(sessions.acquire(1))
+
+    asyncio.run(main())
+
+
+def test_old_spin_cannot_release_next_session() -> None:
+    async def main() -> None:
+        sessions = SlotMachineSessions(wait_timeout=1, max_session_age=0.01)
+        old_spin_started = asyncio.Event()
+        new_spin_started = asyncio.Event()
+        released: List[bool] = []
+
+        async def old_spin() -> None:
+            assert await sessions.acquire(1)
+            old_spin_started.set()
+            await new_spin_started.wait()
+            released.append(sessions.release(1))
+
+        async def new_spin() -> None:
+            await old_spin_started.wait()
+            await asyncio.sleep(0.02)
+            # The old spin's session is too old and is released as stale
+            assert await sessions.acquire(1)
+            new_spin_started.set()
+            await asyncio.sleep(0)
+            assert sessions.holds(1)
+            assert sessions.release(1)
+
+        await asyncio.gather(old_spin(), new_spin())
+        assert released == [False]
+        assert not sessions.is_active(1)
+
+    asyncio.run(main())
+# endregion
@@ -0,0 +1,111 @@
+# region Imports
+# Standard library
+import asyncio
+from typing import Any, List
+
+# Third party
+import pytest
+
+# Local
+from models.transaction_batcher import TransactionBatcher
+# endregion
+
+# region Helpers
+
+
+class FakeLedger:
+    """
+    Records the batches committed by a TransactionBatcher. Each committed
+    batch is returned as the "block".
+    """
+
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: List[List[Any]] = []
+        self.fail: bool = fail
+
+    async def commit(self, transactions: List[Any]) -> Any:
+        await asyncio.sleep(0)
+        if self.fail:
+            raise OSError("The ledger could not be written.")
+        self.batches.append(list(transactions))
+        return self.batches[-1]
+
+
+def make_transaction(amount: int) -> Any:
+    return {"sender": "a", "receiver": "b", "amount": amount,
+            "method": "test"}
+# endregion
+
+# region Tests
+
+
+def test_transactions_in_window_share_a_block() -> None:
+    async def main() -> None:
+        ledger = FakeLedger()
+        batcher = TransactionBatcher(commit=ledger.commit,
+                                     window_seconds=0.05)
+        blocks: List[Any] = await asyncio.gather(
+            *(batcher.submit(make_transaction(amount))
+              for amount in range(3)))
+        await batcher.close()
+        assert len(ledger.batches) == 1
+        assert [transaction["amount"] for transaction
+                in ledger.batches[0]] == [0, 1, 2]
+        assert all(block is ledger.batches[0] for block in blocks)
+
+    asyncio.run(main())
+
+
+def test_batches_are_limited_to_max_batch_size() -> None:
+    async def main() -> None:
+        ledger = FakeLedger()
+        batcher = TransactionBatcher(commit=ledger.commit,
+                                     window_seconds=0.05,
+                                     max_batch_size=2)
+        await asyncio.gather(*(batcher.submit(make_transaction(amount))
+                               for amount in range(5)))
+        await batcher.close()
+        assert [len(batch) for batch in ledger.batches] == [2, 2, 1]
+
+    asyncio.run(main())
+
+
+def test_close_commits_queued_transactions() -> None:
+    async def main() -> None:
+        ledger = FakeLedger()
+        batcher = TransactionBatcher(commit=ledger.commit,
+                                     window_seconds=10)
+        submissions: List[asyncio.Task[Any]] = [
+            asyncio.create_task(batcher.submit(make_transaction(amount)))
+            for amount in range(3)]
+        await asyncio.sleep(0)
+        # The window is far from over, but closing does not wait for it
+        await asyncio.wait_for(batcher.close(), timeout=1)
+        assert all(submission.done() for submission in submissions)
+        assert sum(len(batch) for batch in ledger.batches) == 3
+
+    asyncio.run(main())
+
+
+def test_commit_error_reaches_every_submitter() -> None:
+    async def main() -> None:
+        ledger = FakeLedger(fail=True)
+        batcher = TransactionBatcher(commit=ledger.commit,
+                                     window_seconds=0.05)
+        results: List[Any] = await asyncio.gather(
+            *(batcher.submit(make_transaction(amount))
+              for amount in range(2)),
+            return_exceptions=True)
+        await batcher.close()
+        assert all(isinstance(result, OSError) for result in results)
+
+    asyncio.run(main())
+
+
+def test_max_batch_size_must_be_positive() -> None:
+    async def commit(transactions: List[Any]) -> Any:
+        return None
+
+    with pytest.raises(ValueError):
+        TransactionBatcher(commit=commit, max_batch_size=0)
+# endregion
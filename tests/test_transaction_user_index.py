@@ -0,0 +1,87 @@
+# region Imports
+# Standard library
+from pathlib import Path
+from typing import List
+
+# Local
+from models.transaction_user_index import TransactionUserIndex
+# endregion
+
+# region Helpers
+HEADER: str = "Time\tSender\tReceiver\tAmount\n"
+
+
+def make_spreadsheet(file_name: Path, rows: List[str]) -> None:
+    with open(file_name, "w", newline="") as file:
+        file.write(HEADER)
+        file.writelines(rows)
+# endregion
+
+# region Tests
+
+
+def test_reads_rows_of_requested_users(tmp_path: Path) -> None:
+    spreadsheet: Path = tmp_path / "transactions.tsv"
+    rows: List[str] = ["1\ta\tb\t5\n", "2\tb\tc\t6\n", "3\tc\ta\t7\n"]
+    make_spreadsheet(spreadsheet, rows)
+    index = TransactionUserIndex(
+        spreadsheet_file_name=str(spreadsheet),
+        file_name=str(tmp_path / "index.tsv"))
+    assert index.read_header() == HEADER
+    assert index.read_user_rows(["a"]) == [rows[0], rows[2]]
+    assert index.read_user_rows(["d"]) == []
+    assert index.read_user_hashes() == {"a", "b", "c"}
+
+    # Rows appended later are indexed on the next lookup, but a row that
+    # is still being written is not
+    with open(spreadsheet, "a", newline="") as file:
+        file.write("4\td\ta\t8\n5\td")
+    assert index.read_user_rows(["d"]) == ["4\td\ta\t8\n"]
+
+
+def test_partial_last_line_is_cut_off(tmp_path: Path) -> None:
+    spreadsheet: Path = tmp_path / "transactions.tsv"
+    index_file: Path = tmp_path / "index.tsv"
+    rows: List[str] = ["1\ta\tb\t5\n", "2\tb\tc\t6\n"]
+    make_spreadsheet(spreadsheet, rows)
+    TransactionUserIndex(spreadsheet_file_name=str(spreadsheet),
+                         file_name=str(index_file))
+    complete: str = index_file.read_text()
+    with open(index_file, "a", newline="") as file:
+        file.write("99\t")
+
+    index = TransactionUserIndex(spreadsheet_file_name=str(spreadsheet),
+                                 file_name=str(index_file))
+    assert index_file.read_text() == complete
+    assert index.indexed_offset == spreadsheet.stat().st_size
+    assert index.read_user_rows(["c"]) == [rows[1]]
+
+
+def test_invalid_last_line_rebuilds_index(tmp_path: Path) -> None:
+    spreadsheet: Path = tmp_path / "transactions.tsv"
+    index_file: Path = tmp_path / "index.tsv"
+    rows: List[str] = ["1\ta\tb\t5\n", "2\tb\tc\t6\n"]
+    make_spreadsheet(spreadsheet, rows)
+    TransactionUserIndex(spreadsheet_file_name=str(spreadsheet),
+                         file_name=str(index_file))
+    complete: str = index_file.read_text()
+    with open(index_file, "a", newline="") as file:
+        file.write("not an offset\n")
+
+    index = TransactionUserIndex(spreadsheet_file_name=str(spreadsheet),
+                                 file_name=str(index_file))
+    assert index_file.read_text() == complete
+    assert index.read_user_rows(["a"]) == [rows[0]]
+
+
+def test_shrunk_spreadsheet_rebuilds_index(tmp_path: Path) -> None:
+    spreadsheet: Path = tmp_path / "transactions.tsv"
+    rows: List[str] = ["1\ta\tb\t5\n", "2\tb\tc\t6\n"]
+    make_spreadsheet(spreadsheet, rows)
+    index = TransactionUserIndex(
+        spreadsheet_file_name=str(spreadsheet),
+        file_name=str(tmp_path / "index.tsv"))
+    make_spreadsheet(spreadsheet, ["3\tc\td\t7\n"])
+    assert index.read_user_rows(["b"]) == []
+    assert index.read_user_rows(["d"]) == ["3\tc\td\t7\n"]
+# endregion
@@ -1,6 +1,6 @@
 # region Imports
 # Standard Library
-from typing import Dict, TypedDict, List, TypeVar
+from typing import Any, Dict, TypedDict, List, TypeVar
 
 # Third party
 from discord import PartialEmoji
@@ -62,6 +62,13 @@ class SpinEmojis(TypedDict):
     spin3: SpinEmoji
 
 
+class PayoutEntry(TypedDict):
+    event_name: str
+    event_name_friendly: str
+    wager_multiplier: float
+    fixed_amount: int
+
+
 class SlotMachineConfig(TypedDict):
     combo_events: dict[str, ReelSymbol]
     reels: Reels
@@ -94,5 +101,38 @@ class TransactionRequest(TypedDict):
     purpose: str
 
 
+class LedgerSnapshotData(TypedDict):
+    created: float
+    height: int
+    offset: int
+    balances: Dict[str, int]
+    last_block: Dict[str, Any] | None
+    last_block_offset: int
+    validated_height: int
+    validated_offset: int
+    last_validated_block_hash: str | None
+    last_validated_block_index: int | None
+    last_full_validation: float | None
+
+
+class SlotSimulationResult(TypedDict):
+    wager: int
+    spins: int
+    rtp: float
+    rtp_standard_error: float
+    expected_rtp: float
+    return_variance: float
+    hit_frequency: float
+    jackpot_wins: int
+    average_jackpot_cycle: float | None
+
+
+class ChannelCheckpointData(TypedDict):
+    guild_id: int
+    guild_name: str
+    channel_name: str
+    last_message_ids: List[int]
+
+
 T = TypeVar('T')
 # endregion
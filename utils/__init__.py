@@ -5,11 +5,12 @@ from .blockchain_utils import (
     get_last_block_timestamp,
     add_block_transaction,
     transfer_coins)
-from .coin_reaction import process_reaction
 from .decrypt_transactions import DecryptedTransactionsSpreadsheet
 from .formatting import format_coin_label
 from .get_project_root import get_project_root
-from .missed_messages import process_missed_messages
+from .missed_messages import (process_missed_messages,
+                              process_channel_missed_messages,
+                              is_coin_reaction)
 from .process_reaction import process_reaction
 from .roles import (get_role,
                     get_cybersecurity_officer_role,
@@ -21,11 +22,12 @@ __all__: list[str] = [
     'get_last_block_timestamp',
     'add_block_transaction',
     'transfer_coins',
-    'process_reaction',
     'DecryptedTransactionsSpreadsheet',
     'format_coin_label',
     'get_project_root',
     'process_missed_messages',
+    'process_channel_missed_messages',
+    'is_coin_reaction',
     'process_reaction',
     'get_role',
     'get_cybersecurity_officer_role',
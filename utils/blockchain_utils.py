@@ -5,8 +5,6 @@ Functions for interacting with the blockchain from the Discord bot.
 # Standard Library
 import asyncio
 from time import time
-from hashlib import sha256
-from typing import List, Dict, cast
 
 # Third party
 from discord import (
@@ -21,22 +19,24 @@ from discord.ext.commands import Bot  # type: ignore
 import core.global_state as g
 from type_aliases import TransactionRequest
 from core.terminate_bot import terminate_bot
+from models.ledger_writer import LedgerWriter
 from models.log import Log
 from models.transfers_waiting_approval import TransfersWaitingApproval
+from models.user_hash_index import hash_user_id
 from models.user_save_data import UserSaveData
 from utils.roles import get_aml_officer_role
 from utils.formatting import format_coin_label
 from sponsorblockchain.sponsorblockchain_type_aliases import TransactionDict
-from sponsorblockchain.models.blockchain import Blockchain
 from sponsorblockchain.models.block import Block
 # endregion
 
 # region Get timestamp
 
 
-def get_last_block_timestamp() -> float | None:
+async def get_last_block_timestamp() -> float | None:
     """
-    Retrieves the timestamp of the last block in the blockchain.
+    Retrieves the timestamp of the last block in the blockchain. The block is
+    read on the ledger writer thread.
 
     Returns:
         float | None: The timestamp of the last block if available,
@@ -45,13 +45,13 @@ def get_last_block_timestamp() -> float | None:
     Raises:
         Exception: If there is an error retrieving the last block.
     """
-    if g.blockchain is None:
-        raise ValueError("blockchain is None.")
+    assert isinstance(g.ledger_writer, LedgerWriter), (
+        "g.ledger_writer is not initialized.")
     
     last_block_timestamp: float | None = None
     try:
         # Get the last block's timestamp for logging
-        last_block: None | Block = g.blockchain.get_last_block()
+        last_block: None | Block = await g.ledger_writer.get_last_block()
         if last_block is not None:
             last_block_timestamp = last_block.timestamp
             del last_block
@@ -69,17 +69,14 @@ def get_last_block_timestamp() -> float | None:
 # region Add tx block
 
 
-async def add_block_transaction(blockchain: Blockchain,
-                                sender: Member | User | int,
+async def add_block_transaction(sender: Member | User | int,
                                 receiver: Member | User | int,
                                 amount: int,
-                                method: str) -> None:
+                                method: str) -> Block:
     """
     Adds a transaction to the blockchain.
 
     Args:
-        blockchain: The blockchain instance to which the transaction will
-            be added.
         sender: The sender of the transaction. Can be a Member, User,
             or an integer User ID.
         receiver: The receiver of the transaction. Can be a Member, User,
@@ -88,6 +85,16 @@ async def add_block_transaction(blockchain: Blockchain,
         method: The method of the transaction; "reaction", "slot_machine",
             "transfer".
 
+    The transaction is queued on the ledger writer, which owns the blockchain
+    and writes the block on its own thread. If group commit is enabled, the
+    transaction is stored in the same block as the other transactions that
+    arrive within the group commit window. Either way, this returns when the
+    block has been written.
+
+    Returns:
+        Block: The block that holds the transaction. Use its timestamp
+            rather than fetching the last block again.
+
     Raises:
         Exception: If there is an error adding the transaction to
             the blockchain.
@@ -102,30 +109,28 @@ async def add_block_transaction(blockchain: Blockchain,
         receiver_id: int = receiver.id
     sender_id_unhashed: int = sender_id
     receiver_id_unhashed: int = receiver_id
-    sender_id_hash: str = (
-        sha256(str(sender_id_unhashed).encode()).hexdigest())
+    sender_id_hash: str = hash_user_id(sender_id_unhashed)
     del sender_id
     del sender_id_unhashed
-    receiver_id_hash: str = (
-        sha256(str(receiver_id_unhashed).encode()).hexdigest())
+    receiver_id_hash: str = hash_user_id(receiver_id_unhashed)
     del receiver_id
     del receiver_id_unhashed
     print("Adding transaction to blockchain...")
     try:
-        data: List[Dict[str, TransactionDict]] = (
-            [{"transaction": {
-                "sender": sender_id_hash,
-                "receiver": receiver_id_hash,
-                "amount": amount,
-                "method": method
-            }}])
-        data_casted: List[str | Dict[str, TransactionDict]] = (
-            cast(List[str | Dict[str, TransactionDict]], data))
-        blockchain.add_block(data=data_casted, difficulty=0)
+        transaction: TransactionDict = {
+            "sender": sender_id_hash,
+            "receiver": receiver_id_hash,
+            "amount": amount,
+            "method": method
+        }
+        assert isinstance(g.ledger_writer, LedgerWriter), (
+            "g.ledger_writer is not initialized.")
+        block: Block = await g.ledger_writer.add_transaction(transaction)
     except Exception as e:
         print(f"ERROR: Error adding transaction to blockchain: {e}")
         await terminate_bot()
     print("Transaction added to blockchain.")
+    return block
 # endregion
 
 # region Transfer
@@ -147,6 +152,8 @@ async def transfer_coins(sender: Member | User,
     assert isinstance(g.log, Log), "g.log is not initialized."
     assert isinstance(g.transfers_waiting_approval, TransfersWaitingApproval), (
         "g.transfers_waiting_approval is not initialized.")
+    assert isinstance(g.ledger_writer, LedgerWriter), (
+        "g.ledger_writer is not initialized.")
     if g.blockchain is None:
         raise ValueError("blockchain is None.")
     if interaction:
@@ -205,7 +212,7 @@ async def transfer_coins(sender: Member | User,
         return
 
     try:
-        balance = g.blockchain.get_balance(user_unhashed=sender_id)
+        balance = await g.ledger_writer.get_balance(user_unhashed=sender_id)
     except Exception as e:
         administrator: str = (await g.bot.fetch_user(g.administrator_id)).mention
         await send_message(f"Error getting balance. {administrator} pls fix.")
@@ -357,21 +364,13 @@ async def transfer_coins(sender: Member | User,
                 raise Exception(error_message)
             return
 
-    await add_block_transaction(blockchain=g.blockchain,
-                                sender=sender,
-                                receiver=receiver,
-                                amount=amount,
-                                method=method
+    block: Block = await add_block_transaction(sender=sender,
+                                               receiver=receiver,
+                                               amount=amount,
+                                               method=method
     )
-    assert isinstance(g.bot, Bot), "g.bot is not initialized."
-    last_block: Block | None = g.blockchain.get_last_block()
-    if last_block is None:
-        print("ERROR: Last block is None.")
-        administrator: str = (await g.bot.fetch_user(g.administrator_id)).mention
-        await send_message(f"Error transferring {g.coins}. "
-                           f"{administrator} pls fix.")
-        await terminate_bot()
-    timestamp: float = last_block.timestamp
+    timestamp: float = block.timestamp
+    del block
     g.log.log(line=f"{sender} ({sender_id}) transferred {amount} {coin_label_a} "
             f"to {receiver} ({receiver_id}).",
             timestamp=timestamp)
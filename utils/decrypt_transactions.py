@@ -1,16 +1,19 @@
 # region Imports
 # Standard Library
-import os
-from os.path import exists, basename
+import json
+from io import StringIO
+from os import replace
+from os.path import exists, getsize
 from pathlib import Path
-from hashlib import sha256
-from typing import Dict
+from typing import Any, Dict, Iterator, List, Set
 
 # Third party
 import pandas as pd
 
 # Local
-from models.user_save_data import UserSaveData
+import core.global_state as g
+from models.transaction_user_index import TransactionUserIndex
+from models.user_hash_index import UserHashIndex, hash_user_id
 from utils.formatting import format_timestamp
 from utils.get_project_root import get_project_root
 # endregion
@@ -21,84 +24,372 @@ from utils.get_project_root import get_project_root
 class DecryptedTransactionsSpreadsheet:
     """
     Decrypts the transactions spreadsheet.
+
+    The spreadsheet is read and written in chunks of `chunk_size` rows, so
+    that memory use does not grow with the size of the spreadsheet. When the
+    transactions of a single user are requested, only that user's rows are
+    read, using the transaction user index, and they are written to a
+    separate file.
+
+    The decrypted spreadsheet of all transactions is updated incrementally:
+    the byte offset in the encrypted spreadsheet up to which rows have been
+    decrypted is recorded, along with the user names that were used and the
+    users whose names were unknown, and only the rows after it are
+    appended. New users do not change the rows decrypted so far, so the
+    spreadsheet is only rebuilt from scratch when a user's name has changed,
+    or when a user whose name was unknown has been added.
     """
 
-    def __init__(self, time_zone: str | None = None) -> None:
+    def __init__(self,
+                 time_zone: str | None = None,
+                 chunk_size: int = 50000) -> None:
         project_root: Path = get_project_root()
         decrypted_spreadsheet_full_path: Path = (
             project_root / "data" / "transactions_decrypted.tsv")
         self.decrypted_spreadsheet_path: Path = (
             decrypted_spreadsheet_full_path.relative_to(project_root))
+        filtered_spreadsheet_full_path: Path = (
+            project_root / "data" / "transactions_decrypted_filtered.tsv")
+        self.filtered_spreadsheet_path: Path = (
+            filtered_spreadsheet_full_path.relative_to(project_root))
+        state_full_path: Path = (
+            project_root / "data" / "transactions_decrypted_state.json")
+        self.state_path: Path = state_full_path.relative_to(project_root)
         encrypted_spreadsheet_full_path: Path = (
             project_root / "data" / "transactions.tsv")
         self.encrypted_spreadsheet_path: Path = (
             encrypted_spreadsheet_full_path.relative_to(project_root))
-        save_data_dir_full_path: Path = (
-            project_root / "data" / "save_data")
-        self.save_data_dir_path: Path = (
-            save_data_dir_full_path.relative_to(project_root))
         self.time_zone: str | None = time_zone
+        self.chunk_size: int = chunk_size
+        self.transaction_user_index = TransactionUserIndex(
+            spreadsheet_file_name=str(self.encrypted_spreadsheet_path),
+            file_name=str(Path("data") / "transactions_user_index.tsv"))
 
-    def decrypt(self,
-                user_id: int | None = None,
-                user_name: str | None = None) -> None:
-        """
-        Decrypts the transactions spreadsheet.
+    def _get_user_hashes(self,
+                         user_id: int | None = None,
+                         user_name: str | None = None) -> List[str]:
         """
-        if not exists(self.encrypted_spreadsheet_path):
-            print("Encrypted transactions spreadsheet not found.")
-            return None
-        if not exists(self.save_data_dir_path):
-            print("Save data directory not found.")
-            return None
+        Gets the user ID hashes of a user, identified by the ID and/or
+        the name.
 
-        print("Decrypting transactions spreadsheet...")
-        user_names: Dict[str, str] = {}
-        for subdir, _, _ in os.walk(self.save_data_dir_path):
-            try:
-                subdir_user_id: int = int(basename(subdir))
-                subdir_save_data = UserSaveData(subdir_user_id)
-                subdir_user_name: str = subdir_save_data.user_name
-                subdir_user_id_hashed: str = (
-                    sha256(str(subdir_user_id).encode()).hexdigest())
-                user_names[subdir_user_id_hashed] = subdir_user_name
-            except Exception as e:
-                print(f"ERROR: Error getting save data: {e}")
-                continue
-
-        # Load the data from the file
-        transactions: pd.DataFrame = pd.read_csv(  # type: ignore
-            self.encrypted_spreadsheet_path, sep="\t")
-
-        # IMPROVE if user_id and user_name
-        # Only keep transactions that involve the specified user as
-        # identified by the ID or name
+        Args:
+            user_id: The user ID.
+            user_name: The user name.
 
+        Returns:
+            List[str]: The matching user ID hashes.
+        """
+        assert isinstance(g.user_hash_index, UserHashIndex), (
+            "g.user_hash_index has not been initialized.")
+        user_hashes: List[str] = []
+        if user_name:
+            user_hashes = [
+                user_hash for user_hash, indexed_user_name
+                in g.user_hash_index.user_names.items()
+                if indexed_user_name == user_name]
+            if len(user_hashes) == 0 and g.user_hash_index.sync() > 0:
+                user_hashes = [
+                    user_hash for user_hash, indexed_user_name
+                    in g.user_hash_index.user_names.items()
+                    if indexed_user_name == user_name]
         if user_id:
-            # Only keep transactions that involve the specified user
-            user_id_hashed: str = sha256(str(user_id).encode()).hexdigest()
-            transactions = transactions[
-                (transactions["Sender"] == user_id_hashed) |
-                (transactions["Receiver"] == user_id_hashed)]
+            user_id_hashed: str = hash_user_id(user_id)
+            if user_name and user_id_hashed not in user_hashes:
+                # The ID and the name belong to different users
+                return []
+            user_hashes = [user_id_hashed]
+        return user_hashes
+
+    def _read_chunks(
+            self,
+            offset: int = 0) -> Iterator[tuple[pd.DataFrame, int]]:
+        """
+        Reads the encrypted transactions after a byte offset in chunks. A row
+        that does not end with a line break is assumed to still be in the
+        process of being written, so reading stops there.
 
+        Args:
+            offset: The byte offset to start reading from. Defaults to 0
+                (the first row after the header).
+
+        Yields:
+            tuple: A tuple containing:
+                - transactions: A chunk of encrypted transactions.
+                - end_offset: The byte offset right after the chunk's
+                    last row.
+        """
+        header: str = self.transaction_user_index.read_header()
+        with open(self.encrypted_spreadsheet_path, "rb") as spreadsheet:
+            end_offset: int = max(offset, len(header.encode()))
+            spreadsheet.seek(end_offset)
+            chunk_rows: List[str] = []
+            for line in spreadsheet:
+                if not line.endswith(b"\n"):
+                    break
+                chunk_rows.append(line.decode())
+                end_offset += len(line)
+                if len(chunk_rows) >= self.chunk_size:
+                    yield (pd.read_csv(  # type: ignore
+                        StringIO(header + "".join(chunk_rows)), sep="\t"),
+                        end_offset)
+                    chunk_rows = []
+            if len(chunk_rows) > 0:
+                yield (pd.read_csv(  # type: ignore
+                    StringIO(header + "".join(chunk_rows)), sep="\t"),
+                    end_offset)
+
+    def _read_user_chunks(self,
+                          user_hashes: List[str]) -> Iterator[pd.DataFrame]:
+        """
+        Reads the encrypted transactions that involve the given users in
+        chunks, using the transaction user index.
+
+        Args:
+            user_hashes: The user ID hashes.
+
+        Yields:
+            pd.DataFrame: A chunk of encrypted transactions.
+        """
+        header: str = self.transaction_user_index.read_header()
+        user_rows: List[str] = (
+            self.transaction_user_index.read_user_rows(user_hashes))
+        for start in range(0, max(len(user_rows), 1), self.chunk_size):
+            chunk_rows: List[str] = user_rows[start:start + self.chunk_size]
+            yield pd.read_csv(  # type: ignore
+                StringIO(header + "".join(chunk_rows)), sep="\t")
+
+    def _format_times(self, times: "pd.Series[float]") -> "pd.Series[str]":
+        """
+        Converts a column of Unix timestamps to human-readable times.
+
+        Args:
+            times: The Unix timestamps.
+
+        Returns:
+            pd.Series[str]: The formatted times.
+        """
+        if self.time_zone is None:
+            # Use local time zone
+            return times.map(format_timestamp)  # type: ignore
+        times_converted: "pd.Series[pd.Timestamp]" = (
+            pd.to_datetime(times, unit="s", utc=True)  # type: ignore
+            .dt.tz_convert(self.time_zone))
+        return times_converted.dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _decrypt_chunk(self,
+                       transactions: pd.DataFrame,
+                       user_names: Dict[str, str],
+                       unknown_user_hashes: Set[str]) -> pd.DataFrame:
+        """
+        Replaces the hashed user IDs with user names and the Unix timestamps
+        with human-readable times.
+
+        Args:
+            transactions: A chunk of encrypted transactions.
+            user_names: The user names, keyed by user ID hash.
+            unknown_user_hashes: The user ID hashes that have no user name
+                are added to this set.
+
+        Returns:
+            pd.DataFrame: The decrypted chunk.
+        """
         # Replace hashed user IDs with user names
-        transactions["Sender"] = (
-            transactions["Sender"].map(user_names))  # type: ignore
-        transactions["Receiver"] = (
-            transactions["Receiver"].map(user_names))  # type: ignore
+        for column in ("Sender", "Receiver"):
+            user_hashes: "pd.Series[str]" = transactions[column]
+            decrypted: "pd.Series[str]" = (
+                user_hashes.map(user_names))  # type: ignore
+            unknown_user_hashes.update(
+                user_hashes[decrypted.isna() & user_hashes.notna()]
+                .astype(str))
+            transactions[column] = decrypted
         # Replace unix timestamps
-        transactions["Time"] = (
-            transactions["Time"].map(format_timestamp))  # type: ignore
+        transactions["Time"] = self._format_times(transactions["Time"])
+        return transactions
 
-        if user_name:
-            # Only keep transactions that involve the specified user
-            transactions = transactions[
-                (transactions["Sender"] == user_name) |
-                (transactions["Receiver"] == user_name)]
+    def _sync_user_names(self) -> None:
+        """
+        Adds the users that appear in the encrypted spreadsheet but are
+        missing from the user hash index (users whose save data was created
+        while the index was not running).
+        """
+        assert isinstance(g.user_hash_index, UserHashIndex), (
+            "g.user_hash_index has not been initialized.")
+        spreadsheet_user_hashes: set[str] = (
+            self.transaction_user_index.read_user_hashes())
+        if not spreadsheet_user_hashes.issubset(
+                g.user_hash_index.user_names):
+            g.user_hash_index.sync()
 
-        # Save the decrypted transactions to a new file
-        transactions.to_csv(
-            self.decrypted_spreadsheet_path, sep="\t", index=False)
+    def _rows_are_current(self,
+                          state: Dict[str, Any],
+                          user_names: Dict[str, str]) -> bool:
+        """
+        Checks if the rows decrypted so far still have the right user names:
+        no user has changed their name, and no user whose name was unknown
+        has been added.
+
+        Args:
+            state: The state of the decrypted spreadsheet.
+            user_names: The current user names, keyed by user ID hash.
+
+        Returns:
+            bool: True if the decrypted rows can be kept.
+        """
+        decrypted_user_names: Any = state.get("user_names")
+        unknown_user_hashes: Any = state.get("unknown_user_hashes")
+        if (not isinstance(decrypted_user_names, dict) or
+                not isinstance(unknown_user_hashes, list)):
+            return False
+        for user_hash, user_name in decrypted_user_names.items():
+            if user_names.get(user_hash) != user_name:
+                return False
+        return not any(user_hash in user_names
+                       for user_hash in unknown_user_hashes)
+
+    def _load_state(self) -> Dict[str, Any] | None:
+        """
+        Loads the state of the decrypted spreadsheet.
+
+        Returns:
+            Dict[str, Any] | None: The state, or None if there is no
+                usable state.
+        """
+        if not exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, "r") as file:
+                return json.load(file)
+        except Exception as e:
+            print(f"ERROR: Error loading decrypted spreadsheet state: {e}")
+            return None
+
+    def _save_state(self,
+                    encrypted_offset: int,
+                    user_names: Dict[str, str],
+                    unknown_user_hashes: Set[str]) -> None:
+        """
+        Saves the state of the decrypted spreadsheet.
+
+        Args:
+            encrypted_offset: The byte offset in the encrypted spreadsheet up
+                to which rows have been decrypted.
+            user_names: The user names that were used, keyed by user ID
+                hash.
+            unknown_user_hashes: The user ID hashes in the decrypted rows
+                that had no user name.
+        """
+        state: Dict[str, Any] = {
+            "encrypted_offset": encrypted_offset,
+            "decrypted_size": getsize(self.decrypted_spreadsheet_path),
+            "user_names": user_names,
+            "unknown_user_hashes": sorted(unknown_user_hashes)
+        }
+        temporary_path: str = str(self.state_path) + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(state, file)
+        replace(temporary_path, self.state_path)
+
+    def _write_chunks(self,
+                      chunks: Iterator[pd.DataFrame],
+                      path: Path,
+                      append: bool = False) -> Set[str]:
+        """
+        Decrypts chunks of transactions and writes them to a file.
+
+        Args:
+            chunks: The chunks of encrypted transactions.
+            path: The path to the decrypted spreadsheet.
+            append: Whether to append to the file instead of overwriting
+                it. Defaults to False.
+
+        Returns:
+            Set[str]: The user ID hashes that had no user name.
+        """
+        assert isinstance(g.user_hash_index, UserHashIndex), (
+            "g.user_hash_index has not been initialized.")
+        user_names: Dict[str, str] = g.user_hash_index.user_names
+        unknown_user_hashes: Set[str] = set()
+        first_chunk: bool = not append
+        for transactions in chunks:
+            transactions = self._decrypt_chunk(transactions, user_names,
+                                               unknown_user_hashes)
+            transactions.to_csv(
+                path, sep="\t", index=False,
+                mode="w" if first_chunk else "a", header=first_chunk)
+            first_chunk = False
+        if first_chunk:
+            # No transactions; keep the header
+            with open(path, "w") as file:
+                file.write(self.transaction_user_index.read_header())
+        return unknown_user_hashes
+
+    def _update_decrypted_spreadsheet(self) -> None:
+        """
+        Appends the rows that have been added to the encrypted spreadsheet
+        since the last update to the decrypted spreadsheet. The decrypted
+        spreadsheet is rebuilt if the names in its rows have changed (see
+        _rows_are_current()), or if it does not match the recorded state.
+        """
+        assert isinstance(g.user_hash_index, UserHashIndex), (
+            "g.user_hash_index has not been initialized.")
+        user_names: Dict[str, str] = dict(g.user_hash_index.user_names)
+        state: Dict[str, Any] | None = self._load_state()
+        offset: int = 0
+        unknown_user_hashes: Set[str] = set()
+        if (state is not None and
+                self._rows_are_current(state, user_names) and
+                exists(self.decrypted_spreadsheet_path) and
+                getsize(self.decrypted_spreadsheet_path) ==
+                state.get("decrypted_size") and
+                getsize(self.encrypted_spreadsheet_path) >=
+                int(state.get("encrypted_offset", 0))):
+            offset = int(state["encrypted_offset"])
+            unknown_user_hashes = set(state["unknown_user_hashes"])
+            print("Appending new transactions to the decrypted "
+                  "spreadsheet...")
+        else:
+            print("Rebuilding the decrypted spreadsheet...")
+        end_offsets: List[int] = [offset]
+
+        def read_chunks() -> Iterator[pd.DataFrame]:
+            for transactions, end_offset in self._read_chunks(offset):
+                yield transactions
+                end_offsets.append(end_offset)
+
+        unknown_user_hashes.update(
+            self._write_chunks(read_chunks(),
+                               self.decrypted_spreadsheet_path,
+                               append=offset > 0))
+        self._save_state(end_offsets[-1], user_names, unknown_user_hashes)
+
+    def decrypt(self,
+                user_id: int | None = None,
+                user_name: str | None = None) -> Path | None:
+        """
+        Decrypts the transactions spreadsheet. If a user ID or name is given,
+        only the transactions that involve the user are kept, and they are
+        saved to a separate file.
+
+        Returns:
+            Path | None: The path to the decrypted spreadsheet, or None if
+                there is no encrypted spreadsheet.
+        """
+        if not exists(self.encrypted_spreadsheet_path):
+            print("Encrypted transactions spreadsheet not found.")
+            return None
+
+        print("Decrypting transactions spreadsheet...")
+        self._sync_user_names()
+        if user_id or user_name:
+            # Only keep transactions that involve the specified user as
+            # identified by the ID or name
+            user_hashes: List[str] = self._get_user_hashes(user_id, user_name)
+            self._write_chunks(self._read_user_chunks(user_hashes),
+                               self.filtered_spreadsheet_path)
+            print("Decrypted transactions saved to file.")
+            return self.filtered_spreadsheet_path
 
+        self._update_decrypted_spreadsheet()
         print("Decrypted transactions spreadsheet saved to file.")
+        return self.decrypted_spreadsheet_path
 # endregion
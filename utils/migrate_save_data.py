@@ -0,0 +1,73 @@
+# region Imports
+# Standard library
+import sys
+from typing import Dict, List
+
+# Local
+from type_aliases import SaveData
+from models.save_data_backends import (
+    JsonSaveDataBackend, SqliteSaveDataBackend)
+# endregion
+
+# region Migrate save data
+
+
+def migrate_save_data(
+        source_directory: str = "data/save_data",
+        database_file_name: str = "data/save_data.sqlite3",
+        batch_size: int = 500) -> int:
+    """
+    Copies the save data of every user from the directory layout (one JSON
+    file per user) into an SQLite database. The save data files are left in
+    place. Users that are already in the database are overwritten, so the
+    migration can be run again if it was interrupted.
+
+    The bot must not be running while the migration runs. Afterwards, set
+    `save_data_backend` to "sqlite" in core/global_state.py.
+
+    Args:
+        source_directory: The save data directory. Defaults to
+            "data/save_data".
+        database_file_name: The path to the database file. Defaults to
+            "data/save_data.sqlite3".
+        batch_size: The number of users written per transaction. Defaults
+            to 500.
+
+    Returns:
+        int: The number of users that were migrated.
+    """
+    source = JsonSaveDataBackend(directory=source_directory)
+    destination = SqliteSaveDataBackend(file_name=database_file_name)
+    user_ids: List[int] = source.get_user_ids()
+    print(f"Migrating save data of {len(user_ids)} users...")
+    users_migrated: int = 0
+    batch: Dict[int, SaveData] = {}
+    try:
+        for user_id in user_ids:
+            try:
+                save_data: SaveData | None = source.load(user_id)
+            except Exception as e:
+                print(f"ERROR: Error loading save data for {user_id}: {e}")
+                continue
+            if save_data is None:
+                continue
+            batch[user_id] = save_data
+            if len(batch) >= batch_size:
+                destination.save_many(batch)
+                users_migrated += len(batch)
+                batch = {}
+                print(f"Migrated {users_migrated} users...")
+        if len(batch) > 0:
+            destination.save_many(batch)
+            users_migrated += len(batch)
+    finally:
+        destination.close()
+    print(f"Migrated save data of {users_migrated} users.")
+    return users_migrated
+# endregion
+
+# region Main
+if __name__ == "__main__":
+    # Usage: python -m utils.migrate_save_data [directory] [database]
+    migrate_save_data(*sys.argv[1:3])
+# endregion
@@ -1,25 +1,157 @@
 # region Imports
 # Standard Library
+import asyncio
 from typing import Dict, List
 
 # Third party 
-from discord import Member, Emoji, PartialEmoji, User
+from discord import (Member, Emoji, PartialEmoji, Reaction, TextChannel,
+                     User)
 from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
+from models.mined_messages import MinedMessages
+from models.user_save_data import UserSaveData
 from utils.process_reaction import process_reaction
 # endregion
 # region Missed msgs
 
 
-async def process_missed_messages(limit: int | None = None) -> None:
+def is_coin_reaction(reaction: Reaction) -> bool:
+    """
+    Checks if a reaction uses the coin emoji, without fetching the users who
+    reacted.
+
+    Parameters:
+        reaction: The reaction.
+
+    Returns:
+        bool: True if the reaction uses the coin emoji.
+    """
+    emoji: PartialEmoji | Emoji | str = reaction.emoji
+    if isinstance(emoji, str) or emoji.id is None:
+        return False
+    return emoji.id == g.coin_emoji_id
+
+
+async def process_channel_missed_messages(channel: TextChannel,
+                                          limit: int | None = None) -> int:
+    """
+    Fetches the messages that were sent in a channel while the bot was
+    offline, processes reactions to them and saves a new checkpoint for the
+    channel.
+
+    Only coin reactions are looked at, so the users of other reactions are
+    never fetched. Reactions from the message author, and from users who
+    have already mined the message, are skipped before they are processed.
+    Each sender's mined messages are only looked up once per channel.
+
+    Parameters:
+        channel: The text channel.
+        limit (int, optional): Limit the maximum number of messages to fetch.
+        Defaults to None.
+
+    Returns:
+        int: The number of new messages found.
+    """
+    print("Fetching messages from "
+          f"channel: {channel.name} ({channel.id})...")
+    channel_checkpoints: List[Dict[str, int]] | None = (
+        g.all_channel_checkpoints[channel.id].load())
+    if channel_checkpoints is not None:
+        print(f"Channel checkpoints loaded for {channel.name} "
+              f"({channel.id}).")
+    else:
+        print("No checkpoints could be loaded for "
+              f"{channel.name} ({channel.id}).")
+    new_channel_messages_found: int = 0
+    mined_messages_by_user: Dict[int, MinedMessages] = {}
+    fresh_last_message_id: int | None = None
+    checkpoint_reached: bool = False
+    # Fetch messages from the channel (reverse chronological order)
+    try:
+        async for message in channel.history(limit=limit):
+            message_id: int = message.id
+            if new_channel_messages_found == 0:
+                # The first message found will be the last message sent
+                # This will be used as the checkpoint
+                fresh_last_message_id = message_id
+            # print(f"{message.author}: "
+            #       f"{message.content} ({message_id}).")
+            if channel_checkpoints is not None:
+                for checkpoint in channel_checkpoints:
+                    if message_id == checkpoint["last_message_id"]:
+                        print("Channel checkpoint reached for "
+                              f"{channel.name} ({channel.id}).")
+                        checkpoint_reached = True
+                        break
+                if checkpoint_reached:
+                    break
+                new_channel_messages_found += 1
+                sender: Member | User
+                receiver: User | Member
+                coin_reactions: List[Reaction] = [
+                    reaction for reaction in message.reactions
+                    if is_coin_reaction(reaction)]
+                for reaction in coin_reactions:
+                    async for user in reaction.users():
+                        # print("Reaction found: "
+                        #       f"{reaction.emoji}: {user}.")
+                        # print(f"Message ID: {message_id}.")
+                        # print(f"{message.author}: {message.content}")
+                        sender = user
+                        receiver = message.author
+                        if sender.id == receiver.id:
+                            continue
+                        if sender.id not in mined_messages_by_user:
+                            mined_messages_by_user[sender.id] = UserSaveData(
+                                user_id=sender.id,
+                                user_name=sender.name).mined_messages
+                        if message_id in mined_messages_by_user[sender.id]:
+                            continue
+                        emoji: PartialEmoji | Emoji | str = (
+                            reaction.emoji)
+                        await process_reaction(message_id=message_id,
+                                               emoji=emoji,
+                                               sender=sender,
+                                               receiver=receiver,)
+            del message_id
+    except Exception as e:
+        channel_name: str = channel.name
+        print("ERROR: Error fetching messages "
+              f"from channel {channel_name} ({channel.id}): {e}")
+    print("Messages from "
+          f"channel {channel.name} ({channel.id}) fetched.")
+    if fresh_last_message_id is None:
+        print("WARNING: No channel messages found in "
+              f"{channel.name} ({channel.id}).")
+    else:
+        if new_channel_messages_found > 0:
+            print(f"Saving checkpoint for {channel.name} ({channel.id}): "
+                  f"{fresh_last_message_id}")
+            g.all_channel_checkpoints[channel.id].save(
+                fresh_last_message_id)
+        else:
+            print("Will not save checkpoint for "
+                  f"{channel.name} ({channel.id}) because "
+                  "no new messages were found.")
+    return new_channel_messages_found
+
+
+async def process_missed_messages(
+        limit: int | None = None,
+        max_concurrent_channels: int | None = None) -> None:
     """
     This function iterates through all guilds and their text channels to fetch
     messages that were sent while the bot was offline. It processes reactions to
     these messages and updates checkpoints to keep track of the last processed
     message in each channel.
 
+    Channels are processed concurrently, at most `max_concurrent_channels` at
+    a time, so that the bot stays within Discord's rate limits (discord.py
+    waits out the limit of each route on its own). The most recently active
+    channels are processed first. Progress is printed as channels finish.
+
     This does not process reactions to messages older than the last checkpoint
     (i.e. older than the last message sent before the bot went offline). That
     would require keeping track of every single message and reactions on the
@@ -27,6 +159,9 @@ async def process_missed_messages(limit: int | None = None) -> None:
     Parameters:
         limit (int, optional): Limit the maximum number of messages to fetch per
         channel. Defaults to None.
+        max_concurrent_channels (int, optional): The maximum number of
+        channels to process at the same time. Defaults to
+        g.missed_messages_max_concurrent_channels.
     Global Variables:
         all_channel_checkpoints (dict): A dictionary storing checkpoints for
 
@@ -35,75 +170,33 @@ async def process_missed_messages(limit: int | None = None) -> None:
     missed_messages_processed_message: str = "Missed messages processed."
     assert isinstance(g.bot, Bot), "bot has not been initialized."
     print("Processing missed messages...")
+    if max_concurrent_channels is None:
+        max_concurrent_channels = g.missed_messages_max_concurrent_channels
 
+    channels: List[TextChannel] = []
     for guild in g.bot.guilds:
-        print("Fetching messages from "
+        print("Collecting channels from "
               f"guild: {guild.name} ({guild.id})...")
-        for channel in guild.text_channels:
-            print("Fetching messages from "
-                  f"channel: {channel.name} ({channel.id})...")
-            channel_checkpoints: List[Dict[str, int]] | None = (
-                g.all_channel_checkpoints[channel.id].load())
-            if channel_checkpoints is not None:
-                print(f"Channel checkpoints loaded.")
-            else:
-                print("No checkpoints could be loaded.")
-            new_channel_messages_found: int = 0
-            fresh_last_message_id: int | None = None
-            checkpoint_reached: bool = False
-            # Fetch messages from the channel (reverse chronological order)
-            try:
-                async for message in channel.history(limit=limit):
-                    message_id: int = message.id
-                    if new_channel_messages_found == 0:
-                        # The first message found will be the last message sent
-                        # This will be used as the checkpoint
-                        fresh_last_message_id = message_id
-                    # print(f"{message.author}: "
-                    #       f"{message.content} ({message_id}).")
-                    if channel_checkpoints is not None:
-                        for checkpoint in channel_checkpoints:
-                            if message_id == checkpoint["last_message_id"]:
-                                print("Channel checkpoint reached.")
-                                checkpoint_reached = True
-                                break
-                        if checkpoint_reached:
-                            break
-                        new_channel_messages_found += 1
-                        sender: Member | User
-                        receiver: User | Member
-                        for reaction in message.reactions:
-                            async for user in reaction.users():
-                                # print("Reaction found: "
-                                #       f"{reaction.emoji}: {user}.")
-                                # print(f"Message ID: {message_id}.")
-                                # print(f"{message.author}: {message.content}")
-                                sender = user
-                                receiver = message.author
-                                emoji: PartialEmoji | Emoji | str = (
-                                    reaction.emoji)
-                                await process_reaction(message_id=message_id,
-                                                       emoji=emoji,
-                                                       sender=sender,
-                                                       receiver=receiver,)
-                    del message_id
-            except Exception as e:
-                channel_name: str = channel.name
-                print("ERROR: Error fetching messages "
-                      f"from channel {channel_name} ({channel.id}): {e}")
-            print("Messages from "
-                  f"channel {channel.name} ({channel.id}) fetched.")
-            if fresh_last_message_id is None:
-                print("WARNING: No channel messages found.")
-            else:
-                if new_channel_messages_found > 0:
-                    print(f"Saving checkpoint: {fresh_last_message_id}")
-                    g.all_channel_checkpoints[channel.id].save(
-                        fresh_last_message_id)
-                else:
-                    print("Will not save checkpoint for this channel because "
-                          "no new messages were found.")
-        print(f"Messages from guild {guild.id} ({guild}) fetched.")
+        channels.extend(guild.text_channels)
+    # Message IDs grow over time, so the channels with the highest last
+    # message ID are the most recently active
+    channels.sort(key=lambda channel: channel.last_message_id or 0,
+                  reverse=True)
+    semaphore: asyncio.Semaphore = (
+        asyncio.Semaphore(max(max_concurrent_channels, 1)))
+    channels_processed: int = 0
+    messages_found: int = 0
+
+    async def process_channel(channel: TextChannel) -> None:
+        nonlocal channels_processed, messages_found
+        async with semaphore:
+            messages_found += (
+                await process_channel_missed_messages(channel, limit))
+        channels_processed += 1
+        print(f"Missed messages: {channels_processed}/{len(channels)} "
+              f"channels processed ({messages_found} new messages).")
+
+    await asyncio.gather(*(process_channel(channel) for channel in channels))
     print(missed_messages_processed_message)
     del missed_messages_processed_message
 
@@ -1,7 +1,4 @@
 # region Imports
-# Standard Library
-from typing import List
-
 # Third party
 from discord import (Member, Message, Emoji, PartialEmoji, User, TextChannel,
                      VoiceChannel, CategoryChannel, ForumChannel, StageChannel,
@@ -13,10 +10,12 @@ from discord.ext.commands import Bot  # type: ignore
 import core.global_state as g
 from core.terminate_bot import terminate_bot
 from sponsorblockchain.models.blockchain import Blockchain
+from sponsorblockchain.models.block import Block
+from models.ledger_writer import LedgerWriter
 from models.log import Log
+from models.mined_messages import MinedMessages
 from models.user_save_data import UserSaveData
-from utils.blockchain_utils import (add_block_transaction,
-                                    get_last_block_timestamp)
+from utils.blockchain_utils import add_block_transaction
 # endregion
 
 # region Coin reaction
@@ -40,6 +39,8 @@ async def process_reaction(message_id: int,
     assert isinstance(g.bot, Bot), "g.bot has not been initialized."
     assert isinstance(g.blockchain, Blockchain), (
         "g.blockchain has not been initialized.")
+    assert isinstance(g.ledger_writer, LedgerWriter), (
+        "g.ledger_writer has not been initialized.")
     assert isinstance(g.log, Log), "g.log has not been initialized."
     emoji_id: int | str | None = 0
     match emoji:
@@ -69,30 +70,23 @@ async def process_reaction(message_id: int,
         sender_name: str = sender.name
         save_data: UserSaveData = UserSaveData(
             user_id=sender_id, user_name=sender_name)
-        message_mined_data: str | List[int] | bool | float | None = (
-            save_data.load("messages_mined"))
-        message_mined: List[int] = (
-            message_mined_data if isinstance(message_mined_data, list) else [])
-        if message_id in message_mined:
+        mined_messages: MinedMessages = save_data.mined_messages
+        if message_id in mined_messages:
             return
-        # Add the message ID to the list of mined messages
-        message_mined.append(message_id)
-        save_data.save(key="messages_mined", value=message_mined)
+        # Add the message ID to the mined messages
+        mined_messages.add(message_id)
 
         print(f"{sender} ({sender_id}) is mining 1 {g.coin} "
               f"for {receiver} ({receiver_id})...")
-        await add_block_transaction(blockchain=g.blockchain,
-                                    sender=sender,
-                                    receiver=receiver,
-                                    amount=1,
-                                    method="reaction"
+        block: Block = await add_block_transaction(sender=sender,
+                                                   receiver=receiver,
+                                                   amount=1,
+                                                   method="reaction"
         )
 
         # Log the mining
-        last_block_timestamp: float | None = get_last_block_timestamp()
-        if last_block_timestamp is None:
-            print("ERROR: Could not get last block timestamp.")
-            await terminate_bot()
+        last_block_timestamp: float = block.timestamp
+        del block
 
         try:
             mined_message: str = (f"{sender} ({sender_id}) mined 1 {g.coin} "
@@ -108,7 +102,9 @@ async def process_reaction(message_id: int,
         chain_validity: bool | None = None
         try:
             print("Validating blockchain...")
-            chain_validity = g.blockchain.is_chain_valid()
+            # Only the blocks added since the last validation are checked,
+            # apart from the scheduled full validations
+            chain_validity = await g.ledger_writer.validate_chain()
         except Exception as e:
             # TODO Revert blockchain to previous state
             print(f"ERROR: Error validating blockchain: {e}")
@@ -0,0 +1,101 @@
+# region Imports
+# Standard library
+import sys
+from os.path import exists, join
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import time
+from typing import List
+
+# Local
+from type_aliases import SlotSimulationResult
+from models.slot_machine import SlotMachine
+from models.slot_simulator import SlotSimulator
+# endregion
+
+# region Slot benchmark
+# One wager from each fee tier: no jackpot, low, medium and high wager
+BENCHMARK_WAGERS: List[int] = [1, 5, 50, 500]
+
+
+def run_slot_benchmark(file_name: str = "data/slot_machine.json",
+                       spins: int = 10000000,
+                       wagers: List[int] | None = None,
+                       max_deviation: float = 4.0,
+                       seed: int | None = None) -> bool:
+    """
+    Simulates spins of the configured slot machine for one wager of each
+    fee tier and compares the empirical RTP with the exact RTP. Run it after
+    editing the reels or fees.
+    The slot machine is loaded from a copy of the configuration file, with
+    its own jackpot journal, in a temporary directory, so the benchmark
+    never changes the live configuration or jackpot journal.
+
+    Args:
+        file_name: The slot machine configuration file. Defaults to
+            "data/slot_machine.json".
+        spins: The number of spins per wager. Defaults to 10000000.
+        wagers: The wagers. Defaults to BENCHMARK_WAGERS.
+        max_deviation: The largest accepted difference between the
+            empirical and the exact RTP, in standard errors. Defaults to 4.
+        seed: The seed of the random number generator. Defaults to None.
+
+    Returns:
+        bool: True if the empirical RTP of every wager is within
+            `max_deviation` standard errors of the exact RTP.
+    """
+    if wagers is None:
+        wagers = BENCHMARK_WAGERS
+    if not exists(file_name):
+        print(f"ERROR: The slot machine configuration file {file_name} "
+              "does not exist.")
+        return False
+    with TemporaryDirectory() as temporary_dir_path:
+        config_copy_file_name: str = join(temporary_dir_path,
+                                          "slot_machine.json")
+        copyfile(file_name, config_copy_file_name)
+        slot_machine = SlotMachine(
+            file_name=config_copy_file_name,
+            jackpot_journal_file_name=join(temporary_dir_path,
+                                           "jackpot_journal.txt"))
+        simulator = SlotSimulator(slot_machine, seed=seed)
+        all_within_tolerance: bool = True
+        for wager in wagers:
+            start_time: float = time()
+            result: SlotSimulationResult = simulator.simulate(wager, spins)
+            duration: float = time() - start_time
+            deviation: float = 0.0
+            if result["rtp_standard_error"] > 0:
+                deviation = ((result["rtp"] - result["expected_rtp"]) /
+                             result["rtp_standard_error"])
+            within_tolerance: bool = abs(deviation) <= max_deviation
+            all_within_tolerance = all_within_tolerance and within_tolerance
+            average_jackpot_cycle: str = (
+                f"{result['average_jackpot_cycle']:.1f}"
+                if result["average_jackpot_cycle"] is not None else "-")
+            print(f"Wager {wager}: "
+                  f"RTP {result['rtp']:.4%} "
+                  f"(exact {result['expected_rtp']:.4%}, "
+                  f"{deviation:+.2f} SE), "
+                  f"variance {result['return_variance']:.2f}, "
+                  f"hit frequency {result['hit_frequency']:.4%}, "
+                  f"jackpots {result['jackpot_wins']}, "
+                  f"jackpot cycle {average_jackpot_cycle}, "
+                  f"{spins / duration:,.0f} spins/s")
+            if not within_tolerance:
+                print(f"WARNING: The empirical RTP for wager {wager} "
+                      f"deviates from the exact RTP by {deviation:+.2f} "
+                      "standard errors.")
+    return all_within_tolerance
+# endregion
+
+# region Main
+if __name__ == "__main__":
+    # Usage: python -m utils.slot_benchmark [spins] [config file]
+    benchmark_spins: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    benchmark_file_name: str = (
+        sys.argv[2] if len(sys.argv) > 2 else "data/slot_machine.json")
+    if not run_slot_benchmark(file_name=benchmark_file_name,
+                              spins=benchmark_spins):
+        sys.exit(1)
+# endregion
@@ -10,12 +10,11 @@ from discord.ext.commands import Bot  # type: ignore
 
 # Local
 import core.global_state as g
-from core.terminate_bot import terminate_bot
 from models.log import Log
 from models.user_save_data import UserSaveData
-from utils.blockchain_utils import (add_block_transaction,
-                                    get_last_block_timestamp)
+from utils.blockchain_utils import add_block_transaction
 from sponsorblockchain.models.blockchain import Blockchain
+from sponsorblockchain.models.block import Block
 # endregion
 
 # region Bonus die button
@@ -91,7 +90,8 @@ class StartingBonusView(View):
         If the user is the invoker, it disables the button, rolls a die, awards
         a starting bonus based on the die roll, and sends a follow-up message
         with the result. It then adds a block transaction to the blockchain,
-        logs the event, and stops the interaction.
+        records the bonus in the user's save data, logs the event, and stops
+        the interaction.
         Args:
             interaction (Interaction): The interaction object.
         """
@@ -114,18 +114,19 @@ class StartingBonusView(View):
                 "You may now play on the slot machines. Good luck!")
             await interaction.followup.send(message_content)
             del message_content
-            await add_block_transaction(
-                blockchain=g.blockchain,
+            block: Block = await add_block_transaction(
                 sender=g.casino_house_id,
                 receiver=self.invoker,
                 amount=starting_bonus,
                 method="starting_bonus"
             )
-            self.save_data.starting_bonus_available = False
-            last_block_timestamp: float | None = get_last_block_timestamp()
-            if last_block_timestamp is None:
-                print("ERROR: Could not get last block timestamp.")
-                await terminate_bot()
+            last_block_timestamp: float = block.timestamp
+            del block
+            # Record the bonus in a single save data update
+            with self.save_data.transaction():
+                self.save_data.starting_bonus_available = False
+                self.save_data.has_visited_casino = True
+                self.save_data.when_last_bonus_received = last_block_timestamp
             g.log.log(
                 line=(f"{self.invoker} ({self.invoker_id}) won "
                       f"{starting_bonus} {g.coins} from the starting bonus."),